@@ -1,12 +1,37 @@
-from google.genai import types
-from google.adk.agents import Agent
-from vertexai.agent_engines import AdkApp
-from dashboard.kpis import render_kpis  # optional if needed
-from graphviz import Digraph
-from services.cloud.google_auth import service_account_credentials
-
-with service_account_credentials():
-        # ---- AI Agent Setup ----
+"""
+CemMind agent: the Gemini-backed ``AdkApp`` plus the ``analyze_plant`` tool
+and the process diagram.
+
+The Google ADK / Vertex SDKs and graphviz are imported, and the agent is
+built, on first use (``get_app``), not at import, so the dashboard renders
+its KPIs before any of that work happens.
+"""
+import threading
+
+from agents.rules import evaluate_row
+
+_app = None
+_app_lock = threading.Lock()
+
+
+def build_app():
+    """Construct the agent and its ``AdkApp`` (imports the SDKs; uses the shared GCP credentials)."""
+    import vertexai
+    from google.genai import types
+    from google.adk.agents import Agent
+    from vertexai.agent_engines import AdkApp
+    from config import get_settings
+    from services.cloud.google_auth import get_credentials_provider
+
+    provider = get_credentials_provider()
+    if provider.configured:
+        settings = get_settings()
+        vertexai.init(project=settings.project or provider.project_id, location=settings.region,
+                      credentials=provider.credentials())
+        # The ADK's Gemini client only reads Application Default Credentials
+        provider.export_adc()
+
+    # ---- AI Agent Setup ----
     safety_settings = [types.SafetySetting(
         category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
         threshold=types.HarmBlockThreshold.OFF
@@ -28,86 +53,65 @@ with service_account_credentials():
         tools=[]
     )
 
-    app = AdkApp(agent=cemmind_agent)
-
-
-    def analyze_plant(latest_data: dict) -> dict:
-        """Analyze cement plant data and return suggestions + stage severities."""
-        kiln_temp = latest_data.get("kiln_temp_C")
-        mill_power = latest_data.get("mill_power_kW")
-        af_rate = latest_data.get("AF_rate_percent")
-        free_lime = latest_data.get("clinker_free_lime_percent")
-        co2 = latest_data.get("CO2_emission_kgpt")
-
-        report = (
-            f"Kiln Temp: {kiln_temp}°C\n"
-            f"Mill Power: {mill_power} kW\n"
-            f"AF Rate: {af_rate}%\n"
-            f"Free Lime: {free_lime}%\n"
-            f"CO₂ Emission: {co2} kg/ton\n"
-        )
-
-        suggestions = []
-        severity = {stage: "normal" for stage in ["Raw", "Preheat", "Clinker", "Grind", "Sustain"]}
-
-        # Kiln temp
-        if kiln_temp > 1500:
-            suggestions.append("🔥 Kiln temperature is critical! Reduce fuel immediately.")
-            severity["Preheat"] = "critical"
-        elif kiln_temp > 1450:
-            suggestions.append("⚠️ Kiln temperature is high, monitor fuel closely.")
-            severity["Preheat"] = "warning"
-
-        # AF rate
-        if af_rate < 3:
-            suggestions.append("Critical low AF rate; sustainability compromised.")
-            severity["Sustain"] = "critical"
-        elif af_rate < 5:
-            suggestions.append("Increase alternative fuel rate to improve sustainability.")
-            severity["Sustain"] = "warning"
-
-        # Free lime
-        if free_lime > 4:
-            suggestions.append("Clinker free lime is critically high; poor quality risk.")
-            severity["Clinker"] = "critical"
-        elif free_lime > 2.5:
-            suggestions.append("Free lime is high; adjust kiln process.")
-            severity["Clinker"] = "warning"
-
-        # CO₂
-        if co2 > 1000:
-            suggestions.append("Critical CO₂ emissions; energy optimization needed.")
-            severity["Sustain"] = "critical"
-        elif co2 > 800:
-            suggestions.append("High CO₂ emission; consider process efficiency improvements.")
-            severity["Sustain"] = "warning"
-
-        # Mill power
-        if mill_power > 6000:
-            suggestions.append("Critical grinding load; immediate action required.")
-            severity["Grind"] = "critical"
-        elif mill_power > 5000:
-            suggestions.append("Mill power is high; check grinding efficiency.")
-            severity["Grind"] = "warning"
-
-        return {
-            "text": report + ("\n".join(suggestions) if suggestions else "\nAll metrics within normal range."),
-            "severity": severity
-        }
-
-
-    def render_process_diagram(severity: dict):
-        """Graphviz diagram with color-coded severities"""
-        process = Digraph()
-        process.attr(rankdir="LR", size="8,5")
-        process.attr("node", shape="box", style="rounded,filled")
-        color_map = {"normal":"palegreen","warning":"gold","critical":"lightcoral"}
-        for stage, label in [
-            ("Raw","🪨 Raw Material Prep"), ("Preheat","🔥 Preheating & Calcination"),
-            ("Clinker","🧱 Clinker Formation"), ("Grind","⚙️ Grinding & Cooling"),
-            ("Sustain","🌿 Sustainability")
-        ]:
-            level = severity.get(stage,"normal")
-            process.node(stage,label,fillcolor=color_map.get(level,"lightgrey"))
-        process.edges([("Raw","Preheat"),("Preheat","Clinker"),("Clinker","Grind"),("Grind","Sustain")])
-        return process
+    return AdkApp(agent=cemmind_agent)
+
+
+def get_app():
+    """The process-wide ``AdkApp``, built on the first call."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_app()
+    return _app
+
+
+def __getattr__(name):
+    # ``from agents.cem_agent import app`` still works; it just builds the agent at that point
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def analyze_plant(latest_data: dict) -> dict:
+    """Analyze cement plant data and return suggestions + stage severities."""
+    kiln_temp = latest_data.get("kiln_temp_C")
+    mill_power = latest_data.get("mill_power_kW")
+    af_rate = latest_data.get("AF_rate_percent")
+    free_lime = latest_data.get("clinker_free_lime_percent")
+    co2 = latest_data.get("CO2_emission_kgpt")
+
+    report = (
+        f"Kiln Temp: {kiln_temp}°C\n"
+        f"Mill Power: {mill_power} kW\n"
+        f"AF Rate: {af_rate}%\n"
+        f"Free Lime: {free_lime}%\n"
+        f"CO₂ Emission: {co2} kg/ton\n"
+    )
+
+    # Thresholds live in agents/rules.py, shared with the KPI cards
+    _, severity, suggestions = evaluate_row(latest_data)
+
+    return {
+        "text": report + ("\n".join(suggestions) if suggestions else "\nAll metrics within normal range."),
+        "severity": severity
+    }
+
+
+def render_process_diagram(severity: dict):
+    """Graphviz diagram with color-coded severities"""
+    from graphviz import Digraph
+
+    process = Digraph()
+    process.attr(rankdir="LR", size="8,5")
+    process.attr("node", shape="box", style="rounded,filled")
+    color_map = {"normal":"palegreen","warning":"gold","critical":"lightcoral"}
+    for stage, label in [
+        ("Raw","🪨 Raw Material Prep"), ("Preheat","🔥 Preheating & Calcination"),
+        ("Clinker","🧱 Clinker Formation"), ("Grind","⚙️ Grinding & Cooling"),
+        ("Sustain","🌿 Sustainability")
+    ]:
+        level = severity.get(stage,"normal")
+        process.node(stage,label,fillcolor=color_map.get(level,"lightgrey"))
+    process.edges([("Raw","Preheat"),("Preheat","Clinker"),("Clinker","Grind"),("Grind","Sustain")])
+    return process
@@ -0,0 +1,197 @@
+"""
+Copilot request plumbing: event parsing for ``AdkApp.async_stream_query`` and
+a response cache keyed on a bucketed plant state, so reruns with an
+unchanged plant don't pay for another LLM round-trip.
+"""
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from agents.rules import RULES, score_value
+from services.metrics import REGISTRY, timed
+
+COPILOT_CACHE_SIZE = int(os.getenv("COPILOT_CACHE_SIZE", 256))
+COPILOT_CACHE_TTL_SEC = float(os.getenv("COPILOT_CACHE_TTL_SEC", 300))
+
+# Bucket width per metric; readings in the same bucket share a cached answer
+STATE_BUCKETS = {
+    "kiln_temp_C": 5.0,
+    "mill_power_kW": 50.0,
+    "AF_rate_percent": 1.0,
+    "clinker_free_lime_percent": 0.1,
+    "CO2_emission_kgpt": 10.0,
+}
+
+
+def quantize_state(latest, buckets=STATE_BUCKETS, rules=RULES):
+    """Hashable, bucketed view of a reading: (metric, bucket, severity level) per metric."""
+    state = []
+    for metric, width in buckets.items():
+        value = latest.get(metric)
+        if value is None or value != value:
+            state.append((metric, None, None))
+            continue
+        level = score_value(value, rules[metric]) if metric in rules else None
+        state.append((metric, int(value // width), level))
+    return tuple(state)
+
+
+@timed("agent.copilot_stream")
+async def stream_copilot(agent_app, message, on_text=None, tools=None, user_id="user123"):
+    """Stream one copilot answer; returns ``{"text": ..., "severity": ...}``.
+
+    ``tools`` maps function-call names (e.g. ``analyze_plant``) to local
+    callables returning ``{"text", "severity"}``. ``on_text`` gets the full
+    text so far after every event.
+    """
+    tools = tools or {}
+    text = ""
+    severity = None
+    started = time.perf_counter()
+    first = True
+    async for event in agent_app.async_stream_query(user_id=user_id, message=message):
+        if first:
+            REGISTRY.observe("agent.copilot_first_event", time.perf_counter() - started)
+            first = False
+        parts = event.get("content", {}).get("parts", [])
+        for part in parts:
+            if "function_call" in part and part["function_call"]["name"] in tools:
+                call = part["function_call"]
+                result = tools[call["name"]](**call.get("args", {}))
+                text = result["text"]
+                severity = result.get("severity")
+            elif "text" in part:
+                text += part["text"]
+        if on_text is not None:
+            on_text(text)
+    return {"text": text, "severity": severity}
+
+
+class CopilotCache:
+    """TTL + LRU cache of copilot answers with in-flight request coalescing.
+
+    Concurrent requests for the same key (from any thread or event loop)
+    share one underlying fetch.
+    """
+
+    def __init__(self, maxsize=COPILOT_CACHE_SIZE, ttl=COPILOT_CACHE_TTL_SEC):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, value, fetch_latency_s)
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.saved_latency_s = 0.0
+        self.fetch_latency_s = 0.0
+
+    @staticmethod
+    def key(prompt, latest):
+        return (prompt, quantize_state(latest))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, latency = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_latency_s += latency
+            return value
+
+    def put(self, key, value, latency=0.0):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value, latency)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_fetch(self, key, fetch):
+        """Cached value for ``key``, else await ``fetch()`` once for all concurrent callers."""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not owner:
+            try:
+                # Shielded: cancelling this waiter must not cancel the fetch everyone else shares
+                value = await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The owner was cancelled, not us; fetch it ourselves
+                return await self.get_or_fetch(key, fetch)
+            with self._lock:
+                self.saved_latency_s += self._entries.get(key, (0, None, 0.0))[2]
+            return value
+
+        t0 = time.perf_counter()
+        try:
+            value = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            if not future.done():
+                future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        latency = time.perf_counter() - t0
+        with self._lock:
+            self.fetch_latency_s += latency
+        self.put(key, value, latency)
+        if not future.done():
+            future.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+                "saved_latency_s": self.saved_latency_s,
+                "avg_fetch_latency_s": self.fetch_latency_s / self.misses if self.misses else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_copilot_cache():
+    """Process-wide copilot cache shared by all dashboard sessions."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CopilotCache()
+        return _cache
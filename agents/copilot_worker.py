@@ -0,0 +1,128 @@
+"""
+Background copilot worker: one long-lived asyncio loop on a daemon thread.
+
+The Streamlit script submits prompts and returns immediately; answers
+stream into a ``CopilotReply`` that the next render reads. A newer prompt
+on the same channel cancels the one still streaming (only the latest
+plant state matters).
+"""
+import asyncio
+import threading
+import time
+
+from agents.copilot import get_copilot_cache, stream_copilot
+
+
+class CopilotReply:
+    """Partial/final answer for one prompt; safe to read from any thread."""
+
+    def __init__(self, key, message):
+        self.key = key
+        self.message = message
+        self.text = ""
+        self.severity = None
+        self.status = "pending"     # pending | streaming | done | cancelled | error
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.finished_at = None
+        self._task = None
+
+    @property
+    def done(self):
+        return self.status in ("done", "cancelled", "error")
+
+    def _finish(self, status, error=None):
+        self.status = status
+        self.error = error
+        self.finished_at = time.monotonic()
+
+
+class CopilotWorker:
+    """Runs copilot prompts on a background loop.
+
+    ``agent_app`` is an ``AdkApp``-like object, or a zero-argument factory
+    for one (e.g. ``agents.cem_agent.get_app``); a factory is called on the
+    worker thread when the first prompt runs, so building the agent never
+    blocks a render.
+    """
+
+    def __init__(self, agent_app, tools=None, cache=None):
+        self._agent_app = None if callable(agent_app) and not hasattr(agent_app, "async_stream_query") else agent_app
+        self._app_factory = agent_app if self._agent_app is None else None
+        self._app_lock = threading.Lock()
+        self.tools = tools or {}
+        self.cache = cache or get_copilot_cache()
+        self._channels = {}     # channel -> latest CopilotReply
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="copilot-worker", daemon=True)
+        self._thread.start()
+        self.cancelled = 0
+
+    def submit(self, channel, key, message):
+        """Queue ``message`` on ``channel`` and return its ``CopilotReply`` right away.
+
+        Resubmitting the same key while it is pending returns the existing
+        reply; a different key supersedes and cancels the previous one.
+        """
+        with self._lock:
+            current = self._channels.get(channel)
+            if current is not None and current.key == key and current.status not in ("error", "cancelled"):
+                return current
+            reply = CopilotReply(key, message)
+            self._channels[channel] = reply
+        if current is not None and not current.done:
+            self._loop.call_soon_threadsafe(self._cancel, current)
+        asyncio.run_coroutine_threadsafe(self._run(reply), self._loop)
+        return reply
+
+    @property
+    def agent_app(self):
+        if self._agent_app is None:
+            with self._app_lock:
+                if self._agent_app is None:
+                    self._agent_app = self._app_factory()
+        return self._agent_app
+
+    def latest(self, channel):
+        with self._lock:
+            return self._channels.get(channel)
+
+    def _cancel(self, reply):
+        if reply._task is None:
+            # Superseded before it started; _run sees it is done and skips it
+            reply._finish("cancelled")
+            self.cancelled += 1
+        elif not reply._task.done():
+            reply._task.cancel()
+            self.cancelled += 1
+
+    async def _run(self, reply):
+        if reply.done:
+            return
+        reply._task = asyncio.current_task()
+
+        def on_text(text):
+            reply.text = text
+            reply.status = "streaming"
+
+        async def fetch():
+            # Off the loop: the first call may import the SDKs and build the agent
+            agent_app = self._agent_app or await asyncio.to_thread(lambda: self.agent_app)
+            return await stream_copilot(agent_app, reply.message, on_text=on_text, tools=self.tools)
+
+        try:
+            result = await self.cache.get_or_fetch(reply.key, fetch)
+        except asyncio.CancelledError:
+            reply._finish("cancelled")
+            return
+        except Exception as exc:
+            reply._finish("error", exc)
+            return
+        reply.text = result["text"]
+        reply.severity = result["severity"]
+        reply._finish("done")
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,268 @@
+"""
+Streaming anomaly and drift detectors with constant memory and constant
+work per sample.
+
+Every statistic is a NumPy vector with one slot per sensor, so one
+``update`` call advances all sensors (of one asset or a whole fleet) by a
+time step with a fixed number of array operations:
+
+* EWMA / EWMV baseline → z-score ``spike`` flags
+* two-sided CUSUM on the z-score → sustained mean ``shift`` flags
+* two-sided Page-Hinkley against a slow baseline → gradual ``drift`` flags
+* P² quartiles of the recent window → robust ``range`` flags (outside 3×IQR fences)
+
+A flag stays active for ``hold`` steps after it fires. The number of active
+flag kinds per sensor maps onto the severity levels in ``agents.rules``
+(one → warning, two or more → critical) and can be folded into the stage
+severity map drawn by ``render_process_diagram``.
+"""
+import numpy as np
+
+from agents.rules import CRITICAL, LEVELS, NORMAL, RULES, STAGES
+
+FLAGS = ("spike", "shift", "drift", "range")
+
+# Stages for sensors that have no severity rule
+DETECTOR_STAGES = {
+    "raw_feed_rate_tph": "Raw",
+    "blain_surface_cm2g": "Grind",
+}
+
+
+class P2Quantile:
+    """Jain & Chlamtac's P² quantile estimator, vectorized over columns.
+
+    ``p`` is one quantile for all ``n`` columns or one per column, so several
+    quantiles of the same sensors can share a single update. Five markers
+    per column; each update is a fixed number of array ops and no samples
+    are stored.
+    """
+
+    def __init__(self, p, n):
+        p = np.broadcast_to(np.asarray(p, dtype=np.float64), (n,))
+        self.p = p
+        self.dn = np.stack([np.zeros(n), p / 2, p, (1 + p) / 2, np.ones(n)], axis=1)
+        self.reset()
+
+    def reset(self):
+        """Forget every sample seen so far."""
+        p, n = self.p, len(self.p)
+        self.q = np.zeros((n, 5))
+        self.n = np.tile(np.arange(5, dtype=np.float64), (n, 1))
+        self.desired = np.stack([np.zeros(n), 2 * p, 4 * p, 2 + 2 * p, np.full(n, 4.0)], axis=1)
+        self.count = 0
+
+    @property
+    def value(self):
+        if self.count >= 5:
+            return self.q[:, 2]
+        if self.count == 0:
+            return np.full(len(self.q), np.nan)
+        ranked = np.sort(self.q[:, :self.count], axis=1)
+        return ranked[np.arange(len(ranked)), np.round(self.p * (self.count - 1)).astype(np.int64)]
+
+    def update(self, x):
+        if self.count < 5:
+            self.q[:, self.count] = x
+            self.count += 1
+            if self.count == 5:
+                self.q.sort(axis=1)
+            return
+        self.count += 1
+        q, n = self.q, self.n
+        np.minimum(q[:, 0], x, out=q[:, 0])
+        np.maximum(q[:, 4], x, out=q[:, 4])
+        # Cell k such that q[k] <= x < q[k+1]; markers above it move up one position
+        k = (q[:, 1:4] <= x[:, None]).sum(axis=1)
+        n[:, 1:] += np.arange(1, 5) > k[:, None]
+        self.desired += self.dn
+
+        for i in (1, 2, 3):
+            d = self.desired[:, i] - n[:, i]
+            up = (d >= 1) & (n[:, i + 1] - n[:, i] > 1)
+            down = (d <= -1) & (n[:, i - 1] - n[:, i] < -1)
+            move = up | down
+            if not move.any():
+                continue
+            s = np.where(up, 1.0, -1.0)
+            gap_up = n[:, i + 1] - n[:, i]
+            gap_down = n[:, i] - n[:, i - 1]
+            parabolic = q[:, i] + s / (n[:, i + 1] - n[:, i - 1]) * (
+                (gap_down + s) * (q[:, i + 1] - q[:, i]) / gap_up
+                + (gap_up - s) * (q[:, i] - q[:, i - 1]) / gap_down)
+            neighbour = np.where(up, q[:, i + 1], q[:, i - 1])
+            linear = q[:, i] + s * (neighbour - q[:, i]) / np.where(up, gap_up, -gap_down)
+            ok = (q[:, i - 1] < parabolic) & (parabolic < q[:, i + 1])
+            q[:, i] = np.where(move, np.where(ok, parabolic, linear), q[:, i])
+            n[:, i] += np.where(move, s, 0.0)
+
+
+class WindowedQuantile:
+    """P² quantiles over roughly the last ``window`` samples, still in constant memory.
+
+    Plain P² summarizes the whole stream, so after a level shift its
+    estimates barely move. Here two P² estimators run half a window apart
+    and each restarts after ``window`` samples; ``value`` reads the one that
+    has run longer, i.e. the last ``window / 2`` to ``window`` samples.
+    """
+
+    def __init__(self, p, n, window):
+        self.window = max(10, int(window))
+        self._estimators = [P2Quantile(p, n), P2Quantile(p, n)]
+        self.count = 0
+
+    @property
+    def value(self):
+        return max(self._estimators, key=lambda e: e.count).value
+
+    def update(self, x):
+        first, second = self._estimators
+        first.update(x)
+        # The second estimator starts half a window late, so their restarts alternate
+        if self.count >= self.window // 2:
+            second.update(x)
+        self.count += 1
+        for estimator in self._estimators:
+            if estimator.count >= self.window:
+                estimator.reset()
+
+
+class _DetectorReads:
+    """Level and flag reads shared by the live detectors and their snapshots."""
+
+    def level(self):
+        return np.minimum(self.active().sum(axis=0), CRITICAL).astype(np.int8)
+
+    def levels(self):
+        """``{sensor: level}`` as ints (0 normal, 1 warning, 2 critical)."""
+        return dict(zip(self.columns, self.level().tolist()))
+
+    def flags(self):
+        """``{sensor: [flag, ...]}`` for sensors with active flags."""
+        active = self.active()
+        return {c: [FLAGS[f] for f in np.flatnonzero(active[:, i])]
+                for i, c in enumerate(self.columns) if active[:, i].any()}
+
+
+class DetectorSnapshot(_DetectorReads):
+    """Active flags of ``StreamingDetectors`` at one step; never changes."""
+
+    def __init__(self, columns, active):
+        self.columns = columns
+        self._active = active.copy()
+        self._active.flags.writeable = False
+
+    def active(self):
+        return self._active
+
+
+class StreamingDetectors(_DetectorReads):
+    """Online detectors for ``columns``; ``update`` takes one value per sensor."""
+
+    def __init__(self, columns, alpha=0.05, slow_alpha=0.005, z_threshold=5.0, cusum_k=1.0, cusum_h=15.0,
+                 ph_delta=1.0, ph_lambda=200.0, iqr_fence=3.0, quantile_window=2000, warmup=60, hold=30):
+        self.columns = list(columns)
+        s = len(self.columns)
+        self.alpha, self.slow_alpha = alpha, slow_alpha
+        self.z_threshold, self.cusum_k, self.cusum_h = z_threshold, cusum_k, cusum_h
+        self.ph_delta, self.ph_lambda, self.iqr_fence = ph_delta, ph_lambda, iqr_fence
+        self.warmup, self.hold = warmup, hold
+
+        self.mean = np.zeros(s)
+        self.var = np.zeros(s)
+        self.slow_mean = np.zeros(s)
+        self.cusum = np.zeros((2, s))           # high, low
+        self.ph = np.zeros((2, s))              # cumulative deviation, up / down
+        self.ph_min = np.zeros((2, s))
+        # q25 of every sensor, then q75, over the last quantile_window / 2 to quantile_window samples
+        self.quartiles = WindowedQuantile(np.repeat([0.25, 0.75], s), 2 * s, quantile_window)
+        self.last_fired = np.full((len(FLAGS), s), -(10 ** 9), dtype=np.int64)
+        self.steps = 0
+        self.z = np.zeros(s)
+
+    # ---- Updates ----
+
+    def update(self, x):
+        """Advance every sensor by one sample; returns the per-sensor level (int8)."""
+        x = np.asarray(x, dtype=np.float64)
+        if self.steps == 0:
+            self.mean[:] = x
+            self.slow_mean[:] = x
+        step = self.steps
+        self.steps += 1
+
+        # EWMA / EWMV (West's incremental form); z uses the baseline before this sample
+        diff = x - self.mean
+        scale = np.sqrt(self.var) + 1e-9
+        z = self.z = diff / scale
+        incr = self.alpha * diff
+        self.mean += incr
+        self.var = (1 - self.alpha) * (self.var + diff * incr)
+
+        # CUSUM on the z-score, reset after an alarm
+        self.cusum[0] = np.maximum(0.0, self.cusum[0] + z - self.cusum_k)
+        self.cusum[1] = np.maximum(0.0, self.cusum[1] - z - self.cusum_k)
+        shift = (self.cusum > self.cusum_h).any(axis=0)
+
+        # Page-Hinkley against the slow baseline, in units of the fast std
+        dev = (x - self.slow_mean) / scale
+        self.slow_mean += self.slow_alpha * (x - self.slow_mean)
+        self.ph[0] += dev - self.ph_delta
+        self.ph[1] += -dev - self.ph_delta
+        np.minimum(self.ph_min, self.ph, out=self.ph_min)
+        drift_pair = self.ph - self.ph_min > self.ph_lambda
+        drift = drift_pair.any(axis=0)
+
+        # Tukey fences on the windowed quartiles (checked before this sample joins them)
+        q25, q75 = np.split(self.quartiles.value, 2)
+        fence = self.iqr_fence * (q75 - q25)
+        out_of_range = (x < q25 - fence) | (x > q75 + fence)
+        self.quartiles.update(np.concatenate([x, x]))
+
+        if step >= self.warmup:
+            fired = np.stack([np.abs(z) > self.z_threshold, shift, drift, out_of_range])
+            self.last_fired[fired] = step
+            self.cusum[:, shift] = 0.0
+            self.ph[drift_pair] = 0.0
+            self.ph_min[drift_pair] = 0.0
+        else:
+            # Baselines are still settling; don't let the tests accumulate yet
+            self.cusum[:] = 0.0
+            self.ph[:] = 0.0
+            self.ph_min[:] = 0.0
+        return self.level()
+
+    def update_many(self, values):
+        """Feed a ``(steps, sensors)`` block row by row; returns the levels after the last row."""
+        level = self.level()
+        for row in np.asarray(values, dtype=np.float64):
+            level = self.update(row)
+        return level
+
+    def update_frame(self, df):
+        return self.update_many(df[self.columns].to_numpy(dtype=np.float64))
+
+    # ---- State ----
+
+    def active(self):
+        """(len(FLAGS), sensors) bool: flags fired within the last ``hold`` steps."""
+        return self.steps - 1 - self.last_fired < self.hold
+
+    def snapshot(self):
+        """Read-only copy of the current flags, safe to share across threads."""
+        return DetectorSnapshot(self.columns, self.active())
+
+
+def stage_severity(detector_levels, severity=None, rules=None):
+    """Fold detector levels into a stage severity map (``{stage: "normal"|...}``).
+
+    Each sensor raises its stage to at least its detector level; ``severity``
+    (e.g. from ``evaluate_row``) is the starting point.
+    """
+    rules = rules or RULES
+    merged = {stage: LEVELS.index((severity or {}).get(stage, "normal")) for stage in STAGES}
+    for sensor, level in detector_levels.items():
+        stage = rules[sensor]["stage"] if sensor in rules else DETECTOR_STAGES.get(sensor)
+        if stage in merged:
+            merged[stage] = max(merged[stage], int(level))
+    return {stage: LEVELS[max(level, NORMAL)] for stage, level in merged.items()}
@@ -0,0 +1,30 @@
+"""
+Offline stand-in for ``vertexai.agent_engines.AdkApp``.
+
+Streams canned events in the same shape as ``async_stream_query`` with a
+configurable latency, so the copilot path can be exercised and benchmarked
+without Gemini.
+"""
+import asyncio
+
+
+class FakeAdkApp:
+    def __init__(self, chunks=None, chunk_delay=0.05, first_token_delay=0.5, tool_call=None):
+        self.chunks = chunks or [
+            "1. Trim kiln fuel rate slightly to hold burning zone near 1450°C.\n",
+            "2. Raise alternative fuel substitution in small steps.\n",
+            "3. Check separator efficiency to bring mill power down.\n",
+        ]
+        self.chunk_delay = chunk_delay
+        self.first_token_delay = first_token_delay
+        self.tool_call = tool_call      # e.g. {"name": "analyze_plant", "args": {...}}
+        self.calls = 0
+
+    async def async_stream_query(self, user_id, message, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.first_token_delay)
+        if self.tool_call is not None:
+            yield {"content": {"parts": [{"function_call": self.tool_call}]}}
+        for chunk in self.chunks:
+            await asyncio.sleep(self.chunk_delay)
+            yield {"content": {"parts": [{"text": chunk}]}}
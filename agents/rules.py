@@ -0,0 +1,187 @@
+"""
+Declarative severity rules shared by the AI copilot (``analyze_plant``) and
+the KPI cards, with a NumPy evaluator that scores whole frames at once.
+
+Each metric has a ``normal`` and a ``warning`` band, both ``[low, high)``,
+or ``[low, high]`` with ``"inclusive": "both"``. Values inside ``normal``
+are normal, values inside ``warning`` but outside ``normal`` are warnings,
+anything else is critical. Set
+``SEVERITY_RULES_PATH`` to a JSON file with the same shape to override.
+"""
+import json
+import os
+
+import numpy as np
+
+INF = float("inf")
+
+LEVELS = ("normal", "warning", "critical")
+NORMAL, WARNING, CRITICAL = 0, 1, 2
+UNKNOWN = -1
+ICONS = {NORMAL: "🟢", WARNING: "🟠", CRITICAL: "🔴", UNKNOWN: "❓"}
+STAGES = ["Raw", "Preheat", "Clinker", "Grind", "Sustain"]
+
+DEFAULT_RULES = {
+    "kiln_temp_C": {
+        "stage": "Preheat",
+        "normal": [1430, 1470],
+        "warning": [1400, 1500],
+        "inclusive": "both",
+        "messages": {
+            "high": ["⚠️ Kiln temperature is high, monitor fuel closely.",
+                     "🔥 Kiln temperature is critical! Reduce fuel immediately."],
+            "low": ["⚠️ Kiln temperature is low; check burner and feed.",
+                    "🥶 Kiln temperature is critically low; clinkering at risk."],
+        },
+    },
+    "mill_power_kW": {
+        "stage": "Grind",
+        "normal": [-INF, 4200],
+        "warning": [-INF, 4600],
+        "messages": {
+            "high": ["Mill power is high; check grinding efficiency.",
+                     "Critical grinding load; immediate action required."],
+        },
+    },
+    "AF_rate_percent": {
+        "stage": "Sustain",
+        "normal": [15, INF],
+        "warning": [10, INF],
+        "messages": {
+            "low": ["Increase alternative fuel rate to improve sustainability.",
+                    "Critical low AF rate; sustainability compromised."],
+        },
+    },
+    "clinker_free_lime_percent": {
+        "stage": "Clinker",
+        "normal": [-INF, 1.5],
+        "warning": [-INF, 2.5],
+        "messages": {
+            "high": ["Free lime is high; adjust kiln process.",
+                     "Clinker free lime is critically high; poor quality risk."],
+        },
+    },
+    "CO2_emission_kgpt": {
+        "stage": "Sustain",
+        "normal": [-INF, 850],
+        "warning": [-INF, 900],
+        "messages": {
+            "high": ["High CO₂ emission; consider process efficiency improvements.",
+                     "Critical CO₂ emissions; energy optimization needed."],
+        },
+    },
+}
+
+
+def load_rules(path=None):
+    """Rules from ``path`` / ``SEVERITY_RULES_PATH`` if set, else the defaults."""
+    path = path or os.getenv("SEVERITY_RULES_PATH")
+    if not path:
+        return DEFAULT_RULES
+    with open(path) as f:
+        rules = json.load(f)
+    for rule in rules.values():
+        # JSON has no infinity literal; null means an open end
+        for band in ("normal", "warning"):
+            lo, hi = rule[band]
+            rule[band] = [-INF if lo is None else lo, INF if hi is None else hi]
+    return rules
+
+
+RULES = load_rules()
+
+
+# ---- Vectorized evaluation ----
+
+def _column(data, name):
+    if hasattr(data, "column"):   # SensorHistory window
+        return data.column(name)
+    return np.asarray(data[name], dtype=np.float64)
+
+
+def score_values(values, rule):
+    """Severity level (int8: -1 unknown, 0 normal, 1 warning, 2 critical) per value."""
+    v = np.asarray(values, dtype=np.float64)
+    n_lo, n_hi = rule["normal"]
+    w_lo, w_hi = rule["warning"]
+    below = np.less_equal if rule.get("inclusive") == "both" else np.less
+    level = np.full(v.shape, CRITICAL, dtype=np.int8)
+    level[(v >= w_lo) & below(v, w_hi)] = WARNING
+    level[(v >= n_lo) & below(v, n_hi)] = NORMAL
+    level[np.isnan(v)] = UNKNOWN
+    return level
+
+
+def score_frame(data, rules=None):
+    """Score every rule metric over a DataFrame, dict of arrays or SensorHistory.
+
+    Returns ``{metric: int8 level array}``; one vectorized pass per metric.
+    """
+    rules = rules or RULES
+    return {metric: score_values(_column(data, metric), rule) for metric, rule in rules.items()}
+
+
+def stage_levels(levels, rules=None):
+    """Per-stage level arrays: the worst metric level mapped to each stage."""
+    rules = rules or RULES
+    n = len(next(iter(levels.values()))) if levels else 0
+    stages = {stage: np.zeros(n, dtype=np.int8) for stage in STAGES}
+    for metric, level in levels.items():
+        stage = rules[metric]["stage"]
+        np.maximum(stages[stage], level, out=stages[stage])
+    return stages
+
+
+def alarm_minutes(data, rules=None, minutes_per_row=1.0):
+    """Minutes spent in warning and in critical, per metric."""
+    return {
+        metric: {
+            "warning": float(np.count_nonzero(level == WARNING)) * minutes_per_row,
+            "critical": float(np.count_nonzero(level == CRITICAL)) * minutes_per_row,
+        }
+        for metric, level in score_frame(data, rules).items()
+    }
+
+
+# ---- Single reading ----
+
+def score_value(value, rule):
+    """Scalar twin of ``score_values`` for one reading (no NumPy overhead)."""
+    if value is None or value != value:
+        return UNKNOWN
+    closed = rule.get("inclusive") == "both"
+    n_lo, n_hi = rule["normal"]
+    if n_lo <= value and (value <= n_hi if closed else value < n_hi):
+        return NORMAL
+    w_lo, w_hi = rule["warning"]
+    return WARNING if w_lo <= value and (value <= w_hi if closed else value < w_hi) else CRITICAL
+
+
+def evaluate_row(row, rules=None):
+    """Score one reading: ``(levels, stage_severity, suggestions)``.
+
+    ``stage_severity`` maps each stage to "normal"/"warning"/"critical" as used
+    by ``render_process_diagram``.
+    """
+    rules = rules or RULES
+    levels = {}
+    suggestions = []
+    severity = {stage: NORMAL for stage in STAGES}
+    for metric, rule in rules.items():
+        value = row.get(metric)
+        level = score_value(value, rule)
+        levels[metric] = level
+        if level > NORMAL:
+            direction = "low" if value < rule["normal"][0] else "high"
+            messages = rule.get("messages", {}).get(direction)
+            if messages:
+                suggestions.append(messages[level - 1])
+        severity[rule["stage"]] = max(severity[rule["stage"]], level)
+    return levels, {stage: LEVELS[max(level, NORMAL)] for stage, level in severity.items()}, suggestions
+
+
+def severity_icon(metric, value, rules=None):
+    rules = rules or RULES
+    if metric not in rules:
+        return ICONS[UNKNOWN]
+    return ICONS[score_value(value, rules[metric])]
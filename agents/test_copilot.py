@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from agents.copilot import CopilotCache
+
+
+def test_concurrent_callers_share_one_fetch():
+    cache = CopilotCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(3)))
+
+    assert asyncio.run(main()) == ["answer"] * 3
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 2
+    assert cache.get("k") == "answer"
+
+
+def test_cancelled_waiter_does_not_cancel_shared_fetch():
+    cache = CopilotCache()
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def fetch():
+            await gate.wait()
+            return "answer"
+
+        owner = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        cancelled = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        survivor = asyncio.create_task(cache.get_or_fetch("k", fetch))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return await owner, await survivor
+
+    assert asyncio.run(main()) == ("answer", "answer")
+    assert cache.get("k") == "answer"
+
+
+def test_waiter_refetches_when_owner_is_cancelled():
+    cache = CopilotCache()
+
+    async def main():
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def fast():
+            return "answer"
+
+        owner = asyncio.create_task(cache.get_or_fetch("k", slow))
+        await started.wait()
+        waiter = asyncio.create_task(cache.get_or_fetch("k", fast))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await waiter
+
+    assert asyncio.run(main()) == "answer"
+
+
+def test_failed_fetch_reaches_waiters_and_is_not_cached():
+    cache = CopilotCache()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch("k", fetch) for _ in range(2)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.get("k") is None
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from agents.copilot import CopilotCache
+from agents.copilot_worker import CopilotWorker
+from agents.fake_agent import FakeAdkApp
+
+CHUNKS = ["one ", "two ", "three"]
+
+
+def wait_done(*replies, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not all(r.done for r in replies) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert all(r.done for r in replies)
+
+
+@pytest.fixture
+def app():
+    return FakeAdkApp(chunks=CHUNKS, chunk_delay=0.02, first_token_delay=0.05)
+
+
+@pytest.fixture
+def worker(app):
+    worker = CopilotWorker(app, cache=CopilotCache())
+    yield worker
+    worker.stop()
+
+
+def test_reply_streams_to_done(worker):
+    reply = worker.submit("session/suggest", "k1", "prompt")
+    assert not reply.done
+    wait_done(reply)
+    assert reply.status == "done"
+    assert reply.text == "".join(CHUNKS)
+    assert worker.latest("session/suggest") is reply
+
+
+def test_same_key_returns_the_pending_reply(worker, app):
+    first = worker.submit("session/suggest", "k1", "prompt")
+    assert worker.submit("session/suggest", "k1", "prompt") is first
+    wait_done(first)
+    assert app.calls == 1
+
+
+def test_new_key_supersedes_and_cancels_the_streaming_reply(worker):
+    old = worker.submit("session/suggest", "k1", "old prompt")
+    deadline = time.monotonic() + 5
+    while old.status != "streaming" and time.monotonic() < deadline:
+        time.sleep(0.005)
+    new = worker.submit("session/suggest", "k2", "new prompt")
+    wait_done(old, new)
+    assert old.status == "cancelled"
+    assert new.status == "done"
+    assert worker.cancelled == 1
+    assert worker.latest("session/suggest") is new
+    # The cancelled answer was never cached; the new one was
+    assert worker.cache.get("k1") is None
+    assert worker.cache.get("k2")["text"] == "".join(CHUNKS)
+
+
+def test_channels_do_not_supersede_each_other(worker):
+    a = worker.submit("a/suggest", "k1", "prompt")
+    b = worker.submit("b/suggest", "k2", "prompt")
+    wait_done(a, b)
+    assert (a.status, b.status) == ("done", "done")
+    assert worker.cancelled == 0
+
+
+def test_factory_is_built_once_on_the_worker_thread(app):
+    threads = []
+
+    def factory():
+        threads.append(threading.current_thread())
+        return app
+
+    worker = CopilotWorker(factory, cache=CopilotCache())
+    try:
+        assert threads == []
+        wait_done(worker.submit("s/suggest", "k1", "p"), worker.submit("s/chat", "k2", "p"))
+    finally:
+        worker.stop()
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
@@ -0,0 +1,45 @@
+import numpy as np
+
+from agents.detectors import FLAGS, P2Quantile, StreamingDetectors, WindowedQuantile
+
+RANGE = FLAGS.index("range")
+
+
+def test_p2_quartiles_match_numpy():
+    rng = np.random.default_rng(0)
+    data = rng.normal(size=(5000, 3))
+    estimator = P2Quantile(np.repeat([0.25, 0.75], 3), 6)
+    for row in data:
+        estimator.update(np.concatenate([row, row]))
+    expected = np.concatenate(np.quantile(data, [0.25, 0.75], axis=0))
+    np.testing.assert_allclose(estimator.value, expected, atol=0.05)
+
+
+def test_windowed_quantile_follows_level_shift():
+    rng = np.random.default_rng(1)
+    estimator = WindowedQuantile([0.5], 1, window=400)
+    for x in rng.normal(0.0, 1.0, 2000):
+        estimator.update(np.array([x]))
+    assert abs(estimator.value[0]) < 0.3
+    for x in rng.normal(10.0, 1.0, 400):
+        estimator.update(np.array([x]))
+    assert abs(estimator.value[0] - 10.0) < 0.3
+
+
+def test_level_shift_moves_range_fences():
+    rng = np.random.default_rng(2)
+    detectors = StreamingDetectors(["x"], quantile_window=400, hold=1)
+    before = rng.normal(0.0, 1.0, 1000)
+    after = rng.normal(20.0, 1.0, 1000)
+    detectors.update_many(before[:, None])
+    q25, q75 = np.split(detectors.quartiles.value, 2)
+    assert -1.0 < q25[0] < q75[0] < 1.0
+
+    detectors.update_many(after[:, None])
+    q25, q75 = np.split(detectors.quartiles.value, 2)
+    assert 19.0 < q25[0] < q75[0] < 21.0
+    # The new level is in range now; the old one is outside the fences
+    detectors.update([20.0])
+    assert not detectors.active()[RANGE, 0]
+    detectors.update([0.0])
+    assert detectors.active()[RANGE, 0]
@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from agents.rules import CRITICAL, NORMAL, UNKNOWN, WARNING, evaluate_row, score_frame, score_value, stage_levels
+
+LEVEL = {"🟢": NORMAL, "🟠": WARNING, "🔴": CRITICAL}
+
+
+def old_kpi_level(metric, value):
+    """The KPI cards' row-wise severity before the shared rule table."""
+    if metric == "kiln_temp_C":
+        if 1430 <= value <= 1470: return LEVEL["🟢"]
+        elif 1400 <= value < 1430 or 1470 < value <= 1500: return LEVEL["🟠"]
+        else: return LEVEL["🔴"]
+    if metric == "mill_power_kW":
+        return LEVEL["🟢"] if value < 4200 else LEVEL["🟠"] if value < 4600 else LEVEL["🔴"]
+    if metric == "AF_rate_percent":
+        return LEVEL["🟢"] if value >= 15 else LEVEL["🟠"] if value >= 10 else LEVEL["🔴"]
+    if metric == "clinker_free_lime_percent":
+        return LEVEL["🟢"] if value < 1.5 else LEVEL["🟠"] if value < 2.5 else LEVEL["🔴"]
+    if metric == "CO2_emission_kgpt":
+        return LEVEL["🟢"] if value < 850 else LEVEL["🟠"] if value < 900 else LEVEL["🔴"]
+
+
+def readings():
+    rng = np.random.default_rng(0)
+    edges = {
+        "kiln_temp_C": [1399.9, 1400, 1430, 1450, 1470, 1470.1, 1500, 1500.1],
+        "mill_power_kW": [4199.9, 4200, 4599.9, 4600],
+        "AF_rate_percent": [9.9, 10, 14.9, 15],
+        "clinker_free_lime_percent": [1.49, 1.5, 2.49, 2.5],
+        "CO2_emission_kgpt": [849.9, 850, 899.9, 900],
+    }
+    random = {
+        "kiln_temp_C": rng.normal(1450, 40, 500),
+        "mill_power_kW": rng.normal(4300, 300, 500),
+        "AF_rate_percent": rng.normal(14, 4, 500),
+        "clinker_free_lime_percent": rng.normal(1.8, 0.6, 500),
+        "CO2_emission_kgpt": rng.normal(860, 40, 500),
+    }
+    n = max(len(v) for v in edges.values())
+    # Every boundary value, cycled so all columns share one length, then random readings
+    return pd.DataFrame({m: np.concatenate([np.resize(edges[m], n), random[m]]) for m in edges})
+
+
+def test_score_frame_matches_old_kpi_severity():
+    df = readings()
+    levels = score_frame(df)
+    for metric, level in levels.items():
+        expected = [old_kpi_level(metric, v) for v in df[metric]]
+        np.testing.assert_array_equal(level, expected, err_msg=metric)
+
+
+def test_score_frame_matches_row_wise_evaluation():
+    df = readings()
+    levels = score_frame(df)
+    stages = stage_levels(levels)
+    for i, row in enumerate(df.to_dict("records")):
+        row_levels, severity, _ = evaluate_row(row)
+        assert row_levels == {metric: int(level[i]) for metric, level in levels.items()}
+        assert severity == {stage: ("normal", "warning", "critical")[level[i]] for stage, level in stages.items()}
+
+
+def test_missing_values_are_unknown():
+    rules = {"kiln_temp_C": {"stage": "Preheat", "normal": [0, 1], "warning": [0, 2]}}
+    assert score_value(None, rules["kiln_temp_C"]) == UNKNOWN
+    assert score_value(math.nan, rules["kiln_temp_C"]) == UNKNOWN
+    assert score_frame({"kiln_temp_C": [np.nan]}, rules)["kiln_temp_C"][0] == UNKNOWN
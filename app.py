@@ -1,90 +1,187 @@
 import time
-import json
-import tempfile
+import uuid
 import streamlit as st
-import pandas as pd
-from dotenv import load_dotenv
-from simulation.batch_generator import generate_data, upload_to_gcs
-from services.cloud.bigquery_client import load_csv_from_gcs, query_sample
+from services.cloud.history_reader import IncrementalHistoryReader
+from services.cloud.ingest_buffer import IngestBuffer, BigQuerySink
+from services.cloud.tables import ensure_sensor_table
+from services.cloud.bigquery_client import last_query_stats
+from simulation.parallel import bulk_push
+from simulation.stream_producer import ConsumerSink, StreamProducer
+from dashboard.feed import LiveFeed
+from dashboard.fleet import render_fleet
+from dashboard.rollups import TREND_WINDOWS
 from dashboard.kpis import render_kpis
-from dashboard.tabs import render_tabs
+from dashboard.tabs import DashboardTabs, render_tabs
+from dashboard.perf import render_perf_exports, render_perf_panel
+from services.metrics import REGISTRY, timer
 from config import *
 
 # Streamlit page config
 st.set_page_config(layout="wide", page_title="CemMind AI Dashboard", page_icon="🏭")
 
-# Load historical data
-@st.cache_data
+# Load historical data: incremental reader with an on-disk cache, one per process
+@st.cache_resource
+def get_history_reader():
+    # Partitioned by day, clustered by equipment; queries only read the days they ask for
+    ensure_sensor_table(PROJECT, DATASET, TABLE)
+    return IncrementalHistoryReader(PROJECT, DATASET, TABLE)
+
 def load_historical(limit=200):
-    df = query_sample(PROJECT, DATASET, TABLE)
-    return df.tail(limit)
+    reader = get_history_reader()
+    reader.refresh(limit)
+    return reader.tail(limit)
+
+# One background ingestion buffer per process, shared by all sessions
+@st.cache_resource
+def get_ingest_buffer():
+    sink = BigQuerySink(PROJECT, DATASET, TABLE, GCS_BUCKET, GCS_DEST_PREFIX, staging_format=STAGING_FORMAT)
+    return IngestBuffer(sink, max_rows=INGEST_MAX_ROWS, max_age=INGEST_MAX_AGE_SEC,
+                        max_pending_rows=INGEST_MAX_PENDING_ROWS).start()
+
+ingest = get_ingest_buffer()
+
+# Local scrape endpoint (/metrics, /metrics.json) for the process-wide stage timings
+@st.cache_resource
+def start_metrics_server():
+    return REGISTRY.serve(METRICS_PORT) if METRICS_PORT else None
 
-if "df_sim" not in st.session_state:
-    st.session_state.df_sim = load_historical()
+start_metrics_server()
+
+# The metrics file is rewritten by one thread per process, not by every session's tick
+@st.cache_resource
+def start_metrics_export():
+    return REGISTRY.export_every(METRICS_EXPORT_PATH, FEED_INTERVAL_SEC) if METRICS_EXPORT_PATH else None
+
+start_metrics_export()
 
 st.sidebar.header("⚙️ Controls")
 rows = st.sidebar.slider("Rows to Generate", 100, 2000, 500, step=100)
-history_points = st.sidebar.slider("History Points", 50, 500, 200, step=50)
+history_points = st.sidebar.slider("History Points", 50, 10_000, 200, step=50)
 refresh_rate = st.sidebar.slider("Refresh Rate (sec)", 1, 10, 3)
+trend_window = TREND_WINDOWS[st.sidebar.selectbox("Trend Window", list(TREND_WINDOWS))]
+# The fleet size is a process setting: one shared feed, one series per kiln in the table
+kilns = FLEET_ASSETS
+fleet_mode = kilns > 1
+st.sidebar.caption(f"🏭 Kilns: {kilns} (FLEET_ASSETS)")
 
 if st.sidebar.button("🚀 Push Bulk Data"):
-    with st.spinner("Generating synthetic plant data..."):
-        generate_data(rows)
-    with st.spinner("Uploading to GCS..."):
-        gcs_path = upload_to_gcs(LOCAL_CSV, GCS_BUCKET, GCS_DEST_PREFIX)
-    with st.spinner("Loading into BigQuery..."):
-        load_csv_from_gcs(PROJECT, DATASET, TABLE, gcs_path, write_disposition="WRITE_APPEND")
-    st.sidebar.success("✅ Bulk data pushed to BigQuery")
-
-# Simulation state
+    with st.spinner("Generating, uploading and loading synthetic plant data..."):
+        bulk_stats = bulk_push(rows, GCS_BUCKET, GCS_DEST_PREFIX, PROJECT, DATASET, TABLE,
+                               kilns=kilns, workers=BULK_WORKERS, fmt=STAGING_FORMAT)
+    st.sidebar.success(f"✅ Bulk data pushed to BigQuery ({bulk_stats['shards']} shards, "
+                       f"{bulk_stats['total_s']:.1f}s)")
+
+# One live feed per process: simulates, ingests and keeps the history once for every session
+@st.cache_resource
+def get_live_feed(kilns):
+    capacity = FLEET_HISTORY_POINTS if kilns > 1 else FEED_HISTORY_POINTS
+    load_historical(capacity)   # pick up rows newer than the on-disk cache
+    reader = get_history_reader()
+    source = None
+    if FEED_SOURCE == "stream":
+        # Readings come from the async stream producer, handed over through an in-process sink
+        source = ConsumerSink()
+        StreamProducer([source], devices=kilns, rate_hz=1 / FEED_INTERVAL_SEC).run_in_thread()
+    return LiveFeed(kilns, reader.tail(reader.max_rows), capacity=capacity,
+                    interval_s=FEED_INTERVAL_SEC, ingest=ingest, idle_s=FEED_IDLE_SEC,
+                    trend_points=CHART_POINTS, source=source).start()
+
+# Per-session state is just a cursor into the shared feed
 if "simulate" not in st.session_state:
     st.session_state.simulate = False
-if "df_sim" not in st.session_state:
-    st.session_state.df_sim = load_historical(history_points)
+viewer = st.session_state.setdefault("feed_viewer", str(uuid.uuid4()))
+feed = get_live_feed(kilns)
+snapshot = feed.latest
+
+# Fleet mode: the overview reads the newest reading per kiln; drill-down copies one kiln's rows
+if fleet_mode:
+    selected_kiln = st.sidebar.selectbox("Kiln Detail", feed.twin.equipment_ids)
+    fleet_points = min(history_points, FLEET_HISTORY_POINTS)
 
 col1, col2 = st.sidebar.columns(2)
 if col1.button("▶️ Start Simulation"):
     st.session_state.simulate = True
 if col2.button("⏹ Stop Simulation"):
     st.session_state.simulate = False
+    feed.leave(viewer)
+
+feed_stats = feed.stats()
+st.sidebar.caption(f"📡 Live feed: tick {feed_stats['seq']} · {feed_stats['viewers']} watching · "
+                   f"{'running' if feed_stats['running'] else 'paused'}")
+ingest_stats = ingest.stats()
+st.sidebar.caption(
+    f"📦 Ingest: {ingest_stats['pending_rows']} pending · {ingest_stats['dropped_rows']} dropped · "
+    f"{ingest_stats['avg_rows_per_flush']:.0f} rows/flush · "
+    f"{ingest_stats['last_flush_latency_s']:.2f}s last flush"
+)
+query_stats = last_query_stats()
+if query_stats:
+    st.sidebar.caption(f"🔎 Last query: {query_stats['rows']} rows · "
+                       f"{query_stats['bytes_processed'] / 1e6:.2f} MB scanned")
+perf_expander = st.sidebar.expander("⏱️ Performance")
+perf_placeholder = perf_expander.empty()
+render_perf_exports(perf_expander)
 
 st.title("🏭 CemMind AI – Smart Cement Plant Dashboard")
 
 # Placeholders
 kpi_placeholder = st.empty()
-tab_placeholder = st.empty()
+tabs = DashboardTabs()      # drawn once per run; every tick refills it
 
 
-while st.session_state.simulate:
-    # Generate 1 new row
-    df_new = generate_data(1)
-    df = pd.concat([st.session_state.df_sim, df_new], ignore_index=True)
-    df['step'] = range(len(df))
-    st.session_state.df_sim = df
-
-    latest = df.iloc[-1]
+def render_snapshot(snapshot):
+    """Draw one feed snapshot at this session's settings; returns the copilot panels."""
+    if fleet_mode:
+        # Fleet overview grid plus the normal tabs for the selected kiln only
+        with kpi_placeholder.container():
+            render_fleet(snapshot.fleet, snapshot.fleet_levels)
+        return render_tabs(feed.asset(selected_kiln, fleet_points), tabs=tabs, seq=snapshot.seq)
+    history = snapshot.view(history_points)
     with kpi_placeholder.container():
-        render_kpis(latest)
-    with tab_placeholder.container():
-        render_tabs(df)
+        render_kpis(history.latest())
+    return render_tabs(history, window_s=trend_window, detectors=snapshot.detectors,
+                       long_range=feed.long_range(snapshot, trend_window), tabs=tabs, seq=snapshot.seq)
 
-    # Push to GCS & BigQuery
-    gcs_path = upload_to_gcs(LOCAL_CSV, GCS_BUCKET, GCS_DEST_PREFIX)
-    load_csv_from_gcs(PROJECT, DATASET, TABLE, gcs_path, write_disposition="WRITE_APPEND")
 
-    # Refresh interval
-    for _ in range(refresh_rate):
-        if not st.session_state.simulate:
-            break
-        time.sleep(1)
+def publish_metrics():
+    render_perf_panel(perf_placeholder)
+
+
+panels = []
+ticks = 0
+cursor = -1     # this run has drawn nothing yet, so the first wait returns the newest snapshot
+while st.session_state.simulate:
+    # Generation and ingest happen once in the shared feed; this session only draws what it publishes
+    snapshot = feed.wait(viewer, cursor, timeout=1.0, window_s=trend_window)
+    if snapshot.seq <= cursor:
+        continue
+    cursor = snapshot.seq
+    with timer("app.tick") as tick:
+        panels = render_snapshot(snapshot)
+        tick.items = len(snapshot.rows)
+    publish_metrics()
+    ticks += 1
+    if SIM_MAX_TICKS and ticks >= SIM_MAX_TICKS:
+        st.session_state.simulate = False
+        feed.leave(viewer)
+
+    # Refresh interval; copilot text streams into its panels meanwhile
+    deadline = time.monotonic() + (refresh_rate if TICK_INTERVAL_SEC is None else TICK_INTERVAL_SEC)
+    while st.session_state.simulate and time.monotonic() < deadline:
+        for panel in panels:
+            panel.refresh()
+        time.sleep(min(0.25, max(0.0, deadline - time.monotonic())))
+
+# Display once for historical data if simulation not running (a run that ended after SIM_MAX_TICKS already has)
+if not ticks and (snapshot.fleet.rows if fleet_mode else len(snapshot.history)):
+    panels = render_snapshot(snapshot)
+    publish_metrics()
 
-# Display once for historical data if simulation not running
 if not st.session_state.simulate:
-    df = st.session_state.df_sim.copy()
-    df['step'] = range(len(df))
-    latest = df.iloc[-1]
-    with kpi_placeholder.container():
-        render_kpis(latest)
-    with tab_placeholder.container():
-        render_tabs(df)
+    # Everything else is on screen; keep streaming copilot text until it is done
+    deadline = time.monotonic() + COPILOT_WAIT_SEC
+    while panels and time.monotonic() < deadline:
+        if all([panel.refresh() for panel in panels]):
+            break
+        time.sleep(0.25)
 
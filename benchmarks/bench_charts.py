@@ -0,0 +1,75 @@
+"""
+Trend chart render time and payload bytes against history length: the old
+Plotly Express rebuild of every point vs. LTTB-downsampled cached figures.
+
+    python -m benchmarks.bench_charts
+    python -m benchmarks.bench_charts --sizes 1000 100000 --points 600 --json charts.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import plotly.express as px
+
+from dashboard.plotting import FigureCache
+from simulation.twin import DigitalTwin
+
+DEFAULT_SIZES = [500, 5_000, 50_000, 500_000]
+SERIES = ["kiln_temp_C", "mill_power_kW"]
+
+
+def _timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fig = fn()
+        payload = fig.to_json()     # what goes over the websocket
+        best = min(best, time.perf_counter() - t0)
+    return best, len(payload.encode())
+
+
+def bench_size(n, points, repeat):
+    df = DigitalTwin(seed=3, interval_s=1).generate(n)
+    steps = np.arange(n)
+    series = {c: df[c].to_numpy() for c in SERIES}
+
+    def rebuild():
+        return px.line({"step": steps, **series}, x="step", y=SERIES, title="Kiln Temp & Mill Power",
+                       template="plotly_white")
+
+    cache = FigureCache(points)
+    cache.line("bench", "Kiln Temp & Mill Power", steps, series)   # first build outside the timing
+
+    def cached():
+        return cache.line("bench", "Kiln Temp & Mill Power", steps, series)
+
+    results = []
+    for mode, fn in (("px_rebuild", rebuild), ("lttb_cached", cached)):
+        render_s, payload = _timed(fn, repeat)
+        results.append({"rows": n, "mode": mode, "render_s": round(render_s, 4), "payload_bytes": payload})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--points", type=int, default=600, help="LTTB point budget per series")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>9} {'mode':>12} {'render ms':>10} {'payload KB':>11}")
+    for n in args.sizes:
+        for r in bench_size(n, args.points, args.repeat):
+            results.append(r)
+            print(f"{r['rows']:>9} {r['mode']:>12} {r['render_s'] * 1e3:>10.1f} {r['payload_bytes'] / 1e3:>11.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Realtime wire formats: encode/decode throughput (msgs/sec) and bytes per
+message for the original per-reading ``json.dumps`` lines vs. batch
+NDJSON, columnar JSON (orjson when installed) and fixed-schema binary
+records.
+
+    python -m benchmarks.bench_codec
+    python -m benchmarks.bench_codec --batch 1000 100000 --json codec.json
+"""
+import argparse
+import json
+import time
+
+from simulation.codec import (decode_binary, decode_json_columns, decode_ndjson, encode_binary,
+                              encode_json_columns, encode_ndjson, orjson)
+from simulation.twin import FleetTwin, TWIN_COLUMNS
+
+DEFAULT_BATCHES = [100, 10_000, 100_000]
+
+
+def encode_json_lines(batch):
+    """The original path: a dict, an ISO timestamp, rounding and json.dumps per reading."""
+    lines = []
+    for row in batch.itertuples(index=False):
+        reading = {"timestamp": row.timestamp.isoformat() + "Z", "equipment_id": row.equipment_id}
+        reading.update({col: round(float(getattr(row, col)), 3) for col in TWIN_COLUMNS})
+        lines.append(json.dumps(reading))
+    return ("\n".join(lines) + "\n").encode()
+
+
+def decode_json_lines(data):
+    return [json.loads(line) for line in data.splitlines()]
+
+
+CODECS = {
+    "json_lines": (encode_json_lines, decode_json_lines),
+    "ndjson": (encode_ndjson, decode_ndjson),
+    "json_columns": (encode_json_columns, decode_json_columns),
+    "binary": (encode_binary, decode_binary),
+}
+
+
+def _best(fn, arg, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def bench(n, repeat):
+    assets = min(n, 500)
+    batch = FleetTwin(assets, seed=1).generate(-(-n // assets)).iloc[:n]
+    results = []
+    for name, (encode, decode) in CODECS.items():
+        encode_s, data = _best(encode, batch, repeat)
+        decode_s, _ = _best(decode, data, repeat)
+        results.append({
+            "batch": n,
+            "codec": name,
+            "bytes_per_msg": round(len(data) / n, 1),
+            "encode_msgs_per_s": round(n / encode_s),
+            "decode_msgs_per_s": round(n / decode_s),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch", type=int, nargs="+", default=DEFAULT_BATCHES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"orjson: {'yes' if orjson is not None else 'no (stdlib json fallback)'}")
+    results = []
+    print(f"{'batch':>8} {'codec':>13} {'B/msg':>7} {'encode msg/s':>13} {'decode msg/s':>13}")
+    for n in args.batch:
+        for r in bench(n, args.repeat):
+            results.append(r)
+            print(f"{r['batch']:>8} {r['codec']:>13} {r['bytes_per_msg']:>7.1f} "
+                  f"{r['encode_msgs_per_s']:>13,} {r['decode_msgs_per_s']:>13,}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
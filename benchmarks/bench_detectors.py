@@ -0,0 +1,53 @@
+"""
+Streaming detector throughput (samples/sec) against the number of sensors
+updated per step, e.g. one kiln (7) up to a 500-kiln fleet (3500).
+
+    python -m benchmarks.bench_detectors
+    python -m benchmarks.bench_detectors --sensors 7 700 --steps 5000 --json detectors.json
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from agents.detectors import StreamingDetectors
+
+DEFAULT_SENSORS = [7, 35, 70, 700, 3500]
+
+
+def bench(n_sensors, steps, seed=0):
+    values = np.random.default_rng(seed).standard_normal((steps, n_sensors))
+    detectors = StreamingDetectors(range(n_sensors))
+    t0 = time.perf_counter()
+    detectors.update_many(values)
+    elapsed = time.perf_counter() - t0
+    return {
+        "sensors": n_sensors,
+        "steps": steps,
+        "us_per_step": round(elapsed / steps * 1e6, 1),
+        "samples_per_s": round(steps * n_sensors / elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sensors", type=int, nargs="+", default=DEFAULT_SENSORS)
+    parser.add_argument("--steps", type=int, default=2000)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'sensors':>8} {'us/step':>9} {'samples/s':>12}")
+    for n in args.sensors:
+        r = bench(n, args.steps)
+        results.append(r)
+        print(f"{r['sensors']:>8} {r['us_per_step']:>9.1f} {r['samples_per_s']:>12,}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""
+End-to-end offline benchmark of the simulate → ingest → render loop.
+
+Everything runs against the local cloud backend (SQLite + filesystem) and
+the fake copilot, so no GCP or Gemini access is needed. Sections:
+
+* ``generation``  rows/s from the twins, one tick at a time, by asset count
+* ``ingest``      rows/s through ``IngestBuffer`` → ``BigQuerySink`` (stage, upload, load)
+* ``history``     per-tick cost of the ring buffers, rollups and detectors, by history size / asset count
+* ``severity``    rule scoring per reading, over the whole history, and across the fleet
+* ``app``         ``app.py`` itself, headless via Streamlit's ``AppTest``: per-stage
+                  p50/p95 from ``services.metrics`` and the rendered payload bytes
+* ``viewers``     N viewers on the shared ``LiveFeed`` vs. N sessions each simulating on their
+                  own: rows generated, CPU seconds and RSS growth as N grows
+
+Results go to stdout and, with ``--json``, to a file that later runs can be
+diffed against.
+
+    python -m benchmarks.bench_e2e --quick
+    python -m benchmarks.bench_e2e --history 200 2000 10000 --assets 1 100 500 --json e2e.json
+    python -m benchmarks.bench_e2e --sections viewers --viewers 1 5 10 20
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_HISTORY = [200, 2_000, 10_000]
+DEFAULT_ASSETS = [1, 10, 100, 500]
+DEFAULT_VIEWERS = [1, 5, 10]
+APP_STAGES = ["app.tick", "feed.tick", "dashboard.render_kpis", "dashboard.render_tabs",
+              "dashboard.render_fleet", "cloud.query_sample", "ingest.flush"]
+
+
+def offline_env(work_dir, ticks):
+    """Point every module at local, fake backends; must run before the app modules are imported."""
+    os.environ.update({
+        "CLOUD_BACKEND": "local",
+        "LOCAL_CLOUD_DIR": os.path.join(work_dir, "cloud"),
+        "HISTORY_CACHE_PATH": os.path.join(work_dir, "history.parquet"),
+        "HISTORY_CACHE_ROWS": "20000",
+        "PROJECT": "bench", "DATASET": "ds", "TABLE": "sensors",
+        "GCS_BUCKET": "bench-bucket", "GCS_DEST_PREFIX": "ingest",
+        "COPILOT_BACKEND": "fake",
+        "COPILOT_WAIT_SEC": "0",
+        "TICK_INTERVAL_SEC": "0",
+        "SIM_MAX_TICKS": str(ticks),
+        "FEED_INTERVAL_SEC": "0.05",
+    })
+
+
+def _rate(n, seconds):
+    return round(n / seconds) if seconds else 0
+
+
+# ---- Sections ----
+
+def bench_generation(assets_list, ticks):
+    from simulation.twin import DigitalTwin, FleetTwin
+
+    results = []
+    for assets in assets_list:
+        twin = DigitalTwin(seed=1) if assets == 1 else FleetTwin(assets, seed=1)
+        twin.next_rows(1)
+        t0 = time.perf_counter()
+        rows = sum(len(twin.next_rows(1)) for _ in range(ticks))
+        elapsed = time.perf_counter() - t0
+        results.append({"section": "generation", "assets": assets, "tick_ms": round(elapsed / ticks * 1e3, 3),
+                        "rows_per_s": _rate(rows, elapsed)})
+    return results
+
+
+def bench_ingest(assets_list, ticks, work_dir):
+    from services.cloud.ingest_buffer import BigQuerySink, IngestBuffer
+    from services.cloud.schema import SENSOR_COLUMNS
+    from simulation.twin import FleetTwin
+
+    results = []
+    for assets in assets_list:
+        sink = BigQuerySink("bench", "ds", "sensors", "bench-bucket", "ingest", staging_dir=work_dir)
+        buffer = IngestBuffer(sink, max_rows=10 ** 9, max_age=10 ** 9, max_pending_rows=10 ** 9)
+        batches = [FleetTwin(assets, seed=2).generate(ticks)[SENSOR_COLUMNS]]
+        rows = sum(len(b) for b in batches)
+        t0 = time.perf_counter()
+        for batch in batches:
+            for i in range(0, len(batch), assets):
+                buffer.append(batch.iloc[i:i + assets])
+        append_s = time.perf_counter() - t0
+        buffer.flush()
+        total_s = time.perf_counter() - t0
+        stats = buffer.stats()
+        results.append({"section": "ingest", "assets": assets, "rows": rows,
+                        "append_us_per_tick": round(append_s / ticks * 1e6, 1),
+                        "flush_s": round(stats["last_flush_latency_s"], 3),
+                        "rows_per_s": _rate(rows, total_s)})
+    return results
+
+
+def bench_history(history_sizes, assets_list, ticks):
+    from agents.detectors import StreamingDetectors
+    from dashboard.fleet import FleetHistory
+    from dashboard.history import SensorHistory
+    from dashboard.rollups import RollupStore
+    from services.cloud.schema import METRIC_COLUMNS, SENSOR_COLUMNS
+    from simulation.twin import DigitalTwin, FleetTwin
+
+    results = []
+    for size in history_sizes:
+        twin = DigitalTwin(seed=3, interval_s=1)
+        seed = twin.generate(size)[SENSOR_COLUMNS]
+        history = SensorHistory.from_frame(seed, size)
+        rollups = RollupStore.from_frame(seed)
+        detectors = StreamingDetectors(history.columns)
+        detectors.update_many(history.window())
+        ticks_df = [twin.generate(1)[SENSOR_COLUMNS] for _ in range(ticks)]
+        t0 = time.perf_counter()
+        for df in ticks_df:
+            history.extend(df)
+            rollups.extend(df)
+            detectors.update_frame(df)
+        elapsed = time.perf_counter() - t0
+        results.append({"section": "history", "history": size, "assets": 1,
+                        "tick_us": round(elapsed / ticks * 1e6, 1)})
+
+    for assets in (a for a in assets_list if a > 1):
+        twin = FleetTwin(assets, seed=3)
+        fleet = FleetHistory(twin.equipment_ids, max(history_sizes[0], 1))
+        detectors = StreamingDetectors(range(assets * len(METRIC_COLUMNS)))
+        ticks_df = [twin.generate(1)[SENSOR_COLUMNS] for _ in range(ticks)]
+        t0 = time.perf_counter()
+        for df in ticks_df:
+            fleet.extend(df)
+            detectors.update(df[METRIC_COLUMNS].to_numpy(dtype=float).ravel())
+        elapsed = time.perf_counter() - t0
+        results.append({"section": "history", "history": fleet.capacity, "assets": assets,
+                        "tick_us": round(elapsed / ticks * 1e6, 1)})
+    return results
+
+
+def bench_severity(history_sizes, assets_list, repeat=5):
+    from agents.rules import evaluate_row, score_frame
+    from dashboard.fleet import FleetHistory, fleet_status
+    from dashboard.history import SensorHistory
+    from services.cloud.schema import SENSOR_COLUMNS
+    from simulation.twin import DigitalTwin, FleetTwin
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - t0)
+        return min(times)
+
+    results = []
+    for size in history_sizes:
+        history = SensorHistory.from_frame(DigitalTwin(seed=4).generate(size)[SENSOR_COLUMNS], size)
+        latest = history.latest()
+        results.append({"section": "severity", "history": size, "assets": 1,
+                        "row_us": round(best(lambda: evaluate_row(latest)) * 1e6, 1),
+                        "frame_ms": round(best(lambda: score_frame(history)) * 1e3, 3)})
+    for assets in assets_list:
+        twin = FleetTwin(assets, seed=4)
+        fleet = FleetHistory.from_frame(twin.generate(2), twin.equipment_ids, 8)
+        results.append({"section": "severity", "assets": assets,
+                        "fleet_ms": round(best(lambda: fleet_status(fleet)) * 1e3, 3)})
+    return results
+
+
+def _payload_bytes(node):
+    """Serialized size of every rendered element under ``node`` (what goes over the websocket)."""
+    proto = getattr(node, "proto", None)
+    total = proto.ByteSize() if hasattr(proto, "ByteSize") else 0
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        total += sum(_payload_bytes(child) for child in children.values())
+    return total
+
+
+def _use_fleet(assets):
+    """Reload ``config`` with ``FLEET_ASSETS=assets``; the app reads the fleet size from it on the next run."""
+    import importlib
+    import config
+
+    os.environ["FLEET_ASSETS"] = str(assets)
+    config.get_settings.cache_clear()
+    importlib.reload(config)
+
+
+def bench_app(history_sizes, assets_list, ticks, timeout):
+    from streamlit.logger import set_log_level
+    from streamlit.testing.v1 import AppTest
+    from services.metrics import REGISTRY
+
+    set_log_level("error")      # deprecation warnings are logged on every rerun
+
+    configs = [(size, 1) for size in history_sizes] + [(history_sizes[0], a) for a in assets_list if a > 1]
+    results = []
+    for size, assets in configs:
+        _use_fleet(assets)
+        at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=timeout)
+        at.run()
+        next(s for s in at.sidebar.slider if s.label == "History Points").set_value(size)
+        at.run()
+        REGISTRY.reset()
+        t0 = time.perf_counter()
+        next(b for b in at.sidebar.button if "Start" in b.label).click()
+        at.run()
+        elapsed = time.perf_counter() - t0
+        if at.exception:
+            raise RuntimeError(f"app.py failed (history={size}, assets={assets}): {at.exception[0].message}")
+        stages = REGISTRY.snapshot()["stages"]
+        result = {"section": "app", "history": size, "assets": assets, "ticks": ticks,
+                  "run_s": round(elapsed, 3), "payload_bytes": _payload_bytes(at._tree)}
+        for stage in APP_STAGES:
+            if stage in stages:
+                result[f"{stage}.p50_ms"] = round(stages[stage]["p50_ms"], 2)
+                result[f"{stage}.p95_ms"] = round(stages[stage]["p95_ms"], 2)
+        results.append(result)
+    return results
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return float("nan")
+
+
+def bench_viewers(viewer_counts, history, ticks, interval_s, work_dir):
+    """N viewers on one shared ``LiveFeed`` vs. N sessions that each run their own simulation.
+
+    Viewers are threads doing a session's data-side work per tick (history
+    view, latest reading, chart columns, raw table); Streamlit's own
+    per-session serialization is not included.
+    """
+    from agents.detectors import StreamingDetectors
+    from dashboard.feed import LiveFeed
+    from dashboard.history import SensorHistory
+    from dashboard.rollups import RollupStore
+    from services.cloud.ingest_buffer import BigQuerySink, IngestBuffer
+    from services.cloud.schema import METRIC_COLUMNS, SENSOR_COLUMNS
+    from simulation.twin import DigitalTwin
+
+    seed = DigitalTwin(seed=5).generate(history)[SENSOR_COLUMNS]
+
+    def read(view):
+        view.latest()
+        for metric in METRIC_COLUMNS[:4]:
+            view.column(metric)
+        view.to_frame(20)
+
+    def shared(n, ingest):
+        feed = LiveFeed(1, seed, capacity=history, interval_s=interval_s, ingest=ingest, idle_s=5)
+
+        def viewer(i):
+            cursor = -1
+            for _ in range(ticks):
+                snapshot = feed.wait(i, cursor, timeout=5)
+                cursor = snapshot.seq
+                read(snapshot.view(history))
+            feed.leave(i)
+        return feed.start(), viewer
+
+    def per_session(n, ingest):
+        def viewer(i):
+            twin, detectors = DigitalTwin(seed=i), StreamingDetectors(METRIC_COLUMNS)
+            own = SensorHistory.from_frame(seed, history)
+            rollups = RollupStore.from_frame(seed)
+            detectors.update_many(own.window())
+            for _ in range(ticks):
+                df = twin.next_rows(1)[SENSOR_COLUMNS]
+                own.extend(df)
+                rollups.extend(df)
+                detectors.update_frame(df)
+                ingest.append(df)
+                read(own)
+                time.sleep(interval_s)
+        return None, viewer
+
+    results = []
+    for mode, setup in (("shared", shared), ("per_session", per_session)):
+        for n in viewer_counts:
+            sink = BigQuerySink("bench", "ds", "sensors", "bench-bucket", "ingest", staging_dir=work_dir)
+            # Counted, never flushed
+            ingest = IngestBuffer(sink, max_rows=10 ** 9, max_age=10 ** 9, max_pending_rows=10 ** 9)
+            rss, cpu, t0 = _rss_mb(), time.process_time(), time.perf_counter()
+            feed, viewer = setup(n, ingest)
+            threads = [threading.Thread(target=viewer, args=(i,)) for i in range(n)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - t0
+            if feed is not None:
+                feed.close()
+            results.append({"section": "viewers", "mode": mode, "viewers": n, "history": history, "ticks": ticks,
+                            "run_s": round(elapsed, 3), "rows_generated": ingest.stats()["pending_rows"],
+                            "cpu_s": round(time.process_time() - cpu, 3),
+                            "rss_delta_mb": round(_rss_mb() - rss, 1)})
+            del feed, viewer, ingest
+    return results
+
+
+def _meta(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": vars(args),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--history", type=int, nargs="+", default=DEFAULT_HISTORY, help="History Points to sweep")
+    parser.add_argument("--assets", type=int, nargs="+", default=DEFAULT_ASSETS, help="Kiln counts to sweep")
+    parser.add_argument("--viewers", type=int, nargs="+", default=DEFAULT_VIEWERS,
+                        help="Concurrent session counts to sweep")
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--sections", nargs="+", default=["generation", "ingest", "history", "severity", "app", "viewers"])
+    parser.add_argument("--quick", action="store_true", help="Small sweep for a fast smoke run")
+    parser.add_argument("--timeout", type=float, default=300, help="Per app run, seconds")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+    if args.quick:
+        args.history, args.assets, args.viewers, args.ticks = [200, 2_000], [1, 50], [1, 4], 5
+
+    work_dir = tempfile.mkdtemp(prefix="cemmind-e2e-")
+    offline_env(work_dir, args.ticks)
+    sys.path.insert(0, ROOT)
+    from services.cloud.clients import use_backend
+    from simulation.parallel import bulk_push
+
+    use_backend("local", os.environ["LOCAL_CLOUD_DIR"])
+    # Seed the table so the app starts with a full history window
+    bulk_push(max(args.history), os.environ["GCS_BUCKET"], "seed", "bench", "ds", "sensors", workers=1,
+              work_dir=os.path.join(work_dir, "seed"))
+
+    results = []
+    if "generation" in args.sections:
+        results += bench_generation(args.assets, args.ticks * 10)
+    if "ingest" in args.sections:
+        results += bench_ingest(args.assets, args.ticks * 10, work_dir)
+    if "history" in args.sections:
+        results += bench_history(args.history, args.assets, args.ticks * 10)
+    if "severity" in args.sections:
+        results += bench_severity(args.history, args.assets)
+    if "app" in args.sections:
+        results += bench_app(args.history, args.assets, args.ticks, args.timeout)
+    if "viewers" in args.sections:
+        results += bench_viewers(args.viewers, max(args.history), args.ticks * 2, 0.05, work_dir)
+
+    print()
+    for section in args.sections:
+        rows = [r for r in results if r["section"] == section]
+        if not rows:
+            continue
+        print(f"== {section}")
+        for r in rows:
+            print("   " + " · ".join(f"{k}={v}" for k, v in r.items() if k != "section"))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"meta": _meta(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
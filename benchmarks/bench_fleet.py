@@ -0,0 +1,85 @@
+"""
+Fleet mode scaling: per-tick cost of generating, buffering, detecting and
+scoring 1 to 500 kilns, vectorized across the fleet vs. one
+``SensorHistory`` + ``evaluate_row`` per kiln.
+
+    python -m benchmarks.bench_fleet
+    python -m benchmarks.bench_fleet --assets 1 100 500 --ticks 200 --json fleet.json
+"""
+import argparse
+import json
+import time
+
+from agents.detectors import StreamingDetectors
+from agents.rules import evaluate_row
+from dashboard.fleet import FleetHistory, fleet_status
+from dashboard.history import SensorHistory
+from services.cloud.schema import METRIC_COLUMNS, SENSOR_COLUMNS
+from simulation.twin import FleetTwin
+
+DEFAULT_ASSETS = [1, 10, 50, 100, 250, 500]
+
+
+def bench(assets, ticks, capacity, naive):
+    twin = FleetTwin(assets, seed=1)
+    fleet = FleetHistory(twin.equipment_ids, capacity)
+    detectors = StreamingDetectors(range(assets * len(METRIC_COLUMNS)))
+    timings = {"generate": 0.0, "buffer": 0.0, "detect": 0.0, "score": 0.0}
+    for _ in range(ticks):
+        t0 = time.perf_counter()
+        df = twin.generate(1)[SENSOR_COLUMNS]
+        t1 = time.perf_counter()
+        fleet.extend(df)
+        t2 = time.perf_counter()
+        detectors.update(df[METRIC_COLUMNS].to_numpy(dtype=float).ravel())
+        t3 = time.perf_counter()
+        fleet_status(fleet, detectors.level().reshape(assets, -1))
+        t4 = time.perf_counter()
+        for key, dt in zip(timings, (t1 - t0, t2 - t1, t3 - t2, t4 - t3)):
+            timings[key] += dt
+
+    result = {"assets": assets, **{f"{k}_ms": round(v / ticks * 1e3, 3) for k, v in timings.items()}}
+    result["tick_ms"] = round(sum(timings.values()) / ticks * 1e3, 3)
+    result["buffer_mb"] = round((fleet._values.nbytes + fleet._ts.nbytes) / 1e6, 1)
+
+    if naive:
+        # One ring buffer and one rules pass per kiln
+        histories = {e: SensorHistory(capacity) for e in twin.equipment_ids}
+        elapsed = 0.0
+        for _ in range(ticks):
+            df = twin.generate(1)[SENSOR_COLUMNS]
+            t0 = time.perf_counter()
+            for equipment_id, rows in df.groupby("equipment_id", observed=True):
+                histories[equipment_id].extend(rows)
+                evaluate_row(histories[equipment_id].latest())
+            elapsed += time.perf_counter() - t0
+        result["per_asset_buffer_score_ms"] = round(elapsed / ticks * 1e3, 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--assets", type=int, nargs="+", default=DEFAULT_ASSETS)
+    parser.add_argument("--ticks", type=int, default=100)
+    parser.add_argument("--capacity", type=int, default=500, help="Ring buffer rows per asset")
+    parser.add_argument("--no-naive", action="store_true", help="Skip the per-asset baseline")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'assets':>7} {'gen ms':>7} {'buffer ms':>10} {'detect ms':>10} {'score ms':>9} {'tick ms':>8} "
+          f"{'buf MB':>7} {'per-asset ms':>13}")
+    for n in args.assets:
+        r = bench(n, args.ticks, args.capacity, not args.no_naive)
+        results.append(r)
+        print(f"{r['assets']:>7} {r['generate_ms']:>7.2f} {r['buffer_ms']:>10.2f} {r['detect_ms']:>10.2f} "
+              f"{r['score_ms']:>9.2f} {r['tick_ms']:>8.2f} {r['buffer_mb']:>7.1f} "
+              f"{r.get('per_asset_buffer_score_ms', float('nan')):>13.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
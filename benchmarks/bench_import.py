@@ -0,0 +1,99 @@
+"""
+Cold import time of the dashboard's modules, measured with
+``python -X importtime`` in a fresh interpreter per run, plus which heavy
+SDKs each one drags in. ``--budget-ms`` turns it into a regression check
+(exit status 1 when a module goes over budget or imports a heavy SDK).
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --modules dashboard.tabs --repeat 5 --budget-ms 1500 --json imports.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+DEFAULT_MODULES = [
+    "config",
+    "services.cloud",
+    "services.cloud.schema",
+    "services.cloud.history_reader",
+    "agents.cem_agent",
+    "dashboard.fleet",
+    "dashboard.tabs",
+]
+
+# Must only be imported on first use, never by importing the dashboard
+HEAVY = ["google.cloud.bigquery", "google.cloud.storage", "google.adk", "google.genai", "vertexai", "graphviz"]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _importtime(code):
+    """``[(depth, module, cumulative µs)]`` in completion order from one fresh ``-X importtime`` run."""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(f"{code} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            rows.append((depth, name.strip(), int(cumulative)))
+    return rows
+
+
+def importtime(module, startup):
+    """``(total µs, {direct import: cumulative µs}, every module imported)`` for ``import module``."""
+    rows = _importtime(f"import {module}")[startup:]     # interpreter startup imports come first
+    own = {".".join(module.split(".")[:i + 1]) for i in range(module.count(".") + 1)}
+    total = sum(us for depth, _, us in rows if depth == 0)
+    children = {name: us for depth, name, us in rows if depth <= 1 and name not in own}
+    return total, children, {name for _, name, _ in rows}
+
+
+def bench(module, repeat, top):
+    startup = len(_importtime("pass"))
+    total, children, imported = min((importtime(module, startup) for _ in range(repeat)), key=lambda run: run[0])
+    heavy = sorted({h for h in HEAVY for name in imported if name == h or name.startswith(h + ".")})
+    heaviest = sorted(children.items(), key=lambda item: -item[1])[:top]
+    return {
+        "module": module,
+        "import_ms": round(total / 1e3, 1),
+        "heavy": heavy,
+        "top": [{"module": name, "ms": round(us / 1e3, 1)} for name, us in heaviest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module (best is kept)")
+    parser.add_argument("--top", type=int, default=3, help="Heaviest direct imports to list")
+    parser.add_argument("--budget-ms", type=float, help="Fail if any module takes longer than this")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    failed = False
+    print(f"{'module':>30} {'import ms':>10}  heavy SDKs / heaviest direct imports")
+    for module in args.modules:
+        r = bench(module, args.repeat, args.top)
+        results.append(r)
+        over = args.budget_ms is not None and (r["import_ms"] > args.budget_ms or bool(r["heavy"]))
+        failed |= over
+        top = ", ".join(f"{t['module']} {t['ms']:.0f}ms" for t in r["top"])
+        print(f"{r['module']:>30} {r['import_ms']:>10.1f}  {', '.join(r['heavy']) or '-'} / {top}"
+              + ("  ❌ over budget" if over else ""))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
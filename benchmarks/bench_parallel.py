@@ -0,0 +1,50 @@
+"""
+Parallel bulk push scaling from 1 to N worker processes, against the local
+filesystem/SQLite stand-in for GCS and BigQuery. Each kiln is split into
+stitched time shards, so a single kiln (the default) scales too.
+
+    python -m benchmarks.bench_parallel
+    python -m benchmarks.bench_parallel --rows 1000000 --kilns 8 --workers 1 2 4 8 --load
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from services.cloud.clients import use_backend
+from simulation.parallel import bulk_push
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows per kiln")
+    parser.add_argument("--kilns", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, cpus} & set(range(1, cpus + 1))))
+    parser.add_argument("--load", action="store_true", help="Also time the single load into SQLite")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'workers':>7} {'shards':>6} {'gen s':>7} {'gen+up s':>8} {'load s':>7} {'Mrows/s':>8} {'speedup':>7}")
+    with tempfile.TemporaryDirectory() as root:
+        for workers in args.workers:
+            use_backend("local", os.path.join(root, f"cloud-{workers}"))
+            r = bulk_push(args.rows, "bench-bucket", "bench", "bench", "ds", f"sensors_{workers}",
+                          kilns=args.kilns, workers=workers, seed=args.seed, load=args.load)
+            r["rows_per_s"] = r["rows"] / r["generate_upload_s"]
+            results.append(r)
+            base = results[0]["generate_upload_s"]
+            print(f"{workers:>7} {r['shards']:>6} {r['generate_s']:>7.2f} {r['generate_upload_s']:>8.2f} "
+                  f"{r.get('load_s', float('nan')):>7.2f} {r['rows_per_s'] / 1e6:>8.2f} "
+                  f"{base / r['generate_upload_s']:>6.1f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
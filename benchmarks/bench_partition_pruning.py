@@ -0,0 +1,82 @@
+"""
+Bytes scanned by time-bounded history queries on a day-partitioned,
+clustered sensor table vs. an unpartitioned copy of the same rows, against
+the local filesystem/SQLite stand-in for GCS and BigQuery.
+
+    python -m benchmarks.bench_partition_pruning
+    python -m benchmarks.bench_partition_pruning --days 90 --kilns 4 --json pruning.json
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+from google.cloud import bigquery
+
+from services.cloud.bigquery_client import load_from_gcs, query_sample, last_query_stats
+from services.cloud.clients import get_bigquery_client, use_backend
+from services.cloud.schema import SENSOR_COLUMNS, bigquery_schema, equipment_ids, write_staging
+from simulation.batch_generator import upload_to_gcs
+from simulation.twin import DigitalTwin
+
+DEFAULT_WINDOWS_H = [1, 24, 24 * 7]
+
+
+def _stage(days, kilns, interval_s, workdir):
+    start = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None) - dt.timedelta(days=days)
+    n = int(days * 86_400 / interval_s)
+    df = pd.concat([DigitalTwin(seed=k, start=start, interval_s=interval_s, equipment_id=equipment_id)
+                    .generate(n)[SENSOR_COLUMNS] for k, equipment_id in enumerate(equipment_ids(kilns))],
+                   ignore_index=True)
+    path = write_staging(df, os.path.join(workdir, "history.parquet"))
+    upload_to_gcs(path, "bench-bucket", "bench")
+    return "gs://bench-bucket/bench/history.parquet", len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--kilns", type=int, default=3)
+    parser.add_argument("--interval-s", type=int, default=60)
+    parser.add_argument("--windows-h", type=float, nargs="+", default=DEFAULT_WINDOWS_H,
+                        help="Query windows (hours back from now)")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        use_backend("local", os.path.join(root, "cloud"))
+        uri, rows = _stage(args.days, args.kilns, args.interval_s, root)
+
+        # Partitioned + clustered (load_from_gcs provisions the table first)
+        load_from_gcs("bench", "ds", "partitioned", uri)
+        # Same rows, plain table
+        job_config = bigquery.LoadJobConfig(source_format=bigquery.SourceFormat.PARQUET, schema=bigquery_schema())
+        get_bigquery_client("bench").load_table_from_uri(uri, "bench.ds.flat", job_config=job_config).result()
+
+        print(f"{rows:,} rows over {args.days} days, {args.kilns} kilns")
+        print(f"{'window h':>9} {'table':>12} {'rows':>7} {'MB scanned':>11} {'query s':>8}")
+        now = dt.datetime.now(dt.timezone.utc)
+        for hours in args.windows_h:
+            since = now - dt.timedelta(hours=hours)
+            for table in ("flat", "partitioned"):
+                t0 = time.perf_counter()
+                query_sample("bench", "ds", table, limit=1_000_000, since=since)
+                elapsed = time.perf_counter() - t0
+                stats = last_query_stats()
+                r = {"window_h": hours, "table": table, "rows": stats["rows"],
+                     "bytes_processed": stats["bytes_processed"], "query_s": round(elapsed, 4)}
+                results.append(r)
+                print(f"{hours:>9g} {table:>12} {r['rows']:>7} {r['bytes_processed'] / 1e6:>11.2f} "
+                      f"{elapsed:>8.3f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Severity scoring: per-row ``evaluate_row`` (what ``analyze_plant`` does for
+one reading) against the vectorized ``score_frame`` + ``stage_levels``.
+
+    python -m benchmarks.bench_severity
+    python -m benchmarks.bench_severity --sizes 10000 1000000 --row-limit 50000
+"""
+import argparse
+import json
+import time
+
+from agents.rules import alarm_minutes, evaluate_row, score_frame, stage_levels
+from simulation.batch_generator import generate_data
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def bench_size(n, row_limit):
+    df = generate_data(n, path=None)
+
+    t0 = time.perf_counter()
+    stage_levels(score_frame(df))
+    vectorized_s = time.perf_counter() - t0
+
+    # The per-row path is timed on at most ``row_limit`` rows and scaled up
+    sample = min(n, row_limit)
+    records = df.head(sample).to_dict(orient="records")
+    t0 = time.perf_counter()
+    for row in records:
+        evaluate_row(row)
+    per_row_s = (time.perf_counter() - t0) * n / sample
+
+    t0 = time.perf_counter()
+    alarm_minutes(df)
+    alarm_s = time.perf_counter() - t0
+
+    return {
+        "rows": n,
+        "per_row_s": round(per_row_s, 4),
+        "per_row_extrapolated": sample < n,
+        "vectorized_s": round(vectorized_s, 4),
+        "alarm_minutes_s": round(alarm_s, 4),
+        "speedup": round(per_row_s / vectorized_s, 1) if vectorized_s else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--row-limit", type=int, default=100_000)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>10} {'per-row s':>10} {'vector s':>9} {'alarms s':>9} {'speedup':>8}")
+    for n in args.sizes:
+        r = bench_size(n, args.row_limit)
+        results.append(r)
+        mark = "*" if r["per_row_extrapolated"] else " "
+        print(f"{r['rows']:>10} {r['per_row_s']:>9.3f}{mark} {r['vectorized_s']:>9.4f} "
+              f"{r['alarm_minutes_s']:>9.4f} {r['speedup']:>7}x")
+    print("* per-row time extrapolated from --row-limit rows")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
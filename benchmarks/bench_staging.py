@@ -0,0 +1,74 @@
+"""
+Compare CSV and Parquet staging files: bytes written, encode time and load
+(decode) time, for 1k up to 10M rows.
+
+    python -m benchmarks.bench_staging
+    python -m benchmarks.bench_staging --sizes 1000 100000 --json staging.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from services.cloud.schema import SENSOR_COLUMNS, write_staging
+from simulation.batch_generator import generate_data
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+
+def _load(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, parse_dates=["timestamp"])
+
+
+def bench_size(n, workdir):
+    df = generate_data(n, path=None)[SENSOR_COLUMNS]
+    results = []
+    for fmt in ("csv", "parquet"):
+        path = os.path.join(workdir, f"bench_{n}.{fmt}")
+        t0 = time.perf_counter()
+        write_staging(df, path)
+        encode_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        loaded = _load(path)
+        load_s = time.perf_counter() - t0
+        assert len(loaded) == n
+
+        results.append({
+            "rows": n,
+            "format": fmt,
+            "bytes": os.path.getsize(path),
+            "encode_s": round(encode_s, 4),
+            "load_s": round(load_s, 4),
+        })
+        os.remove(path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'rows':>10} {'format':>8} {'MB':>9} {'encode s':>9} {'load s':>9}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in args.sizes:
+            for r in bench_size(n, workdir):
+                results.append(r)
+                print(f"{r['rows']:>10} {r['format']:>8} {r['bytes'] / 1e6:>9.2f} "
+                      f"{r['encode_s']:>9.3f} {r['load_s']:>9.3f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Digital twin generation throughput on one core (target: 10M+ rows/minute).
+
+    python -m benchmarks.bench_twin
+    python -m benchmarks.bench_twin --rows 20000000 --chunk-rows 524288
+"""
+import argparse
+import json
+import time
+
+from simulation.twin import CHUNK_ROWS, DigitalTwin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    twin = DigitalTwin(seed=args.seed, chunk_rows=args.chunk_rows)
+    t0 = time.perf_counter()
+    df = twin.generate(args.rows)
+    elapsed = time.perf_counter() - t0
+
+    result = {
+        "rows": len(df),
+        "chunk_rows": args.chunk_rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_minute": round(len(df) / elapsed * 60),
+        "faults_injected": twin.faults_injected,
+    }
+    print(f"{result['rows']:,} rows in {elapsed:.2f}s → {result['rows_per_minute'] / 1e6:.1f}M rows/min "
+          f"({result['faults_injected']} fault episodes)")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,154 @@
+"""
+App settings, read from the environment (and ``.env``) once per process.
+
+``get_settings()`` returns a cached, immutable ``Settings``; ``load_env()``
+is the single place ``.env`` is loaded, so modules that read their own
+variables call it instead of ``load_dotenv()``. The upper-case names below
+are kept for ``from config import *``.
+"""
+import functools
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass
+
+
+@functools.lru_cache(maxsize=None)
+def load_env():
+    """Load ``.env`` into ``os.environ``; only the first call does any work."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+def _staging_path(local_csv, staging_format):
+    return os.path.splitext(local_csv or "simulated_cement_plant_data.csv")[0] + (
+        ".parquet" if staging_format == "parquet" else ".csv")
+
+
+@dataclass(frozen=True)
+class Settings:
+    project: str = None
+    dataset: str = None
+    table: str = None
+    gcs_bucket: str = None
+    gcs_dest_prefix: str = None
+    local_csv: str = None
+    vertex_agent: str = None
+    region: str = "us-central1"
+    gcs_uri: str = None
+    staging_format: str = "parquet"     # "parquet" or "csv"
+    local_staging: str = None
+    ingest_max_rows: int = 500
+    ingest_max_age_sec: float = 30.0
+    ingest_max_pending_rows: int = 100_000  # oldest rows are dropped beyond this while the sink is down
+    copilot_wait_sec: float = 120.0
+    bulk_workers: int = 1
+    chart_points: int = 600
+    fleet_assets: int = 1
+    fleet_history_points: int = 500
+    metrics_export_path: str = None
+    metrics_port: int = 0
+    copilot_backend: str = "vertex"     # "vertex" or "fake" (offline, canned answers)
+    tick_interval_sec: float = None     # overrides the Refresh Rate slider (e.g. 0 for headless runs)
+    sim_max_ticks: int = 0              # stop the simulation after N ticks; 0 = until stopped
+    feed_history_points: int = 10_000   # rows kept by the shared live feed (max "History Points")
+    feed_interval_sec: float = 3.0      # shared feed tick interval
+    feed_idle_sec: float = 30.0         # pause the feed when no session has polled for this long
+    feed_source: str = "twin"           # "twin" (feed simulates) or "stream" (async StreamProducer)
+
+    @classmethod
+    def from_env(cls, env=None):
+        env = os.environ if env is None else env
+        staging_format = env.get("STAGING_FORMAT", "parquet")
+        return cls(
+            project=env.get("PROJECT"),
+            dataset=env.get("DATASET"),
+            table=env.get("TABLE"),
+            gcs_bucket=env.get("GCS_BUCKET"),
+            gcs_dest_prefix=env.get("GCS_DEST_PREFIX"),
+            local_csv=env.get("LOCAL_CSV"),
+            vertex_agent=env.get("VERTEX_AGENT"),
+            region=env.get("REGION", "us-central1"),
+            gcs_uri=env.get("GCS_URI"),
+            staging_format=staging_format,
+            local_staging=env.get("LOCAL_STAGING") or _staging_path(env.get("LOCAL_CSV"), staging_format),
+            ingest_max_rows=int(env.get("INGEST_MAX_ROWS", 500)),
+            ingest_max_age_sec=float(env.get("INGEST_MAX_AGE_SEC", 30)),
+            ingest_max_pending_rows=int(env.get("INGEST_MAX_PENDING_ROWS", 100_000)),
+            copilot_wait_sec=float(env.get("COPILOT_WAIT_SEC", 120)),
+            bulk_workers=int(env.get("BULK_WORKERS", 0)) or os.cpu_count() or 1,
+            chart_points=int(env.get("CHART_POINTS", 600)),
+            fleet_assets=int(env.get("FLEET_ASSETS", 1)),
+            fleet_history_points=int(env.get("FLEET_HISTORY_POINTS", 500)),
+            metrics_export_path=env.get("METRICS_EXPORT_PATH"),
+            metrics_port=int(env.get("METRICS_PORT", 0)),
+            copilot_backend=env.get("COPILOT_BACKEND", "vertex"),
+            tick_interval_sec=float(env["TICK_INTERVAL_SEC"]) if env.get("TICK_INTERVAL_SEC") else None,
+            sim_max_ticks=int(env.get("SIM_MAX_TICKS", 0)),
+            feed_history_points=int(env.get("FEED_HISTORY_POINTS", 10_000)),
+            feed_interval_sec=float(env.get("FEED_INTERVAL_SEC", 3.0)),
+            feed_idle_sec=float(env.get("FEED_IDLE_SEC", 30.0)),
+            feed_source=env.get("FEED_SOURCE", "twin"),
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def get_settings():
+    """The process-wide ``Settings`` (``.env`` loaded and parsed on the first call)."""
+    load_env()
+    return Settings.from_env()
+
+
+settings = get_settings()
+
+PROJECT = settings.project
+DATASET = settings.dataset
+TABLE = settings.table
+GCS_BUCKET = settings.gcs_bucket
+GCS_DEST_PREFIX = settings.gcs_dest_prefix
+LOCAL_CSV = settings.local_csv
+VERTEX_AGENT = settings.vertex_agent
+REGION = settings.region
+GCS_URI = settings.gcs_uri
+STAGING_FORMAT = settings.staging_format
+LOCAL_STAGING = settings.local_staging
+
+# Ingestion buffer: flush to BigQuery every N rows or every N seconds, keeping at most N rows while it is failing
+INGEST_MAX_ROWS = settings.ingest_max_rows
+INGEST_MAX_AGE_SEC = settings.ingest_max_age_sec
+INGEST_MAX_PENDING_ROWS = settings.ingest_max_pending_rows
+
+# How long an idle (non-simulating) render keeps streaming copilot text
+COPILOT_WAIT_SEC = settings.copilot_wait_sec
+
+# Worker processes for the parallel bulk push (defaults to all cores)
+BULK_WORKERS = settings.bulk_workers
+
+# Max points per trend chart series; rollup resolution is picked to fill it
+CHART_POINTS = settings.chart_points
+
+# Fleet mode: number of simulated kilns (1 = single-plant dashboard) and ring buffer rows kept per kiln
+FLEET_ASSETS = settings.fleet_assets
+FLEET_HISTORY_POINTS = settings.fleet_history_points
+
+# Instrumentation export: a .prom (Prometheus text) or .json file rewritten every feed interval, and/or an HTTP /metrics port
+METRICS_EXPORT_PATH = settings.metrics_export_path
+METRICS_PORT = settings.metrics_port
 
-load_dotenv()  # Load environment variables once
+# Offline / headless runs (benchmarks): fake copilot backend, fixed tick interval, bounded simulation
+COPILOT_BACKEND = settings.copilot_backend
+TICK_INTERVAL_SEC = settings.tick_interval_sec
+SIM_MAX_TICKS = settings.sim_max_ticks
 
-import streamlit as st
+# Shared live feed: one simulation and ingest path per process, fanned out to every session
+FEED_HISTORY_POINTS = settings.feed_history_points
+FEED_INTERVAL_SEC = settings.feed_interval_sec
+FEED_IDLE_SEC = settings.feed_idle_sec
+FEED_SOURCE = settings.feed_source
 
-PROJECT = os.getenv("PROJECT")
-DATASET = os.getenv("DATASET")
-TABLE = os.getenv("TABLE")
-GCS_BUCKET = os.getenv("GCS_BUCKET")
-GCS_DEST_PREFIX = os.getenv("GCS_DEST_PREFIX")
-LOCAL_CSV = os.getenv("LOCAL_CSV")
-VERTEX_AGENT = os.getenv("VERTEX_AGENT")
-REGION = os.getenv.get("REGION", "us-central1")
-GCS_URI = os.getenv("GCS_URI")
+__all__ = [
+    "Settings", "get_settings", "load_env", "settings",
+    "PROJECT", "DATASET", "TABLE", "GCS_BUCKET", "GCS_DEST_PREFIX", "LOCAL_CSV", "VERTEX_AGENT", "REGION",
+    "GCS_URI", "STAGING_FORMAT", "LOCAL_STAGING", "INGEST_MAX_ROWS", "INGEST_MAX_AGE_SEC", "INGEST_MAX_PENDING_ROWS",
+    "COPILOT_WAIT_SEC", "BULK_WORKERS", "CHART_POINTS", "FLEET_ASSETS", "FLEET_HISTORY_POINTS", "METRICS_EXPORT_PATH",
+    "METRICS_PORT", "COPILOT_BACKEND", "TICK_INTERVAL_SEC", "SIM_MAX_TICKS", "FEED_HISTORY_POINTS",
+    "FEED_INTERVAL_SEC", "FEED_IDLE_SEC", "FEED_SOURCE",
+]
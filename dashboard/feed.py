@@ -0,0 +1,250 @@
+"""
+Shared live feed: one simulation per process, fanned out to every session.
+
+``LiveFeed`` owns the digital twin, the canonical history, rollups and
+detectors, and the ingest path. A daemon thread advances them once per
+interval and publishes an immutable ``FeedSnapshot``. Sessions hold only a
+cursor (the last ``seq`` they rendered) and ``wait`` for anything newer.
+Generation, uploads and history memory are paid once however many
+dashboards are open, and a slow session simply skips to the newest
+snapshot. The producer pauses when no session has polled for ``idle_s``.
+
+Readings normally come from the feed's own twin. Pass ``source`` (a
+``ConsumerSink`` that a ``StreamProducer`` writes into) to have each tick
+publish whatever the realtime stream delivered instead.
+"""
+import dataclasses
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from agents.detectors import DetectorSnapshot, StreamingDetectors
+from dashboard.fleet import FleetHistory
+from dashboard.history import SensorHistory
+from dashboard.rollups import TREND_WINDOWS, RollupStore, trend_window
+from services.cloud.schema import DEFAULT_EQUIPMENT_ID, METRIC_COLUMNS, SENSOR_COLUMNS
+from services.metrics import timer
+from simulation.twin import DigitalTwin, FleetTwin
+
+
+@dataclasses.dataclass(frozen=True)
+class FeedSnapshot:
+    """Everything sessions render for one tick; never changes once published.
+
+    Single-kiln feeds fill ``history``, ``detectors`` and ``long_range``
+    (``{window_s: trend_window(...)}`` for the trend windows viewers picked);
+    fleet feeds fill ``fleet`` (newest reading per kiln) and
+    ``fleet_levels`` (``(kilns, metrics)`` detector levels).
+    """
+    seq: int
+    published_at: float                     # time.monotonic()
+    rows: pd.DataFrame                      # readings added by this tick
+    history: SensorHistory = None
+    detectors: DetectorSnapshot = None
+    long_range: dict = dataclasses.field(default_factory=dict)
+    fleet: FleetHistory = None
+    fleet_levels: np.ndarray = None
+
+    def view(self, history_points):
+        """This snapshot's history narrowed to a session's ``history_points`` (a view, no copy)."""
+        return self.history.snapshot(history_points)
+
+
+def _single_kiln(df):
+    """Rows of ``df`` for the single-plant kiln; rows from before equipment_id existed count as it."""
+    if df is None or "equipment_id" not in df:
+        return df
+    equipment = df["equipment_id"]
+    return df[(equipment == DEFAULT_EQUIPMENT_ID).to_numpy() | equipment.isna().to_numpy()]
+
+
+class LiveFeed:
+    """Process-wide producer of ``FeedSnapshot``s for ``kilns`` kilns.
+
+    ``seed`` (timestamp, equipment_id + metrics rows, e.g. the cached
+    BigQuery history) warms the history, rollups and detectors. New rows go
+    to ``ingest`` (an ``IngestBuffer``) once, whoever is watching. With a
+    ``source`` (``ConsumerSink``), ticks drain its batches instead of
+    advancing ``twin``; its devices must be this feed's kilns.
+    """
+
+    def __init__(self, kilns=1, seed=None, capacity=10_000, interval_s=3.0, ingest=None, idle_s=30.0,
+                 trend_points=600, source=None):
+        self.kilns = int(kilns)
+        self.capacity = int(capacity)
+        self.interval_s = interval_s
+        self.ingest = ingest
+        self.idle_s = idle_s
+        self.trend_points = trend_points
+        self.source = source
+        self.fleet_mode = self.kilns > 1
+
+        if self.fleet_mode:
+            self.twin = FleetTwin(self.kilns)
+            self.fleet = FleetHistory.from_frame(seed, self.twin.equipment_ids, self.capacity)
+            self.detectors = StreamingDetectors(range(self.kilns * len(METRIC_COLUMNS)))
+        else:
+            self.twin = DigitalTwin()
+            seed = _single_kiln(seed)
+            self.history = SensorHistory.from_frame(seed, self.capacity)
+            self.rollups = RollupStore.from_frame(seed)
+            # Warmed up on the loaded history
+            self.detectors = StreamingDetectors(self.history.columns)
+            self.detectors.update_many(self.history.window())
+
+        self._lock = threading.Lock()               # guards the live state above
+        self._cond = threading.Condition()          # guards _latest and _viewers; notified on publish
+        self._viewers = {}                          # viewer -> (cursor, last poll (monotonic), trend window); TTL idle_s
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ticks = 0
+        self._latest = self._snapshot(0, pd.DataFrame(columns=SENSOR_COLUMNS))
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="live-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    # ---- Producer ----
+
+    def tick(self):
+        """Advance the simulation one step, queue the rows for ingest and publish a snapshot."""
+        with timer("feed.tick") as t, self._lock:
+            df = self._next_rows()
+            if not len(df):
+                # The stream has not delivered anything new; nothing to publish
+                return self.latest
+            if self.fleet_mode:
+                # Whole steps of one reading per kiln; every update is vectorized across the fleet
+                self.fleet.extend(df)
+                self.detectors.update_many(
+                    df[METRIC_COLUMNS].to_numpy(dtype=float).reshape(-1, self.kilns * len(METRIC_COLUMNS)))
+            else:
+                self.history.extend(df)
+                self.rollups.extend(df)
+                self.detectors.update_frame(df)
+            self.ticks += 1
+            snapshot = self._snapshot(self.ticks, df)
+            t.items = len(df)
+        if self.ingest is not None:
+            self.ingest.append(df)
+        with self._cond:
+            self._latest = snapshot
+            self._cond.notify_all()
+        return snapshot
+
+    def _next_rows(self):
+        if self.source is None:
+            # Continues the twin's drift and fault state, stamped now
+            return self.twin.next_rows(1)[SENSOR_COLUMNS]
+        # Every batch the stream delivered since the last tick
+        df = self.source.drain()
+        if not len(df):
+            return df
+        df = df[SENSOR_COLUMNS]
+        if df["timestamp"].dt.tz is not None:
+            # Stream batches are stamped in aware UTC; history and ingest are naive UTC
+            df = df.assign(timestamp=df["timestamp"].dt.tz_convert(None))
+        return df
+
+    def _snapshot(self, seq, rows):
+        if self.fleet_mode:
+            return FeedSnapshot(seq, time.monotonic(), rows, fleet=self.fleet.snapshot(),
+                                fleet_levels=self.detectors.level().reshape(self.kilns, -1))
+        history = self.history.snapshot()
+        long_range = {}
+        if len(history):
+            # Each trend window someone is watching, once per tick instead of once per session per render
+            end = history.latest()["timestamp"]
+            long_range = {w: trend_window(self.rollups, end, w, self.trend_points) for w in self._windows()}
+        return FeedSnapshot(seq, time.monotonic(), rows, history=history, detectors=self.detectors.snapshot(),
+                            long_range=long_range)
+
+    def _watching(self):
+        now = time.monotonic()
+        with self._cond:
+            # Sessions that stopped polling (closed tabs never call ``leave``) are dropped after ``idle_s``
+            for viewer in [v for v, (_, seen, _) in self._viewers.items() if now - seen >= self.idle_s]:
+                del self._viewers[viewer]
+            return [(cursor, window) for cursor, _, window in self._viewers.values()]
+
+    def _windows(self):
+        return {window for _, window in self._watching() if window in TREND_WINDOWS.values() and window}
+
+    def _run(self):
+        while not self._stop.is_set():
+            if not self._watching():
+                # Nobody is watching; wait for a session to poll again
+                self._wake.wait(min(1.0, self.idle_s))
+                self._wake.clear()
+                continue
+            started = time.monotonic()
+            try:
+                self.tick()
+            except Exception as exc:
+                # Counted as an errored ``feed.tick``; try again next interval
+                print(f"❌ Live feed tick failed: {exc}")
+            self._stop.wait(max(0.0, self.interval_s - (time.monotonic() - started)))
+
+    # ---- Subscribers ----
+
+    @property
+    def latest(self):
+        with self._cond:
+            return self._latest
+
+    def wait(self, viewer, cursor, timeout=None, window_s=None):
+        """Newest snapshot once it is past ``cursor`` (or the latest after ``timeout``).
+
+        Also marks ``viewer`` as watching, which keeps the producer running,
+        and asks for its ``window_s`` trend window in later snapshots.
+        """
+        with self._cond:
+            first = viewer not in self._viewers or time.monotonic() - self._viewers[viewer][1] >= self.idle_s
+            self._viewers[viewer] = (cursor, time.monotonic(), window_s)
+        if first:
+            self._wake.set()
+        with self._cond:
+            self._cond.wait_for(lambda: self._latest.seq > cursor or self._stop.is_set(), timeout)
+            snapshot = self._latest
+            self._viewers[viewer] = (snapshot.seq, time.monotonic(), window_s)
+        return snapshot
+
+    def leave(self, viewer):
+        with self._cond:
+            self._viewers.pop(viewer, None)
+
+    def long_range(self, snapshot, window_s):
+        """``snapshot``'s trend for ``window_s``; computed on the spot if no viewer had asked for it yet."""
+        if window_s is None or snapshot.history is None or not len(snapshot.history):
+            return None
+        if window_s in snapshot.long_range:
+            return snapshot.long_range[window_s]
+        with self._lock:
+            return trend_window(self.rollups, snapshot.history.latest()["timestamp"], window_s, self.trend_points)
+
+    def asset(self, equipment_id, n=None):
+        """Copy of one kiln's newest ``n`` rows (fleet feeds), consistent with the live state."""
+        with self._lock:
+            return self.fleet.asset(equipment_id, n)
+
+    def stats(self):
+        watching = [cursor for cursor, _ in self._watching()]
+        seq = self.latest.seq
+        return {
+            "seq": seq,
+            "viewers": len(watching),
+            "max_lag": seq - min(watching) if watching else 0,
+            "running": bool(watching) and self._thread is not None and self._thread.is_alive(),
+        }
@@ -0,0 +1,226 @@
+"""
+Fleet mode: many kilns side by side.
+
+``FleetHistory`` keeps one fixed-capacity ring buffer per asset in a single
+``(assets, 2 * capacity, metrics)`` array (same mirrored layout as
+``SensorHistory``), so a tick for every asset is one vectorized write and
+the newest reading of the whole fleet is one fancy-indexed read.
+``fleet_status`` scores those latest readings with the shared severity
+rules in one pass per metric, and ``render_fleet`` draws an overview that
+only touches latest values, never each asset's full history.
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from agents.rules import CRITICAL, ICONS, NORMAL, RULES, WARNING, score_frame, stage_levels
+from dashboard.history import SensorHistory, _to_epoch_ns
+from services.cloud.schema import DEFAULT_EQUIPMENT_ID, METRIC_COLUMNS
+from services.metrics import timed
+
+# Metrics shown on the overview cards (short labels)
+CARD_METRICS = {
+    "kiln_temp_C": "🔥 °C",
+    "mill_power_kW": "⚡ kW",
+    "AF_rate_percent": "🌱 AF%",
+    "clinker_free_lime_percent": "🧪 FL%",
+    "CO2_emission_kgpt": "🌍 CO₂",
+}
+STATUS_COLORS = {NORMAL: "#e8fbe6", WARNING: "#fff5e6", CRITICAL: "#ffe5e5"}
+
+
+class FleetHistory:
+    """Per-asset ring buffers for ``equipment_ids``, ``capacity`` rows each."""
+
+    def __init__(self, equipment_ids, capacity, columns=METRIC_COLUMNS):
+        self.equipment_ids = list(equipment_ids)
+        self.capacity = int(capacity)
+        self.columns = list(columns)
+        self._asset = {e: i for i, e in enumerate(self.equipment_ids)}
+        n = len(self.equipment_ids)
+        self._values = np.full((n, 2 * self.capacity, len(self.columns)), np.nan)
+        self._ts = np.zeros((n, 2 * self.capacity), dtype=np.int64)
+        self._head = np.zeros(n, dtype=np.int64)
+        self._size = np.zeros(n, dtype=np.int64)
+        self.total = np.zeros(n, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df, equipment_ids, capacity, columns=METRIC_COLUMNS):
+        fleet = cls(equipment_ids, capacity, columns)
+        if df is not None and len(df):
+            fleet.extend(df)
+        return fleet
+
+    def __len__(self):
+        return len(self.equipment_ids)
+
+    @property
+    def rows(self):
+        return int(self._size.sum())
+
+    # ---- Writes ----
+
+    def _codes(self, df):
+        if "equipment_id" not in df:
+            ids = np.full(len(df), DEFAULT_EQUIPMENT_ID, dtype=object)
+        else:
+            ids = df["equipment_id"].to_numpy(dtype=object)
+        return pd.Series(ids).map(self._asset).fillna(-1).to_numpy(dtype=np.int64)
+
+    def extend(self, df):
+        """Append rows of a long frame (timestamp, equipment_id + metrics); unknown assets are skipped.
+
+        A tick with one row per asset is a single vectorized write; rows for
+        the same asset are applied in order, one round per repeat.
+        """
+        if not len(df):
+            return
+        codes = self._codes(df)
+        keep = codes >= 0
+        codes = codes[keep]
+        values = df[self.columns].to_numpy(dtype=np.float64)[keep]
+        ts = _to_epoch_ns(df["timestamp"])[keep]
+        # Occurrence number of each row within its asset, so every round touches an asset at most once
+        if not len(codes) or np.bincount(codes).max() == 1:
+            rank = np.zeros(len(codes), dtype=np.int64)
+        else:
+            rank = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+        for r in range(int(rank.max()) + 1 if len(rank) else 0):
+            sel = rank == r
+            assets = codes[sel]
+            head = self._head[assets]
+            for offset in (0, self.capacity):
+                self._values[assets, head + offset] = values[sel]
+                self._ts[assets, head + offset] = ts[sel]
+            self._head[assets] = (head + 1) % self.capacity
+            self._size[assets] = np.minimum(self._size[assets] + 1, self.capacity)
+            self.total[assets] += 1
+
+    def resize(self, capacity):
+        """Return a fleet history with a new capacity holding each asset's newest rows."""
+        if capacity == self.capacity:
+            return self
+        resized = FleetHistory(self.equipment_ids, capacity, self.columns)
+        n = min(self.capacity, resized.capacity)
+        for asset in range(len(self)):
+            size = min(int(self._size[asset]), n)
+            end = self._head[asset] + self.capacity
+            rows = slice(end - size, end)
+            head = np.arange(size)
+            for offset in (0, resized.capacity):
+                resized._values[asset, head + offset] = self._values[asset, rows]
+                resized._ts[asset, head + offset] = self._ts[asset, rows]
+            resized._head[asset] = size % resized.capacity
+            resized._size[asset] = size
+        resized.total = self.total.copy()
+        return resized
+
+    def snapshot(self):
+        """Read-only fleet history holding only each asset's newest reading (all the overview reads).
+
+        Costs one row per asset however long the histories are; drill-down
+        into one asset still goes through ``asset`` on the live history.
+        """
+        frozen = FleetHistory(self.equipment_ids, 1, self.columns)
+        latest = self.latest_values()
+        frozen._values = np.repeat(latest[:, None], 2, axis=1)
+        frozen._ts = np.repeat(self.latest_timestamps()[:, None], 2, axis=1)
+        frozen._size = np.minimum(self._size, 1)
+        frozen.total = self.total.copy()
+        for array in (frozen._values, frozen._ts, frozen._size, frozen.total):
+            array.flags.writeable = False
+        return frozen
+
+    # ---- Reads ----
+
+    def latest_values(self):
+        """(assets, metrics) newest reading per asset; NaN for assets that have not reported."""
+        return self._values[np.arange(len(self)), self._head + self.capacity - 1]
+
+    def latest_timestamps(self):
+        ts = self._ts[np.arange(len(self)), self._head + self.capacity - 1]
+        return np.where(self._size > 0, ts, 0)
+
+    def latest(self):
+        """Newest reading per asset as a DataFrame indexed by equipment_id."""
+        df = pd.DataFrame(self.latest_values(), columns=self.columns,
+                          index=pd.Index(self.equipment_ids, name="equipment_id"))
+        ts = pd.to_datetime(self.latest_timestamps(), utc=True)
+        df.insert(0, "timestamp", ts.where(self._size > 0))
+        return df
+
+    def asset(self, equipment_id, n=None):
+        """One asset's newest ``n`` rows as a ``SensorHistory`` (a copy), for drill-down."""
+        asset = self._asset[equipment_id]
+        capacity = self.capacity if n is None else max(1, min(int(n), self.capacity))
+        size = min(int(self._size[asset]), capacity)
+        end = self._head[asset] + self.capacity
+        history = SensorHistory(capacity, self.columns)
+        if size:
+            df = pd.DataFrame(self._values[asset, end - size:end], columns=self.columns)
+            df.insert(0, "timestamp", pd.to_datetime(self._ts[asset, end - size:end], utc=True))
+            history.extend(df)
+        history.total = int(self.total[asset])
+        return history
+
+
+def fleet_status(fleet, detector_levels=None, rules=None):
+    """One row per asset: latest values, rule level, worst stage and overall status.
+
+    ``detector_levels`` is an optional ``(assets, metrics)`` array of
+    streaming detector levels; the status is the worse of the two.
+    """
+    rules = {m: r for m, r in (rules or RULES).items() if m in fleet.columns}
+    latest = fleet.latest()
+    levels = score_frame(latest, rules)
+    stages = stage_levels(levels, rules)
+    rule_level = np.max(np.stack(list(levels.values())), axis=0) if levels else np.zeros(len(fleet), np.int8)
+    status = latest.copy()
+    status["rule_level"] = rule_level
+    stage_names = np.array(list(stages))
+    stage_matrix = np.stack(list(stages.values()))
+    status["worst_stage"] = np.where(stage_matrix.max(axis=0) > NORMAL, stage_names[stage_matrix.argmax(axis=0)], "")
+    status["detector_level"] = (np.asarray(detector_levels).max(axis=1) if detector_levels is not None
+                                else np.zeros(len(fleet), dtype=np.int8))
+    status["level"] = np.maximum(status["rule_level"], status["detector_level"])
+    status.loc[fleet._size == 0, "level"] = -1
+    status["status"] = status["level"].map(ICONS)
+    return status
+
+
+@timed("dashboard.render_fleet")
+def render_fleet(fleet, detector_levels=None, cards=12, per_row=6):
+    """Fleet overview: status counts, cards for the ``cards`` worst assets and a table of all of them.
+
+    Cost grows with the number of assets (one row each), not with history
+    length. Returns the status frame, worst first.
+    """
+    status = fleet_status(fleet, detector_levels).sort_values(["level", "rule_level"], ascending=False,
+                                                              kind="stable")
+    counts = status["level"].value_counts()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("🏭 Assets", len(fleet))
+    c2.metric(f"{ICONS[NORMAL]} Normal", int(counts.get(NORMAL, 0)))
+    c3.metric(f"{ICONS[WARNING]} Warning", int(counts.get(WARNING, 0)))
+    c4.metric(f"{ICONS[CRITICAL]} Critical", int(counts.get(CRITICAL, 0)))
+
+    worst = status.head(cards)
+    for start in range(0, len(worst), per_row):
+        for col, (equipment_id, row) in zip(st.columns(per_row), worst.iloc[start:start + per_row].iterrows()):
+            lines = "<br>".join(f"{label} {row[metric]:.1f}" for metric, label in CARD_METRICS.items()
+                                if metric in row)
+            color = STATUS_COLORS.get(row["level"], "#f0f0f0")
+            with col:
+                st.markdown(
+                    f"""
+                    <div style="background-color:{color}; border-radius:12px; padding:10px; margin-bottom:8px;">
+                        <b style="color:black;">{row['status']} {equipment_id}</b>
+                        <p style="font-size:13px; color:black; margin:0;">{lines}</p>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+
+    table = status[["status", "worst_stage", *CARD_METRICS]].round(2)
+    st.dataframe(table, use_container_width=True, height=min(400, 38 + 35 * len(table)))
+    return status
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+
+from services.cloud.schema import METRIC_COLUMNS
+
+
+def _to_epoch_ns(values):
+    """Timestamps (naive = UTC) as int64 nanoseconds since epoch."""
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).as_unit("ns").asi8
+
+
+class SensorHistory:
+    """Fixed-capacity sensor history with O(1) append and zero-copy windows.
+
+    Every row is written twice, at ``i`` and ``i + capacity``, so the most
+    recent ``n`` rows are always one contiguous slice of the backing arrays
+    and can be handed out as NumPy views without copying. Memory is fixed at
+    ``2 * capacity`` rows regardless of how long the simulation runs.
+    """
+
+    def __init__(self, capacity, columns=METRIC_COLUMNS):
+        self.capacity = int(capacity)
+        self.columns = list(columns)
+        self._index = {c: i for i, c in enumerate(self.columns)}
+        self._values = np.full((2 * self.capacity, len(self.columns)), np.nan)
+        self._ts = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._head = 0    # next write position in [0, capacity)
+        self._size = 0
+        self.total = 0    # rows ever appended; used as the chart step
+
+    @classmethod
+    def from_frame(cls, df, capacity, columns=METRIC_COLUMNS):
+        history = cls(capacity, columns)
+        if df is not None and len(df):
+            history.extend(df)
+        return history
+
+    def __len__(self):
+        return self._size
+
+    # ---- Writes ----
+
+    def append(self, row):
+        """Append one reading (dict, Series or namedtuple-like mapping)."""
+        values = [row[c] for c in self.columns]
+        ts = _to_epoch_ns([row["timestamp"]])[0]
+        for i in (self._head, self._head + self.capacity):
+            self._values[i] = values
+            self._ts[i] = ts
+        self._advance(1)
+
+    def extend(self, df):
+        """Append all rows of ``df`` in one vectorized write."""
+        n = len(df)
+        if n == 0:
+            return
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        ts = _to_epoch_ns(df["timestamp"])
+        if n > self.capacity:
+            # Only the newest ``capacity`` rows can survive
+            self.total += n - self.capacity
+            values, ts, n = values[-self.capacity:], ts[-self.capacity:], self.capacity
+
+        first = min(n, self.capacity - self._head)
+        for base in (0, self.capacity):
+            start = self._head + base
+            self._values[start:start + first] = values[:first]
+            self._ts[start:start + first] = ts[:first]
+            if first < n:
+                self._values[base:base + n - first] = values[first:]
+                self._ts[base:base + n - first] = ts[first:]
+        self._advance(n)
+
+    def _advance(self, n):
+        self._head = (self._head + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+        self.total += n
+
+    def resize(self, capacity):
+        """Return a history with a new capacity holding the newest rows."""
+        if capacity == self.capacity:
+            return self
+        resized = SensorHistory(capacity, self.columns)
+        n = min(self._size, resized.capacity)
+        if n:
+            resized.extend(self.to_frame(n))
+        resized.total = self.total
+        return resized
+
+    def snapshot(self, n=None):
+        """Read-only history of the newest ``n`` rows, safe to share across threads.
+
+        Copies the rows once; taking a snapshot of a snapshot is a view.
+        The result cannot be extended.
+        """
+        rows = self._slice(n)
+        frozen = SensorHistory(0, self.columns)
+        frozen._values = self._values[rows]
+        frozen._ts = self._ts[rows]
+        if self._values.flags.writeable:
+            frozen._values, frozen._ts = frozen._values.copy(), frozen._ts.copy()
+            frozen._values.flags.writeable = frozen._ts.flags.writeable = False
+        frozen.capacity = frozen._size = len(frozen._ts)
+        frozen.total = self.total
+        return frozen
+
+    # ---- Zero-copy reads ----
+
+    def _slice(self, n):
+        n = self._size if n is None else max(0, min(n, self._size))
+        end = self._head + self.capacity
+        return slice(end - n, end)
+
+    def window(self, n=None):
+        """(n, len(columns)) view of the newest ``n`` rows, oldest first."""
+        return self._values[self._slice(n)]
+
+    def column(self, name, n=None):
+        """1-D view of one metric over the newest ``n`` rows."""
+        return self._values[self._slice(n), self._index[name]]
+
+    def timestamps(self, n=None):
+        """Epoch-nanosecond view of the newest ``n`` timestamps."""
+        return self._ts[self._slice(n)]
+
+    def steps(self, n=None):
+        n = len(self._ts[self._slice(n)])
+        return np.arange(self.total - n, self.total)
+
+    def latest(self):
+        """Newest reading as a plain dict (timestamp + metrics)."""
+        if not self._size:
+            return {}
+        i = self._head + self.capacity - 1
+        row = dict(zip(self.columns, self._values[i].tolist()))
+        row["timestamp"] = pd.Timestamp(self._ts[i], tz="UTC")
+        return row
+
+    # ---- DataFrame view (copies; only when really needed) ----
+
+    def to_frame(self, n=None):
+        df = pd.DataFrame(self.window(n), columns=self.columns)
+        df.insert(0, "timestamp", pd.to_datetime(self.timestamps(n), utc=True))
+        df["step"] = self.steps(n)
+        return df
@@ -0,0 +1,39 @@
+"""
+Sidebar performance panel: per-stage latency and throughput from
+``services.metrics``, plus local exports for scraping.
+"""
+import json
+
+import pandas as pd
+import streamlit as st
+
+from services.metrics import REGISTRY
+
+
+def perf_frame(registry=REGISTRY):
+    """One row per instrumented stage: calls, p50/p95 latency, throughput and errors."""
+    stages = registry.snapshot()["stages"]
+    df = pd.DataFrame.from_dict(stages, orient="index",
+                                columns=["count", "p50_ms", "p95_ms", "calls_per_s", "items_per_s", "errors"])
+    df.index.name = "stage"
+    return df.rename(columns={"count": "calls", "calls_per_s": "calls/s", "items_per_s": "items/s"})
+
+
+def render_perf_panel(placeholder, registry=REGISTRY):
+    """Redraw the stage table into ``placeholder`` (e.g. ``st.sidebar.empty()``); cheap enough for every tick."""
+    df = perf_frame(registry)
+    with placeholder.container():
+        if df.empty:
+            st.caption("⏱️ No timings recorded yet")
+            return
+        st.caption("⏱️ Stage latency (recent window)")
+        st.dataframe(df.round(2), use_container_width=True, height=min(420, 38 + 35 * len(df)))
+
+
+def render_perf_exports(container, registry=REGISTRY):
+    """Download buttons for the current metrics as Prometheus text and JSON."""
+    c1, c2 = container.columns(2)
+    c1.download_button("⬇️ Prometheus", registry.to_prometheus(), file_name="cemmind_metrics.prom",
+                       mime="text/plain")
+    c2.download_button("⬇️ JSON", json.dumps(registry.snapshot(), indent=2), file_name="cemmind_metrics.json",
+                       mime="application/json")
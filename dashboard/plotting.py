@@ -0,0 +1,112 @@
+"""
+Chart layer: series are downsampled with LTTB (Largest-Triangle-Three-
+Buckets) to a fixed point budget, and figures are kept between reruns so
+each tick only swaps trace data instead of rebuilding Plotly Express
+figures. Browser payload stays flat however long the history gets.
+"""
+import numpy as np
+import plotly.graph_objects as go
+
+
+def lttb(x, y, threshold):
+    """Indices of the LTTB downsample of ``(x, y)`` to ``threshold`` points.
+
+    Keeps the first and last point and, per bucket, the point forming the
+    largest triangle with the previous pick and the next bucket's average,
+    so peaks and fault spikes survive the downsampling.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # threshold - 2 inner buckets over points 1 .. n-2
+    edges = (1 + np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64)
+    edges[-1] = n - 1
+    cx, cy = np.r_[0.0, np.cumsum(x)], np.r_[0.0, np.cumsum(y)]
+    size = edges[1:] - edges[:-1]
+    avg_x = np.r_[(cx[edges[1:]] - cx[edges[:-1]]) / size, x[-1]]
+    avg_y = np.r_[(cy[edges[1:]] - cy[edges[:-1]]) / size, y[-1]]
+
+    picks = np.empty(threshold, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        picks[i + 1] = a
+    return picks
+
+
+class FigureCache:
+    """Figures kept across reruns; ``line``/``band``/``histogram`` only replace trace data."""
+
+    def __init__(self, points=600):
+        self.points = points
+        self._figures = {}
+
+    def _figure(self, key, names, build):
+        fig = self._figures.get(key)
+        if fig is None or [t.name for t in fig.data] != names:
+            fig = self._figures[key] = build()
+        return fig
+
+    def line(self, key, title, x, series):
+        """One line per ``series`` item (name -> values), each LTTB-downsampled to the point budget."""
+        names = list(series)
+
+        def build():
+            fig = go.Figure([go.Scatter(mode="lines", name=name) for name in names])
+            fig.update_layout(title=title, template="plotly_white")
+            return fig
+
+        fig = self._figure(key, names, build)
+        with fig.batch_update():
+            for trace, values in zip(fig.data, series.values()):
+                idx = lttb(x, values, self.points)
+                trace.x, trace.y = x[idx], values[idx]
+        return fig
+
+    def band(self, key, title, frame, metrics):
+        """Mean line with a min–max band per metric, from ``RollupStore.series`` output."""
+        names = [n for m in metrics for n in (f"{m} max", f"{m} min–max", m)]
+
+        def build():
+            traces = []
+            for metric in metrics:
+                traces += [
+                    go.Scatter(mode="lines", line_width=0, showlegend=False, hoverinfo="skip", name=f"{metric} max"),
+                    go.Scatter(mode="lines", line_width=0, fill="tonexty", opacity=0.2, name=f"{metric} min–max"),
+                    go.Scatter(mode="lines", name=metric),
+                ]
+            fig = go.Figure(traces)
+            fig.update_layout(template="plotly_white")
+            return fig
+
+        fig = self._figure(key, names, build)
+        x = frame["timestamp"]
+        with fig.batch_update():
+            for i, metric in enumerate(metrics):
+                for trace, column in zip(fig.data[3 * i:3 * i + 3], ("max", "min", "mean")):
+                    trace.x, trace.y = x, frame[f"{metric}_{column}"]
+            fig.layout.title.text = f"{title} ({frame.attrs.get('resolution', 'raw')} buckets)"
+        return fig
+
+    def histogram(self, key, title, values, label, bins=30):
+        """Histogram binned server-side: ``bins`` bars are sent, not every sample."""
+        def build():
+            fig = go.Figure([go.Bar(name=label)])
+            fig.update_layout(title=title, template="plotly_white", bargap=0.02,
+                              xaxis_title=label, yaxis_title="count")
+            return fig
+
+        fig = self._figure(key, [label], build)
+        values = np.asarray(values, dtype=np.float64)
+        counts, edges = np.histogram(values[np.isfinite(values)], bins=bins)
+        with fig.batch_update():
+            fig.data[0].x = (edges[:-1] + edges[1:]) / 2
+            fig.data[0].y = counts
+            fig.data[0].width = edges[1] - edges[0]
+        return fig
@@ -0,0 +1,217 @@
+"""
+Pre-aggregated rollups (1m / 15m / 1h) for long-range trend charts.
+
+Each level is a ring of time buckets holding count, sum, min and max per
+metric plus a fixed-size reservoir sample of rows for percentiles. New
+rows update every level incrementally in one vectorized pass, so charts
+over weeks of data read a few hundred buckets instead of every raw row.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from dashboard.history import _to_epoch_ns
+from services.cloud.schema import METRIC_COLUMNS
+
+RESOLUTIONS = {"1m": 60, "15m": 900, "1h": 3600}
+# Buckets kept per level: 3 days of 1m, 60 days of 15m, a year of 1h
+DEFAULT_CAPACITY = {"1m": 3 * 1440, "15m": 60 * 96, "1h": 365 * 24}
+RESERVOIR_SIZE = int(os.getenv("ROLLUP_RESERVOIR_SIZE", 32))
+PERCENTILES = (5, 50, 95)
+
+# Trend window choices (seconds); None plots the raw live history
+TREND_WINDOWS = {"Live": None, "1 hour": 3600, "24 hours": 86_400, "7 days": 7 * 86_400, "30 days": 30 * 86_400}
+
+
+class RollupLevel:
+    """One resolution: a ring of ``capacity`` buckets of ``width_s`` seconds."""
+
+    def __init__(self, width_s, capacity, n_metrics, reservoir=RESERVOIR_SIZE, rng=None):
+        self.width_ns = int(width_s * 1e9)
+        self.capacity = int(capacity)
+        self.k = int(reservoir)
+        self._rng = rng if rng is not None else np.random.default_rng()
+        self.bucket = np.full(self.capacity, -1, dtype=np.int64)   # bucket id held by each slot
+        self.count = np.zeros(self.capacity, dtype=np.int64)
+        self.sum = np.zeros((self.capacity, n_metrics))
+        self.min = np.full((self.capacity, n_metrics), np.inf)
+        self.max = np.full((self.capacity, n_metrics), -np.inf)
+        self.reservoir = np.full((self.capacity, self.k, n_metrics), np.nan, dtype=np.float32)
+        self.newest = -1
+
+    def _reset(self, slots):
+        self.count[slots] = 0
+        self.sum[slots] = 0.0
+        self.min[slots] = np.inf
+        self.max[slots] = -np.inf
+        self.reservoir[slots] = np.nan
+
+    def update(self, ts_ns, values):
+        b = ts_ns // self.width_ns
+        self.newest = max(self.newest, int(b.max()))
+        keep = b > self.newest - self.capacity      # older rows no longer fit in the ring
+        if not keep.all():
+            b, values = b[keep], values[keep]
+        order = np.argsort(b, kind="stable")
+        b, values = b[order], values[order]
+        slots = b % self.capacity
+        ids, first, counts = np.unique(b, return_index=True, return_counts=True)
+        id_slots = ids % self.capacity
+
+        # Slots still holding an older bucket are recycled
+        stale = id_slots[self.bucket[id_slots] != ids]
+        self._reset(stale)
+        self.bucket[id_slots] = ids
+
+        # Rows already seen in each row's bucket, before that row
+        seen = np.repeat(self.count[id_slots], counts) + np.arange(len(b)) - np.repeat(first, counts)
+        self.count[id_slots] += counts
+        np.add.at(self.sum, slots, values)
+        np.minimum.at(self.min, slots, values)
+        np.maximum.at(self.max, slots, values)
+
+        # Reservoir sampling (Algorithm R): the n-th row replaces a random sample with probability k/n
+        j = np.where(seen < self.k, seen, (self._rng.random(len(seen)) * (seen + 1)).astype(np.int64))
+        take = j < self.k
+        self.reservoir[slots[take], j[take]] = values[take]
+
+    def buckets(self, start_ns, end_ns):
+        """(bucket ids, slots) present in the ring for ``[start_ns, end_ns]``."""
+        ids = np.arange(max(start_ns // self.width_ns, self.newest - self.capacity + 1),
+                        min(end_ns // self.width_ns, self.newest) + 1)
+        slots = ids % self.capacity
+        valid = self.bucket[slots] == ids
+        return ids[valid], slots[valid]
+
+    def covers(self, start_ns):
+        return start_ns // self.width_ns > self.newest - self.capacity
+
+
+def _percentiles(samples, qs):
+    """Linear-interpolated percentiles along axis 1, ignoring NaN (no per-group Python loop)."""
+    s = np.sort(samples, axis=1)                 # NaN sorts last
+    n = (~np.isnan(s)).sum(axis=1)
+    out = []
+    for q in qs:
+        pos = np.maximum(n - 1, 0) * (q / 100.0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+        frac = pos - lo
+        v_lo = np.take_along_axis(s, lo[:, None, :], axis=1)[:, 0, :]
+        v_hi = np.take_along_axis(s, hi[:, None, :], axis=1)[:, 0, :]
+        out.append(v_lo + (v_hi - v_lo) * frac)
+    return out
+
+
+class RollupStore:
+    """Incrementally maintained min/mean/max/percentile rollups at several resolutions."""
+
+    def __init__(self, columns=METRIC_COLUMNS, resolutions=RESOLUTIONS, capacity=DEFAULT_CAPACITY,
+                 reservoir=RESERVOIR_SIZE, seed=None):
+        self.columns = list(columns)
+        self._index = {c: i for i, c in enumerate(self.columns)}
+        rng = np.random.default_rng(seed)
+        # Finest first
+        self.levels = {name: RollupLevel(width, capacity[name], len(self.columns), reservoir, rng)
+                       for name, width in sorted(resolutions.items(), key=lambda item: item[1])}
+        self.rows = 0
+
+    @classmethod
+    def from_frame(cls, df, **kwargs):
+        store = cls(**kwargs)
+        if df is not None and len(df):
+            store.extend(df)
+        return store
+
+    def extend(self, df):
+        """Fold the rows of ``df`` (timestamp + metric columns) into every level."""
+        if not len(df):
+            return
+        ts = _to_epoch_ns(df["timestamp"])
+        values = df[self.columns].to_numpy(dtype=np.float64)
+        for level in self.levels.values():
+            level.update(ts, values)
+        self.rows += len(df)
+
+    def pick(self, start_ns, end_ns, points):
+        """Coarsest level with at least ``points`` buckets in range, plus the bucket grouping factor.
+
+        Short ranges fall back to the finest level that covers them; ranges
+        longer than every level's retention fall back to the coarsest.
+        """
+        span = max(end_ns - start_ns, 1)
+        names = list(self.levels)
+        chosen = None
+        for name in reversed(names):
+            level = self.levels[name]
+            if span // level.width_ns >= points and level.covers(start_ns):
+                chosen = name
+                break
+        if chosen is None:
+            covering = [name for name in names if self.levels[name].covers(start_ns)]
+            chosen = covering[0] if covering else names[-1]
+        buckets = math.ceil(span / self.levels[chosen].width_ns)
+        return chosen, max(1, math.ceil(buckets / points))
+
+    def series(self, start, end, points=600):
+        """Aggregates between ``start`` and ``end`` in at most ``points`` rows.
+
+        Columns: ``timestamp``, ``count`` and per metric ``<metric>_min``,
+        ``_mean``, ``_max`` and ``_p<q>`` for each of ``PERCENTILES``. The
+        chosen level is in ``df.attrs["resolution"]``.
+        """
+        start_ns, end_ns = (int(v) for v in _to_epoch_ns([start, end]))
+        name, group = self.pick(start_ns, end_ns, points)
+        level = self.levels[name]
+        ids, slots = level.buckets(start_ns, end_ns)
+
+        if not len(ids):
+            df = pd.DataFrame({"timestamp": pd.to_datetime([], utc=True), "count": []})
+        else:
+            # Merge ``group`` adjacent buckets when even the coarsest level has too many
+            origin = start_ns // level.width_ns
+            g = (ids - origin) // group
+            new_group = np.r_[True, g[1:] != g[:-1]]
+            cuts = np.flatnonzero(new_group)
+            member = np.cumsum(new_group) - 1
+            count = np.add.reduceat(level.count[slots], cuts)
+            total = np.add.reduceat(level.sum[slots], cuts)
+            lows = np.minimum.reduceat(level.min[slots], cuts)
+            highs = np.maximum.reduceat(level.max[slots], cuts)
+            samples = np.full((len(cuts), group * level.k, len(self.columns)), np.nan, dtype=np.float32)
+            samples.reshape(len(cuts), group, level.k, -1)[member, (ids - origin) % group] = level.reservoir[slots]
+            qs = _percentiles(samples, PERCENTILES)
+
+            data = {"timestamp": pd.to_datetime(ids[cuts] * level.width_ns, utc=True), "count": count}
+            mean = total / count[:, None]
+            for i, c in enumerate(self.columns):
+                data[f"{c}_min"] = lows[:, i]
+                data[f"{c}_mean"] = mean[:, i]
+                data[f"{c}_max"] = highs[:, i]
+                for q, v in zip(PERCENTILES, qs):
+                    data[f"{c}_p{q}"] = v[:, i]
+            df = pd.DataFrame(data)
+        df.attrs["resolution"] = name if group == 1 else f"{group}×{name}"
+        return df
+
+    def samples(self, metric, start, end, points=600):
+        """Reservoir samples of ``metric`` over the range, for distributions (bounded size)."""
+        start_ns, end_ns = (int(v) for v in _to_epoch_ns([start, end]))
+        name, _ = self.pick(start_ns, end_ns, points)
+        level = self.levels[name]
+        _, slots = level.buckets(start_ns, end_ns)
+        values = level.reservoir[slots, :, self._index[metric]].ravel()
+        return values[~np.isnan(values)]
+
+
+def trend_window(rollups, end, window_s, points=600, sample_metric="CO2_emission_kgpt"):
+    """``(series, samples of sample_metric)`` over the ``window_s`` seconds up to ``end``; None if empty."""
+    if not rollups.rows:
+        return None
+    start = end - pd.Timedelta(seconds=window_s)
+    trend = rollups.series(start, end, points)
+    if not len(trend):
+        return None
+    return trend, rollups.samples(sample_metric, start, end, points)
@@ -1,80 +1,191 @@
 import streamlit as st
-import plotly.express as px
-import asyncio
 import uuid
-from agents.cem_agent import app, analyze_plant, render_process_diagram
+import pandas as pd
+from config import CHART_POINTS, COPILOT_BACKEND
+from dashboard.plotting import FigureCache
+from dashboard.rollups import trend_window
+from agents.cem_agent import get_app, analyze_plant, render_process_diagram
+from agents.copilot_worker import CopilotWorker
+from agents.detectors import stage_severity
+from services.metrics import timed
 
-def render_tabs(df):
-    tab1, tab2, tab3, tab4 = st.tabs(["📈 Trends", "🤖 AI Copilot", "🌿 Sustainability", "📑 Raw Data"])
+TOOLS = {"analyze_plant": analyze_plant}
+
+class CopilotPanel:
+    """Placeholders bound to a background ``CopilotReply``; ``refresh`` redraws them.
+
+    ``detector_levels`` (sensor -> level from the streaming detectors) are
+    folded into the stage severity map drawn on the process diagram.
+    """
+
+    def __init__(self, reply, placeholder, diagram_placeholder, template, detector_levels=None):
+        self.reply = reply
+        self.placeholder = placeholder
+        self.diagram_placeholder = diagram_placeholder
+        self.template = template
+        self.detector_levels = detector_levels or {}
+        self._drawn = None
+        self.refresh()
+
+    @property
+    def done(self):
+        return self.reply.done
+
+    def refresh(self):
+        reply = self.reply
+        state = (reply.status, len(reply.text))
+        if state == self._drawn:
+            return self.done
+        self._drawn = state
+        if reply.text:
+            self.placeholder.markdown(self.template.replace("{text}", reply.text))
+        elif reply.status == "error":
+            self.placeholder.error(f"AI Copilot unavailable: {reply.error}")
+        elif not reply.done:
+            self.placeholder.info("🤖 AI Copilot is thinking...")
+        if self.diagram_placeholder is not None and (reply.severity or any(self.detector_levels.values())):
+            severity = stage_severity(self.detector_levels, reply.severity)
+            self.diagram_placeholder.graphviz_chart(render_process_diagram(severity))
+        return self.done
+
+
+@st.cache_resource
+def get_copilot_worker():
+    """One copilot worker (and event loop) per process, shared by all sessions.
+
+    The agent itself is built by the worker on the first prompt, not here.
+    ``COPILOT_BACKEND=fake`` swaps in the offline ``FakeAdkApp``.
+    """
+    if COPILOT_BACKEND == "fake":
+        from agents.fake_agent import FakeAdkApp
+        return CopilotWorker(FakeAdkApp(), tools=TOOLS)
+    return CopilotWorker(get_app, tools=TOOLS)
+
+
+class DashboardTabs:
+    """The four tabs, created once per script run; ``render_tabs`` refills them every tick.
+
+    The chat box lives here rather than in the per-tick render: its widgets
+    are drawn exactly once per run under stable keys, so a "Send Query"
+    click is still the same widget when the rerun it triggers reads it.
+    """
+
+    def __init__(self):
+        tab1, tab2, tab3, tab4 = st.tabs(["📈 Trends", "🤖 AI Copilot", "🌿 Sustainability", "📑 Raw Data"])
+        self.trends, self.sustainability, self.raw = tab1.empty(), tab3.empty(), tab4.empty()
+        with tab2:
+            self.copilot = st.empty()
+            st.markdown("---")
+            st.subheader("💬 Ask CemMind AI Anything")
+            user_query = st.text_input("Type your question:", "", key="chat_input")
+            clicked = st.button("Send Query", key="chat_send_button")
+            self.question = user_query.strip() if clicked and user_query.strip() else None
+            self.chat = st.empty()
+        self.chat_panel = None
+
+
+def get_figure_cache():
+    """This session's figures, reused across ticks so only trace data changes."""
+    return st.session_state.setdefault("figure_cache", FigureCache(CHART_POINTS))
+
+
+@timed("dashboard.render_tabs")
+def render_tabs(history, rollups=None, window_s=None, detectors=None, long_range=None, tabs=None, seq=0):
+    """Render the dashboard tabs from a ``SensorHistory`` (views, no full-frame copies).
+
+    ``tabs`` is this run's ``DashboardTabs`` (created on the spot if not
+    given); pass the same one on every tick of a run, with the tick's ``seq``
+    (e.g. ``FeedSnapshot.seq``) to key its charts.
+
+    With a ``RollupStore`` and a ``window_s`` trend window, the Trends and
+    Sustainability tabs read pre-aggregated rollups at the coarsest
+    resolution that fills ``CHART_POINTS`` instead of raw rows;
+    ``long_range`` passes that window already computed (``trend_window``,
+    e.g. from a ``FeedSnapshot``) so nothing is queried here. Charts are
+    cached figures whose trace data is swapped each tick; live series are
+    LTTB-downsampled and the histogram is binned before it is sent.
+    ``detectors`` (``StreamingDetectors`` or a snapshot of them) adds anomaly/drift flags to the
+    Trends tab, the copilot prompt and the process diagram.
+
+    Returns the copilot panels; call ``refresh()`` on them to pick up text
+    that streamed in after the render.
+    """
+    steps = history.steps()
+    figures = get_figure_cache()
+    panels = []
+    tabs = tabs or DashboardTabs()
+    if long_range is None and rollups is not None and window_s is not None:
+        end = history.latest()["timestamp"] if len(history) else pd.Timestamp.now(tz="UTC")
+        long_range = trend_window(rollups, end, window_s, CHART_POINTS)
+    if long_range:
+        trend, co2 = long_range
+
+    flags = detectors.flags() if detectors is not None else {}
+    detector_levels = detectors.levels() if detectors is not None else {}
 
     # --- Trends ---
-    with tab1:
-        fig1 = px.line(df, x='step', y=['kiln_temp_C','mill_power_kW'],
-                       title="Kiln Temp & Mill Power", template="plotly_white")
-        st.plotly_chart(fig1, use_container_width=True)
-        fig2 = px.line(df, x='step', y=['AF_rate_percent','clinker_free_lime_percent'],
-                       title="AF Rate & Free Lime", template="plotly_white")
-        st.plotly_chart(fig2, use_container_width=True)
+    with tabs.trends.container():
+        if flags:
+            st.caption("🚨 Detectors: " + " · ".join(f"{sensor}: {', '.join(kinds)}"
+                                                     for sensor, kinds in flags.items()))
+        if long_range:
+            fig1 = figures.band("trend_kiln", "Kiln Temp & Mill Power", trend, ['kiln_temp_C', 'mill_power_kW'])
+            fig2 = figures.band("trend_af", "AF Rate & Free Lime", trend,
+                                ['AF_rate_percent', 'clinker_free_lime_percent'])
+        else:
+            # LTTB-downsampled to CHART_POINTS per series, however long the history is
+            fig1 = figures.line("live_kiln", "Kiln Temp & Mill Power", steps,
+                                {"kiln_temp_C": history.column('kiln_temp_C'),
+                                 "mill_power_kW": history.column('mill_power_kW')})
+            fig2 = figures.line("live_af", "AF Rate & Free Lime", steps,
+                                {"AF_rate_percent": history.column('AF_rate_percent'),
+                                 "clinker_free_lime_percent": history.column('clinker_free_lime_percent')})
+        # Cached figures repeat between ticks; keying by tick lets the loop redraw them in one script run
+        st.plotly_chart(fig1, use_container_width=True, key=f"trend_chart_1_{seq}")
+        st.plotly_chart(fig2, use_container_width=True, key=f"trend_chart_2_{seq}")
 
     # --- AI Copilot ---
-    with tab2:
-        latest_row = df.tail(1).to_dict(orient="records")[0]
+    with tabs.copilot.container():
+        latest_row = {k: v for k, v in history.latest().items() if k != "timestamp"}
         default_prompt = f"Given the latest plant data {latest_row}, suggest 3 optimizations."
-        placeholder = st.empty()
-        suggestion_text = ""
-
-        async def stream_ai_response(message: str):
-            nonlocal suggestion_text
-            async for event in app.async_stream_query(user_id="user123", message=message):
-                parts = event.get("content", {}).get("parts", [])
-                for part in parts:
-                    if "function_call" in part and part["function_call"]["name"] == "analyze_plant":
-                        latest_data = part["function_call"]["args"]["latest_data"]
-                        result = analyze_plant(latest_data)
-                        suggestion_text = result["text"]
-                        placeholder.markdown(f"🤖 **AI Copilot Suggestion:**\n\n{suggestion_text}")
-                        st.graphviz_chart(render_process_diagram(result["severity"]))
-                    elif "text" in part:
-                        suggestion_text += part["text"]
-                        placeholder.markdown(f"🤖 **AI Copilot Suggestion:**\n\n{suggestion_text}")
-
-        with st.spinner("Fetching AI suggestions..."):
-            asyncio.run(stream_ai_response(default_prompt))
-
-        # Run streaming for latest metrics
-
-        st.markdown("---")
-        st.subheader("💬 Ask CemMind AI Anything")
-
-        # Chat input with unique key
-        user_query = st.text_input("Type your question:", "", key=f"chat_input_tab2_{uuid.uuid4()}")
-
-        if st.button("Send Query", key=f"chat_send_button_{uuid.uuid4()}"):
-            chat_placeholder = st.empty()
-            chat_text = ""
-
-            async def stream_chat_response():
-                nonlocal chat_text
-                async for event in app.async_stream_query(user_id="user123", message=user_query.strip()):
-                    parts = event.get("content", {}).get("parts", [])
-                    for part in parts:
-                        if "function_call" in part and part["function_call"]["name"] == "analyze_plant":
-                            latest_data = part["function_call"]["args"]["latest_data"]
-                            chat_text = analyze_plant(latest_data)
-                        elif "text" in part:
-                            chat_text += part["text"]
-                    chat_placeholder.markdown(f"**You asked:** {user_query}\n\n🤖 **AI Response:**\n{chat_text}")
-
-            with st.spinner("Getting AI response..."):
-                asyncio.run(stream_chat_response())
+        if flags:
+            default_prompt += f" Streaming detectors currently flag: {flags}."
+        worker = get_copilot_worker()
+        channel = st.session_state.setdefault("copilot_channel", str(uuid.uuid4()))
+
+        # Submitted to the background worker; text streams in on later refreshes
+        reply = worker.submit(f"{channel}/suggest", worker.cache.key(f"suggest_optimizations{sorted(flags)}", latest_row),
+                              default_prompt)
+        panels.append(CopilotPanel(reply, st.empty(), st.empty(), "🤖 **AI Copilot Suggestion:**\n\n{text}",
+                                   detector_levels))
 
+        stats = worker.cache.stats()
+        st.caption(f"Copilot cache: {stats['hit_rate']:.0%} hit rate · "
+                   f"{stats['saved_latency_s']:.1f}s LLM time saved · "
+                   f"{worker.cancelled} superseded prompts cancelled")
+
+    # A question sent this run is asked once, against the plant state of the first tick that sees it
+    if tabs.question and tabs.chat_panel is None:
+        reply = worker.submit(f"{channel}/chat", worker.cache.key(tabs.question, latest_row), tabs.question)
+        tabs.chat_panel = CopilotPanel(reply, tabs.chat, None,
+                                       f"**You asked:** {tabs.question}\n\n🤖 **AI Response:**\n{{text}}")
+    if tabs.chat_panel is not None:
+        panels.append(tabs.chat_panel)
 
     # --- Sustainability ---
-    with tab3:
-        st.metric("Average CO₂ (kg/ton)", f"{df['CO2_emission_kgpt'].mean():.1f}")
-        fig3 = px.histogram(df, x='CO2_emission_kgpt', nbins=30, title="CO₂ Emission Distribution", template="plotly_white")
-        st.plotly_chart(fig3, use_container_width=True)
+    with tabs.sustainability.container():
+        if long_range:
+            # Reservoir samples (``co2``) keep the histogram payload bounded over any window
+            avg = (trend['CO2_emission_kgpt_mean'] * trend['count']).sum() / max(trend['count'].sum(), 1)
+        else:
+            co2 = history.column('CO2_emission_kgpt')
+            avg = co2.mean()
+        st.metric("Average CO₂ (kg/ton)", f"{avg:.1f}")
+        fig3 = figures.histogram("co2_hist", "CO₂ Emission Distribution", co2, "CO2_emission_kgpt", bins=30)
+        st.plotly_chart(fig3, use_container_width=True, key=f"co2_chart_{seq}")
 
     # --- Raw Data ---
-    with tab4:
-        st.dataframe(df.tail(20), use_container_width=True)
+    with tabs.raw.container():
+        st.dataframe(history.to_frame(20), use_container_width=True)
+
+    return panels
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from dashboard.feed import LiveFeed
+from services.cloud.schema import DEFAULT_EQUIPMENT_ID
+from simulation.stream_producer import ConsumerSink, StreamProducer
+from simulation.twin import FleetTwin
+
+
+def _streamed_feed(kilns, ticks):
+    sink = ConsumerSink()
+    asyncio.run(StreamProducer([sink], devices=kilns, rate_hz=1000, seed=1).run(ticks=ticks))
+    return LiveFeed(kilns, capacity=50, source=sink)
+
+
+def test_tick_publishes_streamed_batches():
+    feed = _streamed_feed(1, 3)
+    snapshot = feed.tick()
+    assert snapshot.seq == 1
+    assert len(snapshot.rows) == 3
+    assert len(snapshot.history) == 3
+    assert snapshot.rows["timestamp"].dt.tz is None
+
+
+def test_fleet_tick_consumes_whole_steps():
+    feed = _streamed_feed(4, 2)
+    snapshot = feed.tick()
+    assert len(snapshot.rows) == 8
+    assert feed.detectors.steps == 2
+    assert snapshot.fleet_levels.shape == (4, len(feed.fleet.columns))
+
+
+def test_empty_stream_publishes_nothing():
+    feed = LiveFeed(1, capacity=50, source=ConsumerSink())
+    assert feed.tick().seq == 0
+
+
+def test_idle_viewers_are_pruned():
+    feed = LiveFeed(1, capacity=50, idle_s=0.05)
+    feed.wait("gone", 0, timeout=0)
+    feed.wait("active", 0, timeout=0)
+    assert feed.stats()["viewers"] == 2
+    time.sleep(0.06)
+    feed.wait("active", 0, timeout=0)
+    assert feed.stats()["viewers"] == 1
+    assert list(feed._viewers) == ["active"]
+
+
+def test_single_kiln_feed_ignores_other_kilns_in_the_seed():
+    seed = FleetTwin(3, seed=1).generate(10)
+    feed = LiveFeed(1, seed=seed, capacity=50)
+    assert len(feed.history) == 10
+    assert feed.history.timestamps().tolist() == sorted(set(feed.history.timestamps().tolist()))
+    kiln = seed[seed["equipment_id"] == DEFAULT_EQUIPMENT_ID]
+    assert feed.history.column("kiln_temp_C").tolist() == kiln["kiln_temp_C"].tolist()
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard.history import SensorHistory
+
+COLUMNS = ["a", "b"]
+
+
+def frame(start, n):
+    values = np.arange(start, start + n, dtype=float)
+    return pd.DataFrame({"timestamp": pd.to_datetime(values, unit="s"), "a": values, "b": -values})
+
+
+def test_wraparound_keeps_newest_rows_in_order():
+    history = SensorHistory(5, COLUMNS)
+    written = 0
+    for n in (3, 4, 1, 6, 2):
+        history.extend(frame(written, n))
+        written += n
+        expected = np.arange(max(0, written - 5), written, dtype=float)
+        np.testing.assert_array_equal(history.column("a"), expected)
+        np.testing.assert_array_equal(history.window()[:, 1], -expected)
+        np.testing.assert_array_equal(history.timestamps(), expected.astype(np.int64) * 10 ** 9)
+    assert len(history) == 5
+    assert history.total == written
+    np.testing.assert_array_equal(history.steps(), np.arange(written - 5, written))
+    np.testing.assert_array_equal(history.column("a", 2), [written - 2, written - 1])
+
+
+def test_append_matches_extend():
+    appended, extended = SensorHistory(4, COLUMNS), SensorHistory(4, COLUMNS)
+    df = frame(0, 7)
+    for _, row in df.iterrows():
+        appended.append(row)
+    extended.extend(df)
+    np.testing.assert_array_equal(appended.window(), extended.window())
+    assert appended.latest() == extended.latest()
+    assert appended.latest()["a"] == 6.0
+
+
+def test_snapshot_is_frozen_and_unaffected_by_later_writes():
+    history = SensorHistory(4, COLUMNS)
+    history.extend(frame(0, 6))
+    snapshot = history.snapshot(3)
+    history.extend(frame(6, 4))
+    np.testing.assert_array_equal(snapshot.column("a"), [3.0, 4.0, 5.0])
+    np.testing.assert_array_equal(snapshot.snapshot(2).column("a"), [4.0, 5.0])
+    with pytest.raises(ValueError):
+        snapshot.window()[0, 0] = 0.0
+
+
+def test_resize_keeps_newest_rows():
+    history = SensorHistory(4, COLUMNS)
+    history.extend(frame(0, 6))
+    np.testing.assert_array_equal(history.resize(2).column("a"), [4.0, 5.0])
+    grown = history.resize(10)
+    np.testing.assert_array_equal(grown.column("a"), [2.0, 3.0, 4.0, 5.0])
+    assert grown.total == 6
@@ -0,0 +1,85 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import Settings
+from dashboard.rollups import RollupStore
+
+T0 = pd.Timestamp("2024-01-01", tz="UTC")
+DAY_NS = 86_400 * 10 ** 9
+CHART_POINTS = Settings().chart_points     # the default, whatever the environment sets
+
+
+def frame(offsets_s, values):
+    return pd.DataFrame({"timestamp": T0 + pd.to_timedelta(offsets_s, unit="s"), "a": values})
+
+
+def one_level(width_s=60, capacity=10):
+    return RollupStore(columns=["a"], resolutions={"1m": width_s}, capacity={"1m": capacity}, seed=1)
+
+
+def test_bucket_boundaries_are_left_closed():
+    store = one_level()
+    store.extend(frame([0, 59.999, 60, 119, 120], [1.0, 2.0, 3.0, 4.0, 5.0]))
+    df = store.series(T0, T0 + pd.Timedelta(minutes=3), points=10)
+    assert list(df["timestamp"]) == [T0, T0 + pd.Timedelta(minutes=1), T0 + pd.Timedelta(minutes=2)]
+    assert list(df["count"]) == [2, 2, 1]
+    assert list(df["a_min"]) == [1.0, 3.0, 5.0]
+    assert list(df["a_max"]) == [2.0, 4.0, 5.0]
+
+
+def test_ring_keeps_only_the_newest_capacity_buckets():
+    store = one_level(capacity=3)
+    store.extend(frame(np.arange(0, 600, 30), np.arange(20.0)))
+    df = store.series(T0, T0 + pd.Timedelta(minutes=10), points=10)
+    assert list(df["timestamp"]) == [T0 + pd.Timedelta(minutes=m) for m in (7, 8, 9)]
+    assert list(df["a_mean"]) == [14.5, 16.5, 18.5]
+
+
+@pytest.mark.parametrize("name, rule", [("1m", "1min"), ("15m", "15min"), ("1h", "1h")])
+def test_aggregates_match_pandas_resample(name, rule):
+    rng = np.random.default_rng(3)
+    offsets = np.sort(rng.uniform(0, 2 * 86_400, 20_000))
+    df = frame(offsets, rng.normal(100.0, 10.0, len(offsets)))
+    store = RollupStore(columns=["a"], seed=1)
+    # Out of order and in several batches, as the feed delivers them
+    for part in np.array_split(rng.permutation(len(df)), 7):
+        store.extend(df.iloc[np.sort(part)])
+
+    level = store.levels[name]
+    ids, slots = level.buckets(0, 2 * 10 ** 19)
+    expected = df.set_index("timestamp")["a"].resample(rule).agg(["count", "min", "mean", "max"])
+    expected = expected[expected["count"] > 0]
+    np.testing.assert_array_equal(pd.to_datetime(ids * level.width_ns, utc=True), expected.index)
+    np.testing.assert_array_equal(level.count[slots], expected["count"])
+    np.testing.assert_array_equal(level.min[slots, 0], expected["min"])
+    np.testing.assert_array_equal(level.max[slots, 0], expected["max"])
+    np.testing.assert_allclose(level.sum[slots, 0] / level.count[slots], expected["mean"], rtol=1e-12)
+
+
+@pytest.mark.parametrize("days, name, group", [
+    (0.25, "1m", 1),        # 360 1m buckets: nothing fills the chart, so the finest level
+    (1, "1m", 3),           # 1440 1m, 96 15m
+    (7, "15m", 2),          # 672 15m, 168 1h (and 1m no longer covers the start)
+    (30, "1h", 2),          # 720 1h
+    (360, "1h", 15),        # 8640 1h
+])
+def test_pick_returns_the_coarsest_level_that_fills_the_chart(days, name, group):
+    store = RollupStore(columns=["a"])
+    store.extend(frame([400 * 86_400], [1.0]))
+    end = (T0 + pd.Timedelta(days=400)).value
+    chosen, factor = store.pick(end - int(days * DAY_NS), end, CHART_POINTS)
+    assert (chosen, factor) == (name, group)
+    assert math.ceil(days * DAY_NS / store.levels[name].width_ns / factor) <= CHART_POINTS
+
+
+def test_pick_falls_back_to_the_finest_level_that_covers_the_start():
+    store = RollupStore(columns=["a"], capacity={"1m": 10, "15m": 10, "1h": 1000})
+    store.extend(frame([30 * 86_400], [1.0]))
+    end = (T0 + pd.Timedelta(days=30)).value
+    hour = 3600 * 10 ** 9
+    # The 1m ring reaches back 10 minutes, the 15m ring 150
+    assert store.pick(end - 2 * hour, end, CHART_POINTS) == ("15m", 1)
+    assert store.pick(end - 3 * hour, end, CHART_POINTS) == ("1h", 1)
@@ -1,9 +1,37 @@
 # services/cloud/__init__.py
 """
 Cloud clients (BigQuery, GCS, etc.).
+
+Names are resolved from their submodules on first access, so importing one
+light module (e.g. ``services.cloud.schema``) doesn't pull in the BigQuery
+SDK, Arrow or the ingestion threads.
 """
+import importlib
+
+_EXPORTS = {
+    "get_bigquery_client": "clients", "get_storage_client": "clients",
+    "load_from_gcs": "bigquery_client", "load_csv_from_gcs": "bigquery_client",
+    "load_parquet_from_gcs": "bigquery_client", "query_sample": "bigquery_client",
+    "last_query_stats": "bigquery_client",
+    "ensure_sensor_table": "tables", "sensor_table_definition": "tables",
+    "SENSOR_SCHEMA": "schema", "SENSOR_COLUMNS": "schema", "write_staging": "schema",
+    "service_account_credentials": "google_auth", "CredentialsProvider": "google_auth",
+    "get_credentials": "google_auth", "get_credentials_provider": "google_auth",
+    "IngestBuffer": "ingest_buffer", "BigQuerySink": "ingest_buffer", "CsvFileSink": "ingest_buffer",
+    "SQLiteSink": "ingest_buffer",
+    "IncrementalHistoryReader": "history_reader",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
 
-from .bigquery_client import load_csv_from_gcs, query_sample
-from .google_auth import service_account_credentials
 
-__all__ = ["service_account_credentials","load_csv_from_gcs", "query_sample"]
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,38 +1,62 @@
-from google.cloud import bigquery
-from dotenv import load_dotenv
-import streamlit as st
 import os
+import datetime as dt
+from collections import deque
+from services.cloud.clients import get_bigquery_client
+from services.cloud.schema import SENSOR_COLUMNS, bigquery_schema, staging_format
+from services.cloud.tables import PARTITION_FIELD, ensure_sensor_table
+from config import load_env
+from services.metrics import timed
 
-# load .env file
-load_dotenv()
+load_env()
 
 PROJECT = os.getenv("PROJECT")
 DATASET = os.getenv("DATASET")
 TABLE = os.getenv("TABLE")
 GCS_URI = os.getenv("GCS_URI")
 
-def load_csv_from_gcs(project, dataset_id, table_id, gcs_uri, write_disposition="WRITE_APPEND"):
-    client = bigquery.Client(project=project)
-
-    dataset_ref = client.dataset(dataset_id)
-    table_ref = dataset_ref.table(table_id)
-    schema = [
-        bigquery.SchemaField("timestamp", "TIMESTAMP"),
-        bigquery.SchemaField("kiln_temp_C", "FLOAT"),
-        bigquery.SchemaField("mill_power_kW", "FLOAT"),
-        bigquery.SchemaField("AF_rate_percent", "FLOAT"),
-        bigquery.SchemaField("clinker_free_lime_percent", "FLOAT"),
-        bigquery.SchemaField("CO2_emission_kgpt", "FLOAT")
-    ]
-
-    job_config = bigquery.LoadJobConfig(
-        source_format=bigquery.SourceFormat.CSV,
-        skip_leading_rows=1,
-        schema=schema,
-        write_disposition=write_disposition,
-        allow_quoted_newlines=True,
-        field_delimiter=","
-    )
+# Default time window for history queries; keeps every query partition-pruned
+QUERY_LOOKBACK_DAYS = float(os.getenv("QUERY_LOOKBACK_DAYS", 7))
+
+# Bytes scanned per recent query, newest last
+_query_log = deque(maxlen=100)
+
+
+def last_query_stats():
+    """Stats for the most recent query (rows, bytes_processed, window), or None."""
+    return _query_log[-1] if _query_log else None
+
+@timed("cloud.load_from_gcs")
+def load_from_gcs(project, dataset_id, table_id, gcs_uri, write_disposition="WRITE_APPEND", source_format=None):
+    """Append (or truncate-load) a staged CSV or Parquet blob into BigQuery."""
+    from google.cloud import bigquery
+
+    client = get_bigquery_client(project)
+    table_ref = f"{project}.{dataset_id}.{table_id}"
+    # Loads into a missing table would create it unpartitioned
+    ensure_sensor_table(project, dataset_id, table_id)
+    source_format = source_format or staging_format(gcs_uri)
+    # Lets appends add new schema columns (e.g. equipment_id) to an existing table
+    schema_updates = ([bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION]
+                      if write_disposition == "WRITE_APPEND" else None)
+
+    if source_format == "parquet":
+        # Parquet carries its own column types; no text parsing on load
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            schema=bigquery_schema(),
+            write_disposition=write_disposition,
+            schema_update_options=schema_updates,
+        )
+    else:
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.CSV,
+            skip_leading_rows=1,
+            schema=bigquery_schema(),
+            write_disposition=write_disposition,
+            schema_update_options=schema_updates,
+            allow_quoted_newlines=True,
+            field_delimiter=","
+        )
 
     load_job = client.load_table_from_uri(
         gcs_uri,
@@ -44,22 +68,50 @@ def load_csv_from_gcs(project, dataset_id, table_id, gcs_uri, write_disposition=
     destination_table = client.get_table(table_ref)
     print(f"Loaded {destination_table.num_rows} rows into {dataset_id}.{table_id}")
 
-def query_sample(project, dataset_id, table_id):
-    client = bigquery.Client(project=project)
+def load_csv_from_gcs(project, dataset_id, table_id, gcs_uri, write_disposition="WRITE_APPEND"):
+    load_from_gcs(project, dataset_id, table_id, gcs_uri, write_disposition, source_format="csv")
+
+def load_parquet_from_gcs(project, dataset_id, table_id, gcs_uri, write_disposition="WRITE_APPEND"):
+    load_from_gcs(project, dataset_id, table_id, gcs_uri, write_disposition, source_format="parquet")
+
+@timed("cloud.query_sample", items=len)
+def query_sample(project, dataset_id, table_id, limit=500, columns=None, since=None, until=None,
+                 equipment_id=None):
+    """Newest ``limit`` rows (newest first) with ``since < timestamp <= until``.
+
+    ``since`` defaults to ``QUERY_LOOKBACK_DAYS`` ago so the query always
+    prunes partitions; ``equipment_id`` filters on the clustering column.
+    ``columns`` is pushed into the SELECT so BigQuery only reads those columns.
+    """
+    from google.cloud import bigquery
+
+    client = get_bigquery_client(project)
+    columns = columns or [c for c in SENSOR_COLUMNS if c != "timestamp"]
+    if since is None:
+        since = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=QUERY_LOOKBACK_DAYS)
+    where = [f"{PARTITION_FIELD} > @since"]
+    params = [bigquery.ScalarQueryParameter("since", "TIMESTAMP", since)]
+    if until is not None:
+        where.append(f"{PARTITION_FIELD} <= @until")
+        params.append(bigquery.ScalarQueryParameter("until", "TIMESTAMP", until))
+    if equipment_id is not None:
+        where.append("equipment_id = @equipment_id")
+        params.append(bigquery.ScalarQueryParameter("equipment_id", "STRING", equipment_id))
     sql = f"""
     SELECT
       TIMESTAMP(timestamp) AS ts,
-      kiln_temp_C,
-      mill_power_kW,
-      AF_rate_percent,
-      clinker_free_lime_percent,
-      CO2_emission_kgpt
+      {", ".join(columns)}
     FROM `{project}.{dataset_id}.{table_id}`
+    WHERE {" AND ".join(where)}
     ORDER BY ts DESC
-    LIMIT 500
+    LIMIT {int(limit)}
     """
-    df = client.query(sql).to_dataframe()
-    print(df)
+    job = client.query(sql, job_config=bigquery.QueryJobConfig(query_parameters=params))
+    df = job.to_dataframe()
+    scanned = job.total_bytes_processed or 0
+    _query_log.append({"table": f"{dataset_id}.{table_id}", "rows": len(df), "bytes_processed": scanned,
+                       "since": since, "until": until})
+    print(f"🔎 Fetched {len(df)} rows from {dataset_id}.{table_id} ({scanned / 1e6:.2f} MB scanned)")
     return df
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+"""
+Process-wide registry of cloud clients.
+
+Each client is created once per process (per project) and shared across
+threads, with the in-memory credentials from ``google_auth``. Set
+``CLOUD_BACKEND=local`` to swap in the filesystem/SQLite stand-ins from
+``local_backend`` so the pipeline runs offline.
+"""
+import os
+import threading
+
+from config import load_env
+
+load_env()
+
+CLOUD_BACKEND = os.getenv("CLOUD_BACKEND", "gcp")
+LOCAL_CLOUD_DIR = os.getenv("LOCAL_CLOUD_DIR", ".local_cloud")
+
+_clients = {}
+_lock = threading.RLock()
+
+
+def _get_or_create(key, factory):
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = factory()
+                _clients[key] = client
+    return client
+
+
+def is_local_backend():
+    return CLOUD_BACKEND == "local"
+
+
+def get_storage_client():
+    """Shared GCS client (or the local filesystem stand-in)."""
+    def factory():
+        if is_local_backend():
+            from .local_backend import LocalStorageClient
+            return LocalStorageClient(LOCAL_CLOUD_DIR)
+        from google.cloud import storage
+        from .google_auth import get_credentials_provider
+        provider = get_credentials_provider()
+        return storage.Client(project=provider.project_id, credentials=provider.credentials())
+    return _get_or_create(("storage", CLOUD_BACKEND), factory)
+
+
+def get_bigquery_client(project=None):
+    """Shared BigQuery client for ``project`` (or the local SQLite stand-in)."""
+    def factory():
+        if is_local_backend():
+            from .local_backend import LocalBigQueryClient
+            return LocalBigQueryClient(project, LOCAL_CLOUD_DIR, storage=get_storage_client())
+        from google.cloud import bigquery
+        from .google_auth import get_credentials
+        return bigquery.Client(project=project, credentials=get_credentials())
+    return _get_or_create(("bigquery", CLOUD_BACKEND, project), factory)
+
+
+def use_backend(backend, local_dir=None):
+    """Switch backend at runtime (e.g. from a benchmark) and drop cached clients."""
+    global CLOUD_BACKEND, LOCAL_CLOUD_DIR
+    with _lock:
+        CLOUD_BACKEND = backend
+        if local_dir is not None:
+            LOCAL_CLOUD_DIR = local_dir
+        _clients.clear()
+
+
+def reset_clients():
+    with _lock:
+        _clients.clear()
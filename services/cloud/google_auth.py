@@ -1,27 +1,160 @@
-import os
+"""
+GCP credentials from the ``GOOGLE_CREDENTIALS`` environment variable (a
+service-account key as JSON), built in memory once per process.
+
+The BigQuery, GCS and Vertex clients are handed the credentials object
+directly. Only SDKs that can read nothing but Application Default
+Credentials get a key file, via ``export_adc``: one private file per
+process, removed at exit. When ``GOOGLE_CREDENTIALS`` is unset the clients
+fall back to ADC as before.
+"""
+import atexit
+import datetime as dt
 import json
+import os
 import tempfile
-from dotenv import load_dotenv
+import threading
 from contextlib import contextmanager
-import streamlit as st
-load_dotenv()  # load variables from .env
+
+from config import load_env
+
+load_env()  # load variables from .env
+
+SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
+# Refresh access tokens this long before they expire
+TOKEN_REFRESH_MARGIN_S = float(os.getenv("TOKEN_REFRESH_MARGIN_S", 300))
+
+
+def _utcnow():
+    # google-auth keeps ``expiry`` as a naive UTC datetime
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+class CredentialsProvider:
+    """Parses a service-account key once and caches the credentials built from it.
+
+    ``info`` (a dict or JSON string) overrides the environment variable,
+    and ``clock`` (returning naive UTC datetimes) replaces the wall clock,
+    so the provider can be exercised with a fake key and no network.
+    """
+
+    def __init__(self, info=None, env_var="GOOGLE_CREDENTIALS", scopes=SCOPES,
+                 refresh_margin_s=TOKEN_REFRESH_MARGIN_S, clock=_utcnow):
+        self._info = info
+        self.env_var = env_var
+        self.scopes = list(scopes)
+        self.refresh_margin = dt.timedelta(seconds=refresh_margin_s)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._parsed = None
+        self._credentials = None
+        self._adc_path = None
+        self.builds = 0
+        self.refreshes = 0
+
+    @property
+    def configured(self):
+        return self._info is not None or bool(os.getenv(self.env_var))
+
+    def info(self):
+        """The service-account key as a dict (parsed once), or None when not configured."""
+        if self._parsed is None and self.configured:
+            raw = self._info if self._info is not None else os.getenv(self.env_var)
+            self._parsed = json.loads(raw) if isinstance(raw, (str, bytes)) else dict(raw)
+        return self._parsed
+
+    @property
+    def project_id(self):
+        info = self.info()
+        return info.get("project_id") if info else None
+
+    def credentials(self):
+        """Cached ``google.oauth2.service_account.Credentials``, or None to use ADC."""
+        if self._credentials is None and self.configured:
+            with self._lock:
+                if self._credentials is None:
+                    from google.oauth2 import service_account
+                    self._credentials = service_account.Credentials.from_service_account_info(
+                        self.info(), scopes=self.scopes)
+                    self.builds += 1
+        return self._credentials
+
+    def needs_refresh(self, credentials=None):
+        """True when the access token is missing or expires within the refresh margin."""
+        credentials = credentials or self.credentials()
+        if credentials is None:
+            return False
+        expiry = getattr(credentials, "expiry", None)
+        return not getattr(credentials, "token", None) or (
+            expiry is not None and expiry - self.refresh_margin <= self.clock())
+
+    def token(self, request=None):
+        """A bearer token valid for at least the refresh margin (refreshes at most once per expiry)."""
+        credentials = self.credentials()
+        if credentials is None:
+            return None
+        if self.needs_refresh(credentials):
+            with self._lock:
+                if self.needs_refresh(credentials):
+                    if request is None:
+                        from google.auth.transport.requests import Request
+                        request = Request()
+                    credentials.refresh(request)
+                    self.refreshes += 1
+        return credentials.token
+
+    def export_adc(self):
+        """Point ``GOOGLE_APPLICATION_CREDENTIALS`` at the key for ADC-only SDKs; returns the path.
+
+        Written at most once per process (mode 0600) and deleted at exit; an
+        existing ``GOOGLE_APPLICATION_CREDENTIALS`` is left alone.
+        """
+        if os.getenv("GOOGLE_APPLICATION_CREDENTIALS") or not self.configured:
+            return os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+        with self._lock:
+            if self._adc_path is None:
+                fd, path = tempfile.mkstemp(prefix="gcp-adc-", suffix=".json")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self.info(), f)
+                atexit.register(_remove, path)
+                self._adc_path = path
+            os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = self._adc_path
+        return self._adc_path
+
+    def invalidate(self):
+        """Forget the parsed key and credentials (e.g. after rotating the key)."""
+        with self._lock:
+            self._parsed = None
+            self._credentials = None
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_credentials_provider():
+    """Process-wide ``CredentialsProvider`` shared by every client."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = CredentialsProvider()
+    return _provider
+
+
+def get_credentials():
+    """Shared in-memory credentials, or None when ``GOOGLE_CREDENTIALS`` isn't set (ADC)."""
+    return get_credentials_provider().credentials()
+
 
 @contextmanager
 def service_account_credentials():
-    print("Setting up GCP credentials...")
-    if "gcp_cred_path" not in globals():
-        # Load JSON from env
-        gcp_info = json.loads(os.getenv("GOOGLE_CREDENTIALS"))
-
-    # Write to a temporary JSON file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".json", mode="w") as tmpfile:
-        json.dump(gcp_info, tmpfile)
-        tmpfile.flush()
-        os.getenv("GOOGLE_APPLICATION_CREDENTIALS") = tmpfile.name
-        print(os.environ("GOOGLE_APPLICATION_CREDENTIALS"))
-        gcp_cred_path = tmpfile.name
-        try:
-            yield tmpfile.name
-        finally:
-            print("Google creds setup successfully!")
-    
+    """Yields the shared credentials (kept for callers of the old temp-file context manager)."""
+    yield get_credentials()
@@ -0,0 +1,92 @@
+"""
+Incremental history reads: a local Parquet cache plus a timestamp watermark,
+so each refresh only asks BigQuery for rows newer than what is cached and
+restarts warm up from disk.
+
+The cache records which ``project.dataset.table`` it holds and is only
+used for that table; by default every table gets its own file.
+"""
+import os
+import threading
+
+import pandas as pd
+
+from services.cloud.bigquery_client import query_sample
+from services.metrics import timed
+
+HISTORY_CACHE_DIR = os.getenv("HISTORY_CACHE_DIR", ".cache")
+HISTORY_CACHE_PATH = os.getenv("HISTORY_CACHE_PATH")     # default: one file per table in HISTORY_CACHE_DIR
+HISTORY_CACHE_ROWS = int(os.getenv("HISTORY_CACHE_ROWS", 5000))
+
+
+class IncrementalHistoryReader:
+    def __init__(self, project, dataset, table, cache_path=HISTORY_CACHE_PATH, max_rows=HISTORY_CACHE_ROWS,
+                 columns=None):
+        self.project = project
+        self.dataset = dataset
+        self.table = table
+        self.source = f"{project}.{dataset}.{table}"
+        # None picks the per-table default; "" disables the cache
+        if cache_path is None:
+            cache_path = os.path.join(HISTORY_CACHE_DIR, f"history-{self.source}.parquet")
+        self.cache_path = cache_path
+        self.max_rows = max_rows
+        self.columns = columns
+        self._lock = threading.Lock()
+        self._df = self._load_cache()
+        self.fetched_rows = 0
+
+    @property
+    def watermark(self):
+        """Newest cached timestamp, or None when the cache is empty."""
+        return self._df["timestamp"].iloc[-1] if len(self._df) else None
+
+    def _load_cache(self):
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                df = pd.read_parquet(self.cache_path)
+                if df.attrs.get("source") != self.source:
+                    print(f"⚠️ Ignoring history cache {self.cache_path}: it holds {df.attrs.get('source')}, "
+                          f"not {self.source}")
+                else:
+                    print(f"💾 Warm start: {len(df)} cached rows from {self.cache_path}")
+                    return df
+            except Exception as exc:
+                print(f"⚠️ Ignoring unreadable history cache {self.cache_path}: {exc}")
+        return pd.DataFrame(columns=["timestamp"])
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp = f"{self.cache_path}.tmp"
+        df = self._df.copy(deep=False)
+        df.attrs["source"] = self.source
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, self.cache_path)
+
+    @timed("cloud.history_refresh", items=lambda rows: rows)
+    def refresh(self, limit=500):
+        """Fetch rows newer than the watermark (at most ``limit``); returns how many arrived."""
+        with self._lock:
+            since = self.watermark
+            new = query_sample(self.project, self.dataset, self.table, limit=limit,
+                               columns=self.columns, since=since)
+            self.fetched_rows += len(new)
+            if new.empty:
+                return 0
+            new = new.rename(columns={"ts": "timestamp"}).sort_values("timestamp")
+            new["timestamp"] = pd.to_datetime(new["timestamp"], utc=True)
+            if len(new) >= limit or not len(self._df):
+                # The newest ``limit`` rows may not reach back to the old watermark; don't leave a gap
+                df = new
+            else:
+                df = pd.concat([self._df, new], ignore_index=True)
+            self._df = df.tail(self.max_rows).reset_index(drop=True)
+            self._save_cache()
+            return len(new)
+
+    def tail(self, limit=200):
+        """Newest ``limit`` cached rows, oldest first, with a ``timestamp`` column."""
+        with self._lock:
+            return self._df.tail(limit).reset_index(drop=True)
@@ -0,0 +1,228 @@
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from services.cloud.schema import STAGING_SUFFIX, write_staging
+from services.metrics import REGISTRY
+
+
+# ---- Sinks ----
+# A sink only needs a ``write(df)`` method; it is always called from the
+# buffer's flush thread, never from the Streamlit script thread.
+
+class CsvFileSink:
+    """Append flushed batches to a local CSV file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, df):
+        header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        df.to_csv(self.path, mode="a", header=header, index=False)
+
+
+class SQLiteSink:
+    """Append flushed batches to a table in a local SQLite database."""
+
+    def __init__(self, path, table="sensor_readings"):
+        self.path = path
+        self.table = table
+
+    def write(self, df):
+        # The connection is opened per flush so it always belongs to the flush thread
+        with sqlite3.connect(self.path) as conn:
+            df.to_sql(self.table, conn, if_exists="append", index=False)
+
+
+class BigQuerySink:
+    """Stage each batch as one Parquet (or CSV) blob in GCS and append it with one load job."""
+
+    def __init__(self, project, dataset, table, bucket, dest_prefix, staging_dir=".", staging_format="parquet"):
+        self.project = project
+        self.dataset = dataset
+        self.table = table
+        self.bucket = bucket
+        self.dest_prefix = dest_prefix
+        self.staging_dir = staging_dir
+        self.suffix = STAGING_SUFFIX[staging_format]
+        self._seq = 0
+
+    def write(self, df):
+        from simulation.batch_generator import upload_to_gcs
+        from services.cloud.bigquery_client import load_from_gcs
+
+        self._seq += 1
+        local_file = os.path.join(self.staging_dir, f"ingest-{int(time.time())}-{self._seq:06d}{self.suffix}")
+        write_staging(df, local_file)
+        try:
+            gcs_path = upload_to_gcs(local_file, self.bucket, self.dest_prefix)
+            load_from_gcs(self.project, self.dataset, self.table, gcs_path, write_disposition="WRITE_APPEND")
+        finally:
+            os.remove(local_file)
+
+
+# ---- Buffer ----
+
+class IngestBuffer:
+    """Collect rows in memory and flush them to a sink in the background.
+
+    A flush happens when ``max_rows`` rows are pending or when the oldest
+    pending row is ``max_age`` seconds old, whichever comes first. After a
+    failed flush the background thread waits ``retry_delay`` seconds, doubling
+    per consecutive failure up to ``max_retry_delay``, before trying again.
+    While the sink is down at most ``max_pending_rows`` rows are kept; the
+    oldest are dropped beyond that and counted in ``stats()``.
+    """
+
+    def __init__(self, sink, max_rows=500, max_age=30.0, poll_interval=0.5, retry_delay=1.0, max_retry_delay=60.0,
+                 max_pending_rows=100_000):
+        self.sink = sink
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_pending_rows = max_pending_rows
+
+        self._pending = []
+        self._pending_rows = 0
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._flushes = 0
+        self._rows_flushed = 0
+        self._errors = 0
+        self._failures = 0          # consecutive failed flushes
+        self._retry_at = 0.0        # monotonic time before which the flush thread backs off
+        self._dropped_rows = 0
+        self._latency_total = 0.0
+        self._last_latency = 0.0
+        self._last_rows = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ingest-buffer", daemon=True)
+            self._thread.start()
+        return self
+
+    def append(self, df):
+        """Queue a DataFrame of rows; returns immediately."""
+        if df is None or df.empty:
+            return
+        with self._lock:
+            self._pending.append(df)
+            self._pending_rows += len(df)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            REGISTRY.count("ingest.rows_appended", len(df))
+            self._trim()
+            full = self._pending_rows >= self.max_rows
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write everything pending right now, on the calling thread."""
+        self._flush()
+
+    def close(self, timeout=None):
+        """Stop the flush thread and write whatever is still pending."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._flush()
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending_rows
+        return {
+            "flushes": self._flushes,
+            "rows_flushed": self._rows_flushed,
+            "pending_rows": pending,
+            "errors": self._errors,
+            "dropped_rows": self._dropped_rows,
+            "retry_in_s": max(0.0, self._retry_at - time.monotonic()),
+            "last_flush_rows": self._last_rows,
+            "last_flush_latency_s": self._last_latency,
+            "avg_rows_per_flush": self._rows_flushed / self._flushes if self._flushes else 0.0,
+            "avg_flush_latency_s": self._latency_total / self._flushes if self._flushes else 0.0,
+        }
+
+    def _due(self):
+        with self._lock:
+            if not self._pending_rows or time.monotonic() < self._retry_at:
+                return False
+            return (self._pending_rows >= self.max_rows
+                    or time.monotonic() - self._oldest >= self.max_age)
+
+    def _trim(self):
+        """Drop the oldest pending rows beyond ``max_pending_rows``; caller holds ``_lock``."""
+        excess = self._pending_rows - self.max_pending_rows
+        if excess <= 0:
+            return
+        dropped = excess
+        while excess > 0:
+            head = self._pending[0]
+            if len(head) <= excess:
+                self._pending.pop(0)
+                excess -= len(head)
+            else:
+                self._pending[0] = head.iloc[excess:]
+                excess = 0
+        self._pending_rows -= dropped
+        self._dropped_rows += dropped
+        REGISTRY.count("ingest.rows_dropped", dropped)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._due():
+                self._flush()
+
+    def _flush(self):
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                rows, self._pending_rows = self._pending_rows, 0
+                self._oldest = None
+            if not rows:
+                return
+
+            df = pd.concat(batch, ignore_index=True)
+            t0 = time.perf_counter()
+            try:
+                self.sink.write(df)
+            except Exception as exc:
+                # Put the batch back in front so nothing is lost; retried on the next flush
+                with self._lock:
+                    self._pending.insert(0, df)
+                    self._pending_rows += rows
+                    self._oldest = time.monotonic()
+                    self._trim()
+                self._errors += 1
+                self._failures += 1
+                delay = min(self.max_retry_delay, self.retry_delay * 2 ** (self._failures - 1))
+                self._retry_at = time.monotonic() + delay
+                REGISTRY.observe("ingest.flush", time.perf_counter() - t0, error=True)
+                print(f"❌ Ingest flush of {rows} rows failed: {exc} (retrying in {delay:.0f}s)")
+                return
+            self._failures = 0
+            self._retry_at = 0.0
+            latency = time.perf_counter() - t0
+            REGISTRY.observe("ingest.flush", latency, items=rows)
+
+            self._flushes += 1
+            self._rows_flushed += rows
+            self._latency_total += latency
+            self._last_latency = latency
+            self._last_rows = rows
+            print(f"📦 Flushed {rows} rows in {latency:.2f}s")
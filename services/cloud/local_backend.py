@@ -0,0 +1,276 @@
+"""
+Offline stand-ins for the GCS and BigQuery clients.
+
+Blobs live under ``<root>/gcs/<bucket>/<path>`` and tables in a single SQLite
+database at ``<root>/bigquery.sqlite``. Only the slice of the client API used
+by this repo is implemented, so the pipeline can run and be benchmarked
+without network access.
+"""
+import glob
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pandas as pd
+
+_TABLE_REF = re.compile(r"`([\w-]+)\.(\w+)\.(\w+)`")
+_ISO_TS = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}")
+_SQLITE_TYPES = {"TIMESTAMP": "TEXT", "FLOAT": "REAL", "INTEGER": "INTEGER", "STRING": "TEXT"}
+_META_DDL = ("CREATE TABLE IF NOT EXISTS _local_table_meta "
+             "(name TEXT PRIMARY KEY, partition_field TEXT, clustering TEXT, require_filter INTEGER)")
+
+
+def _ts_text(values):
+    return pd.to_datetime(values, utc=True, format="ISO8601").dt.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _split_uri(uri):
+    bucket, _, path = uri[len("gs://"):].partition("/")
+    return bucket, path
+
+
+# ---- Storage ----
+
+class LocalBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.path = os.path.join(bucket.path, name)
+
+    def upload_from_filename(self, filename):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        shutil.copyfile(filename, self.path)
+
+    def upload_from_string(self, data):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        mode = "wb" if isinstance(data, bytes) else "w"
+        with open(self.path, mode) as f:
+            f.write(data)
+
+    def download_to_filename(self, filename):
+        shutil.copyfile(self.path, filename)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+
+class LocalBucket:
+    def __init__(self, root, name):
+        self.name = name
+        self.path = os.path.join(root, name)
+
+    def blob(self, name):
+        return LocalBlob(self, name)
+
+
+class LocalStorageClient:
+    """Filesystem-backed replacement for ``google.cloud.storage.Client``."""
+
+    def __init__(self, root):
+        self.root = os.path.join(root, "gcs")
+        os.makedirs(self.root, exist_ok=True)
+
+    def bucket(self, name):
+        return LocalBucket(self.root, name)
+
+    def local_path(self, uri):
+        """Map a ``gs://`` URI (wildcards allowed) to a local path pattern."""
+        bucket, path = _split_uri(uri)
+        return os.path.join(self.root, bucket, path)
+
+
+# ---- BigQuery ----
+
+class LocalTable:
+    def __init__(self, table_id, num_rows, partition_field=None, clustering_fields=None,
+                 require_partition_filter=False):
+        self.table_id = table_id
+        self.num_rows = num_rows
+        self.time_partitioning = SimpleNamespace(field=partition_field) if partition_field else None
+        self.clustering_fields = clustering_fields
+        self.require_partition_filter = require_partition_filter
+
+
+class LocalLoadJob:
+    def __init__(self, rows):
+        self.job_id = f"local-{uuid.uuid4().hex[:12]}"
+        self.output_rows = rows
+
+    def result(self):
+        return self
+
+
+class LocalQueryJob:
+    def __init__(self, df, total_bytes_processed=0):
+        self.job_id = f"local-{uuid.uuid4().hex[:12]}"
+        self._df = df
+        self.total_bytes_processed = total_bytes_processed
+
+    def result(self):
+        return self
+
+    def to_dataframe(self):
+        return self._df
+
+
+class LocalBigQueryClient:
+    """SQLite-backed replacement for ``google.cloud.bigquery.Client``.
+
+    Tables are addressed as ``project.dataset.table`` like the real client;
+    queries may use BigQuery-style backticked table names. Tables created
+    with ``create_table`` keep their day partitioning and clustering
+    metadata, and queries report ``total_bytes_processed`` the way
+    BigQuery bills them: referenced columns only, over the partitions
+    left after pruning on the partition column.
+    """
+
+    def __init__(self, project, root, storage=None):
+        self.project = project
+        os.makedirs(root, exist_ok=True)
+        self.db_path = os.path.join(root, "bigquery.sqlite")
+        self.storage = storage or LocalStorageClient(root)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.create_function("TIMESTAMP", 1, lambda v: v, deterministic=True)
+        conn.execute(_META_DDL)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _table_name(table_id):
+        parts = str(table_id).split(".")
+        return "__".join(parts[-2:])
+
+    def load_table_from_uri(self, source_uris, destination, job_config=None):
+        if isinstance(source_uris, str):
+            source_uris = [source_uris]
+        files = []
+        for uri in source_uris:
+            files.extend(sorted(glob.glob(self.storage.local_path(uri))))
+        if not files:
+            raise FileNotFoundError(f"No blobs match {source_uris}")
+
+        df = pd.concat([self._read(path, job_config) for path in files], ignore_index=True)
+        for field in getattr(job_config, "schema", None) or []:
+            if field.field_type == "TIMESTAMP" and field.name in df:
+                # One sortable text format whatever the source file (CSV text or Parquet)
+                df[field.name] = _ts_text(df[field.name])
+        disposition = getattr(job_config, "write_disposition", None) or "WRITE_APPEND"
+        if_exists = "replace" if disposition == "WRITE_TRUNCATE" else "append"
+        table = self._table_name(destination)
+        with self._lock, self._connect() as conn:
+            if if_exists == "append":
+                # Mirror ALLOW_FIELD_ADDITION: new columns are added to an existing table
+                existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+                if existing:
+                    for col in df.columns.difference(list(existing)):
+                        conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{col}"')
+            df.to_sql(table, conn, if_exists=if_exists, index=False)
+        return LocalLoadJob(len(df))
+
+    @staticmethod
+    def _read(path, job_config):
+        source_format = str(getattr(job_config, "source_format", "CSV") or "CSV")
+        if source_format.upper().endswith("PARQUET"):
+            return pd.read_parquet(path)
+        return pd.read_csv(path)
+
+    def create_table(self, table, exists_ok=False):
+        name = f"{table.dataset_id}__{table.table_id}"
+        table_id = f"{table.project}.{table.dataset_id}.{table.table_id}"
+        partition = table.time_partitioning.field if table.time_partitioning else None
+        clustering = list(table.clustering_fields or [])
+        with self._lock, self._connect() as conn:
+            if conn.execute(f'PRAGMA table_info("{name}")').fetchone():
+                if not exists_ok:
+                    raise ValueError(f"Already exists: {table_id}")
+            else:
+                cols = ", ".join(f'"{f.name}" {_SQLITE_TYPES.get(f.field_type, "TEXT")}' for f in table.schema)
+                conn.execute(f'CREATE TABLE "{name}" ({cols})')
+                # Indexes stand in for partition pruning and clustered block skipping
+                if partition:
+                    conn.execute(f'CREATE INDEX "{name}__part" ON "{name}" ("{partition}")')
+                if clustering:
+                    keys = ", ".join(f'"{c}"' for c in clustering + ([partition] if partition else []))
+                    conn.execute(f'CREATE INDEX "{name}__cluster" ON "{name}" ({keys})')
+                conn.execute("INSERT INTO _local_table_meta VALUES (?, ?, ?, ?)",
+                             (name, partition, ",".join(clustering), int(bool(table.require_partition_filter))))
+        return self.get_table(table_id)
+
+    def _meta(self, conn, name):
+        row = conn.execute("SELECT partition_field, clustering, require_filter FROM _local_table_meta "
+                           "WHERE name = ?", (name,)).fetchone()
+        return row or (None, "", 0)
+
+    def get_table(self, table_id):
+        name = self._table_name(table_id)
+        with self._lock, self._connect() as conn:
+            (rows,) = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()
+            partition, clustering, require_filter = self._meta(conn, name)
+        return LocalTable(str(table_id), rows, partition, clustering.split(",") if clustering else None,
+                          bool(require_filter))
+
+    def _bytes_processed(self, conn, sql, params):
+        """BigQuery-style estimate: referenced columns x rows in unpruned partitions."""
+        total = 0
+        for name in {f"{m.group(2)}__{m.group(3)}" for m in _TABLE_REF.finditer(sql)}:
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{name}")')]
+            used = [c for c in columns if re.search(rf"\b{re.escape(c)}\b", sql)]
+            partition, _, require_filter = self._meta(conn, name)
+
+            where, args = "", []
+            if partition:
+                bounds = [(op, params[p]) for op, p in
+                          re.findall(rf"\b{re.escape(partition)}\s*(>=|>|<=|<)\s*@(\w+)", sql) if p in params]
+                if require_filter and not bounds:
+                    raise ValueError(f"Cannot query over table {name} without a filter over column(s) "
+                                     f"'{partition}' that can be used for partition elimination")
+                # Pruning works on whole days, like DAY partitions
+                clauses = [f'substr("{partition}", 1, 10) {"<=" if op.startswith("<") else ">="} ?'
+                           for op, _ in bounds]
+                args = [value[:10] for _, value in bounds]
+                where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+            widths = []
+            for c in used:
+                sample = conn.execute(f'SELECT "{c}" FROM "{name}" WHERE "{c}" IS NOT NULL LIMIT 1').fetchone()
+                if sample is None or not isinstance(sample[0], str) or _ISO_TS.match(sample[0]):
+                    widths.append("8")     # FLOAT / INTEGER / TIMESTAMP
+                else:
+                    widths.append(f'COALESCE(SUM(LENGTH("{c}") + 2), 0)')
+            if not widths:
+                continue
+            per_row = " + ".join(f"COUNT(*) * {w}" if w == "8" else w for w in widths)
+            (scanned,) = conn.execute(f'SELECT {per_row} FROM "{name}" {where}', args).fetchone()
+            total += int(scanned or 0)
+        return total
+
+    def query(self, sql, job_config=None):
+        params = {}
+        for param in getattr(job_config, "query_parameters", None) or []:
+            value = param.value
+            if param.type_ == "TIMESTAMP":
+                value = _ts_text(pd.Series([value])).iloc[0]
+            params[param.name] = value
+        with self._lock, self._connect() as conn:
+            scanned = self._bytes_processed(conn, sql, params)
+            sql = _TABLE_REF.sub(lambda m: f'"{m.group(2)}__{m.group(3)}"', sql)
+            sql = re.sub(r"@(\w+)", r":\1", sql)
+            df = pd.read_sql_query(sql, conn, params=params)
+        for col in df.columns:
+            if pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
+                first = df[col].dropna().head(1)
+                if len(first) and isinstance(first.iloc[0], str) and _ISO_TS.match(first.iloc[0]):
+                    df[col] = pd.to_datetime(df[col], utc=True, format="ISO8601")
+        return LocalQueryJob(df, scanned)
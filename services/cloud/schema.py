@@ -0,0 +1,81 @@
+"""
+Sensor table schema, defined once and shared by the generator, the staging
+files and the BigQuery load jobs.
+
+Arrow and the BigQuery SDK are imported inside the functions that need
+them; the column lists are importable without either.
+"""
+
+# (column, BigQuery type) in table order
+SENSOR_SCHEMA = [
+    ("timestamp", "TIMESTAMP"),
+    ("equipment_id", "STRING"),
+    ("kiln_temp_C", "FLOAT"),
+    ("mill_power_kW", "FLOAT"),
+    ("AF_rate_percent", "FLOAT"),
+    ("clinker_free_lime_percent", "FLOAT"),
+    ("CO2_emission_kgpt", "FLOAT"),
+]
+
+SENSOR_COLUMNS = [name for name, _ in SENSOR_SCHEMA]
+METRIC_COLUMNS = [name for name, kind in SENSOR_SCHEMA if kind == "FLOAT"]
+
+# Rows written before the equipment dimension existed belong to this asset
+DEFAULT_EQUIPMENT_ID = "kiln-01"
+
+
+def equipment_ids(kilns):
+    """IDs of a fleet of ``kilns`` kilns: ``kiln-01``, ``kiln-02``, ...
+
+    The padding is fixed, so a kiln keeps its ID (and ``DEFAULT_EQUIPMENT_ID``
+    stays the first kiln) whatever the fleet size.
+    """
+    return [f"kiln-{k + 1:02d}" for k in range(kilns)]
+
+
+_ARROW_TYPES = {
+    "TIMESTAMP": lambda pa: pa.timestamp("us", tz="UTC"),
+    "FLOAT": lambda pa: pa.float64(),
+    "STRING": lambda pa: pa.string(),
+    "INTEGER": lambda pa: pa.int64(),
+}
+
+STAGING_SUFFIX = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def bigquery_schema():
+    from google.cloud import bigquery
+    return [bigquery.SchemaField(name, kind) for name, kind in SENSOR_SCHEMA]
+
+
+def arrow_schema():
+    import pyarrow as pa
+    return pa.schema([(name, _ARROW_TYPES[kind](pa)) for name, kind in SENSOR_SCHEMA])
+
+
+def to_arrow(df):
+    """Convert a sensor DataFrame to an Arrow table with the shared schema."""
+    import pyarrow as pa
+    if "equipment_id" not in df:
+        df = df.assign(equipment_id=DEFAULT_EQUIPMENT_ID)
+    df = df[SENSOR_COLUMNS]
+    if df["timestamp"].dt.tz is None:
+        df = df.assign(timestamp=df["timestamp"].dt.tz_localize("UTC"))
+    return pa.Table.from_pandas(df, schema=arrow_schema(), preserve_index=False)
+
+
+def staging_format(path):
+    """'parquet' or 'csv', from the staging file's extension."""
+    return "parquet" if str(path).endswith(".parquet") else "csv"
+
+
+def write_staging(df, path):
+    """Write ``df`` to ``path`` as Parquet or CSV depending on its extension."""
+    if staging_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(to_arrow(df), path, compression="snappy")
+    else:
+        if "equipment_id" not in df:
+            df = df.assign(equipment_id=DEFAULT_EQUIPMENT_ID)
+        df[SENSOR_COLUMNS].to_csv(path, index=False)
+    return path
@@ -0,0 +1,62 @@
+"""
+Sensor table provisioning: day-partitioned on ``timestamp`` and clustered by
+``equipment_id`` so time-bounded, per-asset queries only read the
+partitions and blocks they need.
+"""
+import os
+import threading
+
+from services.cloud.clients import get_bigquery_client
+from services.cloud.schema import bigquery_schema
+
+PARTITION_FIELD = "timestamp"
+CLUSTERING_FIELDS = ["equipment_id"]
+PARTITION_EXPIRATION_DAYS = os.getenv("PARTITION_EXPIRATION_DAYS")
+
+_ensured = {}
+_ensured_lock = threading.Lock()
+
+
+def sensor_table_definition(project, dataset_id, table_id, expiration_days=PARTITION_EXPIRATION_DAYS):
+    from google.cloud import bigquery
+
+    table = bigquery.Table(f"{project}.{dataset_id}.{table_id}", schema=bigquery_schema())
+    table.time_partitioning = bigquery.TimePartitioning(
+        type_=bigquery.TimePartitioningType.DAY,
+        field=PARTITION_FIELD,
+        expiration_ms=int(float(expiration_days) * 86_400_000) if expiration_days else None,
+    )
+    table.clustering_fields = CLUSTERING_FIELDS
+    # Every query must carry a time-range predicate; full scans are rejected
+    table.require_partition_filter = True
+    return table
+
+
+def ensure_sensor_table(project, dataset_id, table_id, expiration_days=PARTITION_EXPIRATION_DAYS):
+    """Create the partitioned + clustered sensor table if missing; returns it.
+
+    An existing table is left untouched (partitioning can't be changed in
+    place); a warning is printed if it isn't partitioned as expected. The
+    check runs once per table per process.
+    """
+    key = (get_bigquery_client(project), dataset_id, table_id)
+    with _ensured_lock:
+        if key not in _ensured:
+            _ensured[key] = _create_or_check(project, dataset_id, table_id, expiration_days)
+        return _ensured[key]
+
+
+def _create_or_check(project, dataset_id, table_id, expiration_days):
+    client = get_bigquery_client(project)
+    table = client.create_table(sensor_table_definition(project, dataset_id, table_id, expiration_days),
+                                exists_ok=True)
+    partitioning = getattr(table, "time_partitioning", None)
+    if partitioning is None or partitioning.field != PARTITION_FIELD:
+        print(f"⚠️ {dataset_id}.{table_id} is not partitioned on {PARTITION_FIELD}; "
+              f"queries will scan the full table. Recreate it to enable pruning.")
+    elif list(getattr(table, "clustering_fields", None) or []) != CLUSTERING_FIELDS:
+        print(f"⚠️ {dataset_id}.{table_id} is not clustered by {', '.join(CLUSTERING_FIELDS)}.")
+    else:
+        print(f"🗂️ {dataset_id}.{table_id} partitioned by {PARTITION_FIELD}, "
+              f"clustered by {', '.join(CLUSTERING_FIELDS)}")
+    return table
@@ -0,0 +1,100 @@
+import datetime as dt
+import json
+import os
+import stat
+
+import pytest
+
+from services.cloud.google_auth import CredentialsProvider
+
+pytest.importorskip("google.oauth2.service_account")
+rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+serialization = pytest.importorskip("cryptography.hazmat.primitives.serialization")
+
+
+@pytest.fixture(scope="module")
+def key_info():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                            serialization.NoEncryption()).decode()
+    return {
+        "type": "service_account",
+        "project_id": "fake-project",
+        "private_key_id": "fake-key-id",
+        "private_key": pem,
+        "client_email": "fake@fake-project.iam.gserviceaccount.com",
+        "client_id": "1",
+        "token_uri": "https://oauth2.googleapis.com/token",
+    }
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.status = 200
+        self.headers = {}
+        self.data = json.dumps(body).encode()
+
+
+class FakeTokenEndpoint:
+    """Stands in for ``google.auth.transport.requests.Request``: hands out numbered one-hour tokens."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, url, method="GET", body=None, headers=None, **kwargs):
+        self.calls.append(url)
+        return FakeResponse({"access_token": f"token-{len(self.calls)}", "expires_in": 3600})
+
+
+class Clock:
+    def __init__(self):
+        self.now = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+    def __call__(self):
+        return self.now
+
+
+def test_credentials_are_built_once(key_info):
+    provider = CredentialsProvider(info=json.dumps(key_info))
+    assert provider.project_id == "fake-project"
+    first = provider.credentials()
+    assert provider.credentials() is first
+    assert provider.builds == 1
+    assert first.service_account_email == key_info["client_email"]
+
+
+def test_unconfigured_provider_falls_back_to_adc(monkeypatch):
+    monkeypatch.delenv("GOOGLE_CREDENTIALS_TEST", raising=False)
+    provider = CredentialsProvider(env_var="GOOGLE_CREDENTIALS_TEST")
+    assert not provider.configured
+    assert provider.credentials() is None
+    assert provider.token() is None
+
+
+def test_token_refreshes_only_within_the_margin(key_info):
+    clock, endpoint = Clock(), FakeTokenEndpoint()
+    provider = CredentialsProvider(info=key_info, refresh_margin_s=300, clock=clock)
+    assert provider.token(endpoint) == "token-1"
+    expiry = provider.credentials().expiry
+    # Still valid beyond the margin: cached
+    clock.now = expiry - dt.timedelta(seconds=301)
+    assert provider.token(endpoint) == "token-1"
+    # Inside the margin: refreshed once
+    clock.now = expiry - dt.timedelta(seconds=299)
+    assert provider.token(endpoint) == "token-2"
+    assert provider.refreshes == 2
+    assert len(endpoint.calls) == 2
+    assert provider.builds == 1
+
+
+def test_export_adc_writes_one_private_key_file(key_info, monkeypatch):
+    monkeypatch.delenv("GOOGLE_APPLICATION_CREDENTIALS", raising=False)
+    provider = CredentialsProvider(info=key_info)
+    path = provider.export_adc()
+    try:
+        assert os.environ["GOOGLE_APPLICATION_CREDENTIALS"] == path
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert json.load(open(path)) == key_info
+        assert provider.export_adc() == path
+    finally:
+        os.remove(path)
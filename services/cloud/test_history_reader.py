@@ -0,0 +1,30 @@
+import pandas as pd
+
+from services.cloud import history_reader
+from services.cloud.history_reader import IncrementalHistoryReader
+
+
+def fake_query(rows):
+    def query_sample(project, dataset, table, limit=500, columns=None, since=None):
+        return pd.DataFrame({"timestamp": pd.date_range("2024-01-01", periods=rows, freq="min", tz="UTC"),
+                             "kiln_temp_C": float(len(table))})
+    return query_sample
+
+
+def test_cache_is_only_reused_for_the_same_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_reader, "query_sample", fake_query(3))
+    path = str(tmp_path / "history.parquet")
+    IncrementalHistoryReader("p", "ds", "sensors", cache_path=path).refresh()
+
+    warm = IncrementalHistoryReader("p", "ds", "sensors", cache_path=path)
+    assert len(warm.tail()) == 3
+    assert IncrementalHistoryReader("p", "ds", "other", cache_path=path).tail().empty
+    assert IncrementalHistoryReader("p2", "ds", "sensors", cache_path=path).tail().empty
+
+
+def test_default_cache_path_is_per_table(tmp_path, monkeypatch):
+    monkeypatch.setattr(history_reader, "HISTORY_CACHE_DIR", str(tmp_path))
+    a = IncrementalHistoryReader("p", "ds", "sensors")
+    b = IncrementalHistoryReader("p", "ds", "other")
+    assert a.cache_path != b.cache_path
+    assert a.cache_path.startswith(str(tmp_path))
@@ -0,0 +1,122 @@
+import sqlite3
+import time
+
+import pandas as pd
+
+from services.cloud.ingest_buffer import CsvFileSink, IngestBuffer, SQLiteSink
+
+
+class ListSink:
+    def __init__(self, fail=0):
+        self.batches = []
+        self.fail = fail
+
+    def write(self, df):
+        if self.fail:
+            self.fail -= 1
+            raise OSError("sink unavailable")
+        self.batches.append(df)
+
+
+def rows(n, start=0):
+    return pd.DataFrame({"x": range(start, start + n)})
+
+
+def test_flushes_when_max_rows_are_pending():
+    sink = ListSink()
+    buffer = IngestBuffer(sink, max_rows=5, max_age=60)
+    buffer.append(rows(3))
+    assert not buffer._due()
+    buffer.append(rows(2, 3))
+    assert buffer._due()
+    buffer.flush()
+    assert [len(b) for b in sink.batches] == [5]
+    assert list(sink.batches[0]["x"]) == list(range(5))
+    assert buffer.stats()["pending_rows"] == 0
+
+
+def test_flushes_when_oldest_row_reaches_max_age():
+    buffer = IngestBuffer(ListSink(), max_rows=100, max_age=0.05)
+    assert not buffer._due()
+    buffer.append(rows(1))
+    assert not buffer._due()
+    time.sleep(0.06)
+    assert buffer._due()
+
+
+def test_failed_flush_keeps_rows_for_the_next_one():
+    sink = ListSink(fail=1)
+    buffer = IngestBuffer(sink, max_rows=10, max_age=60)
+    buffer.append(rows(4))
+    buffer.flush()
+    assert buffer.stats()["errors"] == 1
+    assert buffer.stats()["pending_rows"] == 4
+    buffer.append(rows(2, 4))
+    buffer.flush()
+    assert list(sink.batches[0]["x"]) == list(range(6))
+    assert buffer.stats()["rows_flushed"] == 6
+
+
+def test_background_thread_flushes_and_close_drains():
+    sink = ListSink()
+    buffer = IngestBuffer(sink, max_rows=3, max_age=60, poll_interval=0.01).start()
+    buffer.append(rows(3))
+    deadline = time.monotonic() + 2
+    while not sink.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [len(b) for b in sink.batches] == [3]
+    buffer.append(rows(1, 3))
+    buffer.close(timeout=1)
+    assert [len(b) for b in sink.batches] == [3, 1]
+
+
+def test_failures_back_off_exponentially_and_reset_on_success():
+    sink = ListSink(fail=2)
+    buffer = IngestBuffer(sink, max_rows=1, max_age=60, retry_delay=0.05, max_retry_delay=0.08)
+    buffer.append(rows(1))
+    buffer.flush()
+    assert not buffer._due()
+    assert 0 < buffer.stats()["retry_in_s"] <= 0.05
+    time.sleep(0.06)
+    assert buffer._due()
+    buffer.flush()
+    # Doubled, then capped
+    assert 0.05 < buffer.stats()["retry_in_s"] <= 0.08
+    assert not buffer._due()
+    time.sleep(0.09)
+    buffer.flush()
+    assert len(sink.batches) == 1
+    assert buffer.stats()["retry_in_s"] == 0
+    buffer.append(rows(1, 1))
+    assert buffer._due()
+
+
+def test_pending_rows_are_capped_by_dropping_the_oldest():
+    sink = ListSink(fail=1)
+    buffer = IngestBuffer(sink, max_rows=100, max_age=60, max_pending_rows=5)
+    buffer.append(rows(3))
+    buffer.flush()
+    buffer.append(rows(4, 3))
+    assert buffer.stats()["pending_rows"] == 5
+    assert buffer.stats()["dropped_rows"] == 2
+    buffer.flush()
+    assert list(sink.batches[0]["x"]) == list(range(2, 7))
+
+
+def test_round_trip_through_csv_file_sink(tmp_path):
+    path = tmp_path / "ingest.csv"
+    buffer = IngestBuffer(CsvFileSink(str(path)), max_rows=3, max_age=60)
+    for start in (0, 3, 6):
+        buffer.append(rows(3, start))
+        buffer.flush()
+    pd.testing.assert_frame_equal(pd.read_csv(path), rows(9))
+
+
+def test_round_trip_through_sqlite_sink(tmp_path):
+    path = str(tmp_path / "ingest.db")
+    buffer = IngestBuffer(SQLiteSink(path, table="readings"), max_rows=3, max_age=60)
+    for start in (0, 3, 6):
+        buffer.append(rows(3, start))
+        buffer.flush()
+    with sqlite3.connect(path) as conn:
+        pd.testing.assert_frame_equal(pd.read_sql("SELECT x FROM readings", conn), rows(9))
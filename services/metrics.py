@@ -0,0 +1,310 @@
+"""
+Lightweight hot-path instrumentation: per-stage latency histograms,
+counters and optional cProfile sampling, shared by the whole process.
+
+    from services.metrics import timed, timer
+
+    @timed("simulation.generate_data", items=len)
+    def generate_data(...): ...
+
+    with timer("dashboard.render_tabs"):
+        render_tabs(...)
+
+Each stage keeps cumulative Prometheus-style buckets plus the most recent
+``METRICS_WINDOW`` samples, from which ``snapshot()`` derives p50/p95 and
+throughput. ``to_prometheus()`` / ``write(path)`` export the lot (``.prom``
+text or ``.json`` by extension), ``export_every(path)`` rewrites that file
+from one daemon thread, and ``serve(port)`` exposes ``/metrics`` for a
+local scrape. Only the standard library is used.
+
+With ``METRICS_PROFILE_EVERY=N`` every Nth call of each stage also runs
+under cProfile; ``profile_stats(stage)`` returns the accumulated
+``pstats.Stats``.
+"""
+import bisect
+import collections
+import cProfile
+import functools
+import http.server
+import inspect
+import json
+import os
+import pstats
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", 512))
+METRICS_PROFILE_EVERY = int(os.getenv("METRICS_PROFILE_EVERY", 0))
+
+# Upper bounds (seconds) of the cumulative latency buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class StageStats:
+    """Latency histogram, call/item/error counters and a window of recent samples for one stage."""
+
+    def __init__(self, name, window=METRICS_WINDOW):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.items = 0
+        self.total_s = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)    # last one is +Inf
+        self.recent = collections.deque(maxlen=window)  # (end monotonic, seconds, items)
+
+    def observe(self, seconds, items=0, error=False):
+        self.count += 1
+        self.items += items
+        self.total_s += seconds
+        self.errors += bool(error)
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.recent.append((time.monotonic(), seconds, items))
+
+    def summary(self):
+        recent = list(self.recent)
+        ordered = sorted(s for _, s, _ in recent)
+        span = recent[-1][0] - recent[0][0] + recent[0][1] if len(recent) > 1 else 0.0
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "items": self.items,
+            "total_s": self.total_s,
+            "mean_ms": self.total_s / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": _percentile(ordered, 0.50) * 1e3,
+            "p95_ms": _percentile(ordered, 0.95) * 1e3,
+            "max_ms": ordered[-1] * 1e3 if ordered else 0.0,
+            # Over the recent window; wall-clock rate, not 1 / latency
+            "calls_per_s": (len(recent) - 1) / span if span > 0 else 0.0,
+            "items_per_s": sum(n for _, _, n in recent[1:]) / span if span > 0 else 0.0,
+        }
+
+
+class Registry:
+    """Process-wide set of stages and counters; every method is thread-safe."""
+
+    def __init__(self, window=METRICS_WINDOW, profile_every=METRICS_PROFILE_EVERY):
+        self.window = window
+        self.profile_every = profile_every
+        self.started = time.time()
+        self._stages = {}
+        self._counters = collections.Counter()
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    # ---- Recording ----
+
+    def observe(self, stage, seconds, items=0, error=False):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats(stage, self.window)
+            stats.observe(seconds, items, error)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _profiler(self, stage):
+        """A cProfile.Profile for this call if it is sampled, else None."""
+        if not self.profile_every:
+            return None
+        with self._lock:
+            stats = self._stages.get(stage)
+            calls = stats.count if stats else 0
+        return cProfile.Profile() if calls % self.profile_every == 0 else None
+
+    def _keep_profile(self, stage, profiler):
+        with self._lock:
+            if stage in self._profiles:
+                self._profiles[stage].add(profiler)
+            else:
+                self._profiles[stage] = pstats.Stats(profiler)
+
+    @contextmanager
+    def timer(self, stage, items=0):
+        """Time the block as one call of ``stage``; set ``t.items`` inside to count items processed."""
+        record = _Timing(items)
+        profiler = self._profiler(stage)
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler (e.g. an enclosing sampled stage) is already active
+                profiler = None
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception:
+            record.error = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._keep_profile(stage, profiler)
+            self.observe(stage, elapsed, record.items, record.error)
+
+    def timed(self, stage=None, items=None):
+        """Decorator form of ``timer`` for sync and async functions.
+
+        ``items`` is a number or a callable applied to the return value
+        (e.g. ``len``) giving the items processed per call.
+        """
+        def decorate(fn):
+            name = stage or f"{fn.__module__}.{fn.__qualname__}"
+
+            def count(result):
+                if callable(items):
+                    try:
+                        return items(result)
+                    except TypeError:
+                        return 0
+                return items or 0
+
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(name) as t:
+                        result = await fn(*args, **kwargs)
+                        t.items = count(result)
+                        return result
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(name) as t:
+                    result = fn(*args, **kwargs)
+                    t.items = count(result)
+                    return result
+            return wrapper
+        return decorate
+
+    # ---- Reading ----
+
+    def snapshot(self):
+        """``{"stages": {stage: summary}, "counters": {...}, "uptime_s": ...}``."""
+        with self._lock:
+            stages = {name: stats.summary() for name, stats in sorted(self._stages.items())}
+            counters = dict(self._counters)
+        return {"stages": stages, "counters": counters, "uptime_s": time.time() - self.started}
+
+    def profile_stats(self, stage):
+        """Accumulated ``pstats.Stats`` for a sampled stage, or None."""
+        with self._lock:
+            return self._profiles.get(stage)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._profiles.clear()
+            self.started = time.time()
+
+    # ---- Export ----
+
+    def to_prometheus(self, prefix="cemmind"):
+        """Prometheus text exposition: a latency histogram per stage plus the counters."""
+        with self._lock:
+            stages = [(name, list(s.buckets), s.count, s.total_s, s.errors, s.items)
+                      for name, s in sorted(self._stages.items())]
+            counters = sorted(self._counters.items())
+        lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+        for name, buckets, count, total, _, _ in stages:
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float("inf"),), buckets):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {total}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {count}')
+        for metric, index in (("stage_errors_total", 4), ("stage_items_total", 5)):
+            lines.append(f"# TYPE {prefix}_{metric} counter")
+            lines.extend(f'{prefix}_{metric}{{stage="{stage[0]}"}} {stage[index]}' for stage in stages)
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        lines.extend(f'{prefix}_events_total{{name="{name}"}} {n}' for name, n in counters)
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write Prometheus text (``.prom``/``.txt``) or JSON (anything else), atomically."""
+        if path.endswith((".prom", ".txt")):
+            data = self.to_prometheus()
+        else:
+            data = json.dumps(self.snapshot(), indent=2)
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        # A temp file of its own per write, so concurrent writers never share one
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return path
+
+    def export_every(self, path, interval_s=5.0):
+        """Rewrite ``path`` every ``interval_s`` seconds on a daemon thread; set the returned event to stop."""
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval_s):
+                try:
+                    self.write(path)
+                except OSError as exc:
+                    print(f"⚠️ Metrics export to {path} failed: {exc}")
+
+        threading.Thread(target=run, name="metrics-export", daemon=True).start()
+        return stop
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve ``/metrics`` (Prometheus) and ``/metrics.json`` on a daemon thread; returns the server."""
+        registry = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body, kind = json.dumps(registry.snapshot()).encode(), "application/json"
+                elif self.path.startswith("/metrics"):
+                    body, kind = registry.to_prometheus().encode(), "text/plain; version=0.0.4"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+class _Timing:
+    __slots__ = ("items", "error")
+
+    def __init__(self, items=0):
+        self.items = items
+        self.error = False
+
+
+REGISTRY = Registry()
+
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+observe = REGISTRY.observe
+count = REGISTRY.count
+snapshot = REGISTRY.snapshot
@@ -0,0 +1,44 @@
+import json
+import os
+import threading
+import time
+
+from services.metrics import Registry
+
+
+def test_concurrent_writes_all_succeed(tmp_path):
+    registry = Registry()
+    registry.observe("stage", 0.01, items=1)
+    path = str(tmp_path / "metrics.json")
+    errors = []
+
+    def writer():
+        for _ in range(200):
+            try:
+                registry.write(path)
+            except OSError as exc:
+                errors.append(exc)
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert json.load(open(path))["stages"]["stage"]["count"] == 1
+    assert os.listdir(tmp_path) == ["metrics.json"]
+
+
+def test_export_every_rewrites_the_file(tmp_path):
+    registry = Registry()
+    path = str(tmp_path / "metrics.prom")
+    stop = registry.export_every(path, interval_s=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while not os.path.exists(path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        registry.count("events", 3)
+        time.sleep(0.05)
+    finally:
+        stop.set()
+    assert 'cemmind_events_total{name="events"} 3' in open(path).read()
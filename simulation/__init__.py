@@ -3,6 +3,13 @@
 Simulation package for generating synthetic cement plant data.
 """
 
-from .batch_generator import generate_data, upload_to_gcs
+from .batch_generator import generate_data, generate_chunks, upload_to_gcs, PartWriter, stream_to_parts
+from .parallel import bulk_push
+from .twin import DigitalTwin, FleetTwin
+from .codec import encode_binary, decode_binary, BinaryEncoder, BinaryDecoder, RECORD_DTYPE
+from .stream_producer import StreamProducer, StdoutSink, FileSink, SocketSink, ConsumerSink, NullSink
 
-__all__ = ["generate_data", "upload_to_gcs"]
+__all__ = ["generate_data", "generate_chunks", "upload_to_gcs", "PartWriter", "stream_to_parts",
+           "bulk_push", "DigitalTwin", "FleetTwin", "StreamProducer", "StdoutSink", "FileSink",
+           "SocketSink", "ConsumerSink", "NullSink", "encode_binary", "decode_binary", "BinaryEncoder",
+           "BinaryDecoder", "RECORD_DTYPE"]
@@ -1,39 +1,42 @@
-import pandas as pd
-import numpy as np
+import argparse
 import datetime as dt
-import streamlit as st
-from google.cloud import storage
-from dotenv import load_dotenv
+import time
+import uuid
+import numpy as np
+from services.cloud.clients import get_storage_client
+from services.metrics import timed
+from services.cloud.schema import SENSOR_COLUMNS, STAGING_SUFFIX, arrow_schema, equipment_ids, to_arrow, write_staging
+from simulation.twin import CHUNK_ROWS, DigitalTwin, FleetTwin
+from config import settings
 import os
 
-# Load .env file
-load_dotenv()
-
-# Read configs
-GCS_BUCKET = os.getenv("GCS_BUCKET")
-GCS_DEST_PREFIX = os.getenv("GCS_DEST_PREFIX")
-LOCAL_CSV = os.getenv("LOCAL_CSV")
-NUM_ROWS = int(os.getenv("NUM_ROWS"), 1440) # fallback 1440 if missing
-
-def generate_data(n=NUM_ROWS):
-    start = dt.datetime.utcnow()
-    timestamps = [start + dt.timedelta(minutes=i) for i in range(n)]
-    df = pd.DataFrame({
-        "timestamp": timestamps,
-        "kiln_temp_C": np.random.normal(1450, 15, n),
-        "mill_power_kW": np.random.normal(4200, 150, n),
-        "AF_rate_percent": np.clip(np.random.normal(15, 5, n), 0, 40),
-        "clinker_free_lime_percent": np.random.normal(1.5, 0.3, n),
-        "CO2_emission_kgpt": np.random.normal(850, 30, n)
-    })
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df.to_csv(LOCAL_CSV, index=False)
-    print(f"✅ Generated dataset with {n} rows → {LOCAL_CSV}")
+# Read configs (.env is loaded once by config)
+GCS_BUCKET = settings.gcs_bucket
+GCS_DEST_PREFIX = settings.gcs_dest_prefix
+LOCAL_CSV = settings.local_csv
+NUM_ROWS = int(os.getenv("NUM_ROWS", 1440)) # fallback 1440 if missing
+STAGING_FORMAT = settings.staging_format  # "parquet" or "csv"
+LOCAL_STAGING = settings.local_staging
+
+@timed("simulation.generate_data", items=len)
+def generate_data(n=NUM_ROWS, path=LOCAL_STAGING, seed=None, twin=None, kilns=1):
+    """Generate ``n`` rows per kiln; writes a staging file (Parquet or CSV by extension) unless ``path`` is None.
+
+    Pass ``twin`` (a ``DigitalTwin`` or ``FleetTwin``) to continue an existing
+    series instead of starting a new one. With ``kilns > 1`` the rows are
+    time-major, one per kiln per timestamp, keyed by ``equipment_id``.
+    """
+    twin = twin or (FleetTwin(kilns, seed=seed) if kilns > 1 else DigitalTwin(seed=seed))
+    df = twin.generate(n)[SENSOR_COLUMNS]
+    if path:
+        write_staging(df, path)
+        print(f"✅ Generated dataset with {len(df)} rows → {path}")
     return df
 
 
+@timed("cloud.upload_to_gcs")
 def upload_to_gcs(local_file, bucket_name, dest_prefix):
-    client = storage.Client()
+    client = get_storage_client()
     bucket = client.bucket(bucket_name)
     dest_blob = f"{dest_prefix}/{os.path.basename(local_file)}"
     blob = bucket.blob(dest_blob)
@@ -41,7 +44,162 @@ def upload_to_gcs(local_file, bucket_name, dest_prefix):
     print(f"📤 Uploaded {local_file} → gs://{bucket_name}/{dest_blob}")
     return f"gs://{bucket_name}/{dest_blob}"
 
+# ---- Streaming generation (larger than memory) ----
+
+def generate_chunks(n, chunk_rows=CHUNK_ROWS, kilns=1, seed=None, start=None, interval_s=60):
+    """Yield ``n`` rows for each of ``kilns`` kilns as DataFrames of at most ``chunk_rows`` rows.
+
+    Kilns get independent RNG streams spawned from ``seed``; only one chunk is
+    ever held in memory.
+    """
+    start = start or dt.datetime.utcnow()
+    for equipment_id, kiln_seed in zip(equipment_ids(kilns), np.random.SeedSequence(seed).spawn(kilns)):
+        twin = DigitalTwin(seed=kiln_seed, start=start, interval_s=interval_s,
+                           chunk_rows=chunk_rows, equipment_id=equipment_id)
+        for i in range(0, n, chunk_rows):
+            yield twin.generate(min(chunk_rows, n - i))[SENSOR_COLUMNS]
+
+
+class Progress:
+    """Prints rows done, throughput and ETA at most every ``every_s`` seconds."""
+
+    def __init__(self, total, every_s=2.0):
+        self.total = total
+        self.every_s = every_s
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    def update(self, n):
+        self.rows += n
+        now = time.perf_counter()
+        if now - self._last >= self.every_s or self.rows >= self.total:
+            self._last = now
+            rate = self.rows / max(now - self.started, 1e-9)
+            eta = (self.total - self.rows) / rate if rate else 0
+            print(f"⏳ {self.rows:,}/{self.total:,} rows ({self.rows / self.total:.1%}) · "
+                  f"{rate / 1e6:.2f}M rows/s · ETA {eta:.0f}s")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        return {"rows": self.rows, "seconds": elapsed, "rows_per_s": self.rows / elapsed if elapsed else 0.0}
+
+
+class PartWriter:
+    """Roll chunks into part files of about ``rows_per_file`` rows.
+
+    ``on_part(path)`` is called as soon as each part is closed, e.g. to upload
+    it, so parts can stream to GCS while generation continues.
+    """
+
+    def __init__(self, out_dir, prefix="part", fmt=STAGING_FORMAT, rows_per_file=1_000_000, on_part=None):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.suffix = STAGING_SUFFIX[fmt]
+        self.rows_per_file = rows_per_file
+        self.on_part = on_part
+        self.parts = []
+        self._writer = None
+        self._path = None
+        self._rows = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, df):
+        if self._path is None:
+            self._path = os.path.join(self.out_dir, f"{self.prefix}-{len(self.parts):05d}{self.suffix}")
+        if self.suffix == ".parquet":
+            if self._writer is None:
+                import pyarrow.parquet as pq
+                self._writer = pq.ParquetWriter(self._path, arrow_schema(), compression="snappy")
+            self._writer.write_table(to_arrow(df))
+        else:
+            # A new part truncates whatever an earlier run left at the same path
+            first = self._rows == 0
+            df[SENSOR_COLUMNS].to_csv(self._path, mode="w" if first else "a", header=first, index=False)
+        self._rows += len(df)
+        if self._rows >= self.rows_per_file:
+            self._roll()
+
+    def _roll(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._path is not None:
+            self.parts.append(self._path)
+            if self.on_part is not None:
+                self.on_part(self._path)
+        self._path = None
+        self._rows = 0
+
+    def close(self):
+        self._roll()
+
+
+def stream_to_parts(chunks, writer, total_rows=None):
+    """Drain a chunk iterator into a ``PartWriter`` with progress reporting."""
+    progress = Progress(total_rows or 1)
+    with writer:
+        for df in chunks:
+            writer.write(df)
+            progress.update(len(df))
+    stats = progress.summary()
+    stats["parts"] = len(writer.parts)
+    print(f"✅ Wrote {stats['rows']:,} rows in {stats['parts']} parts "
+          f"({stats['rows_per_s'] / 1e6:.2f}M rows/s)")
+    return stats
+
+
 if __name__ == "__main__":
-    df = generate_data()
-    gcs_path = upload_to_gcs(LOCAL_CSV, GCS_BUCKET, GCS_DEST_PREFIX)
-    print(f"Data available at: {gcs_path}")
+    parser = argparse.ArgumentParser(description="Generate synthetic cement plant data.")
+    parser.add_argument("--rows", type=int, default=NUM_ROWS, help="Rows per kiln (ignored with --days)")
+    parser.add_argument("--days", type=float, help="Days of history per kiln at --interval-s resolution")
+    parser.add_argument("--interval-s", type=int, default=60)
+    parser.add_argument("--kilns", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--rows-per-file", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=sorted(STAGING_SUFFIX), default=STAGING_FORMAT)
+    parser.add_argument("--out-dir", default="parts")
+    parser.add_argument("--upload", action="store_true", help="Upload each part to GCS as soon as it is written")
+    parser.add_argument("--load", action="store_true",
+                        help="Load all uploaded parts into BigQuery at the end (implies --upload)")
+    parser.add_argument("--keep-local", action="store_true", help="Keep part files after uploading")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Generate shards in this many processes and upload them concurrently (implies --upload)")
+    args = parser.parse_args()
+
+    rows = int(args.days * 86_400 / args.interval_s) if args.days else args.rows
+    # Loading reads the parts from GCS, so they have to be uploaded first
+    args.upload = args.upload or args.load
+
+    if args.workers > 1:
+        from simulation.parallel import bulk_push
+        bulk_push(rows, GCS_BUCKET, GCS_DEST_PREFIX, os.getenv("PROJECT"), os.getenv("DATASET"),
+                  os.getenv("TABLE"), kilns=args.kilns, workers=args.workers, seed=args.seed,
+                  fmt=args.format, interval_s=args.interval_s, load=args.load)
+        raise SystemExit(0)
+
+    run_prefix = f"{GCS_DEST_PREFIX}/run-{uuid.uuid4().hex[:8]}"
+
+    def upload_part(path):
+        upload_to_gcs(path, GCS_BUCKET, run_prefix)
+        if not args.keep_local:
+            os.remove(path)
+
+    writer = PartWriter(args.out_dir, fmt=args.format, rows_per_file=args.rows_per_file,
+                        on_part=upload_part if args.upload else None)
+    chunks = generate_chunks(rows, args.chunk_rows, args.kilns, args.seed, interval_s=args.interval_s)
+    stream_to_parts(chunks, writer, total_rows=rows * args.kilns)
+
+    if args.upload:
+        gcs_uri = f"gs://{GCS_BUCKET}/{run_prefix}/*{STAGING_SUFFIX[args.format]}"
+        print(f"Data available at: {gcs_uri}")
+        if args.load:
+            from services.cloud.bigquery_client import load_from_gcs
+            load_from_gcs(os.getenv("PROJECT"), os.getenv("DATASET"), os.getenv("TABLE"), gcs_uri)
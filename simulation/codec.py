@@ -0,0 +1,173 @@
+"""
+Compact wire formats for batches of sensor readings on the realtime path.
+
+``binary``: fixed-schema little-endian records (a NumPy structured dtype)
+with epoch-nanosecond timestamps and float32 metrics, 40 bytes per reading.
+Whole batches are encoded and decoded as one array copy. Streams are a
+sequence of frames, ``names`` frames mapping equipment codes to ids
+(sent only when they change) and ``records`` frames, so a decoder can
+join a stream at any frame boundary after the first names frame.
+
+``json-columns``: one JSON object of column arrays per batch, via orjson
+when it is installed (optional fast path), else the standard library.
+
+``ndjson``: one JSON object per reading (the original, most portable format).
+"""
+import io
+import json
+import struct
+
+import numpy as np
+import pandas as pd
+
+from simulation.twin import TWIN_COLUMNS
+
+try:
+    import orjson
+except ImportError:     # optional fast path
+    orjson = None
+
+RECORD_DTYPE = np.dtype(
+    [("ts_ns", "<i8"), ("equipment", "<u4")] + [(column, "<f4") for column in TWIN_COLUMNS]
+)
+
+MAGIC = b"CMR1"
+NAMES, RECORDS = b"N", b"R"
+_HEADER = struct.Struct("<4scI")       # magic, frame type, payload bytes
+
+FORMATS = ("ndjson", "json-columns", "binary")
+
+
+# ---- Structured arrays ----
+
+def to_records(batch):
+    """Batch DataFrame (timestamp, equipment_id + metrics) → ``(RECORD_DTYPE array, equipment names)``."""
+    records = np.empty(len(batch), dtype=RECORD_DTYPE)
+    ts = batch["timestamp"]
+    records["ts_ns"] = pd.DatetimeIndex(ts).as_unit("ns").asi8 if len(ts) else []
+    equipment = batch["equipment_id"].astype("category")
+    records["equipment"] = equipment.cat.codes.to_numpy()
+    for column in TWIN_COLUMNS:
+        records[column] = batch[column].to_numpy()
+    return records, list(equipment.cat.categories)
+
+
+def from_records(records, names):
+    """Inverse of ``to_records``: a DataFrame with a UTC timestamp and categorical equipment_id."""
+    df = pd.DataFrame({column: records[column] for column in TWIN_COLUMNS}, copy=False)
+    df.insert(0, "timestamp", pd.to_datetime(records["ts_ns"], utc=True))
+    df.insert(1, "equipment_id", pd.Categorical.from_codes(records["equipment"].astype(np.int32),
+                                                           categories=names))
+    return df
+
+
+# ---- Binary stream frames ----
+
+def _frame(kind, payload):
+    return _HEADER.pack(MAGIC, kind, len(payload)) + payload
+
+
+class BinaryEncoder:
+    """Callable batch → bytes; emits a names frame only when the equipment set changes."""
+
+    def __init__(self):
+        self._names = None
+
+    def __call__(self, batch):
+        records, names = to_records(batch)
+        out = b""
+        if names != self._names:
+            out += _frame(NAMES, "\n".join(names).encode())
+            self._names = names
+        return out + _frame(RECORDS, records.tobytes())
+
+
+class BinaryDecoder:
+    """Incremental decoder: ``feed`` arbitrary byte chunks, get back complete batches."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._names = []
+
+    def feed(self, data):
+        self._buffer += data
+        batches = []
+        while len(self._buffer) >= _HEADER.size:
+            magic, kind, size = _HEADER.unpack_from(self._buffer)
+            if magic != MAGIC:
+                raise ValueError("Not a sensor record stream (bad frame magic)")
+            end = _HEADER.size + size
+            if len(self._buffer) < end:
+                break
+            payload = bytes(self._buffer[_HEADER.size:end])
+            del self._buffer[:end]
+            if kind == NAMES:
+                self._names = payload.decode().split("\n") if payload else []
+            else:
+                batches.append(from_records(np.frombuffer(payload, dtype=RECORD_DTYPE), self._names))
+        return batches
+
+
+def encode_binary(batch):
+    """One self-contained binary chunk (names + records frames)."""
+    return BinaryEncoder()(batch)
+
+
+def decode_binary(data):
+    batches = BinaryDecoder().feed(data)
+    if len(batches) == 1:
+        return batches[0]
+    return pd.concat(batches, ignore_index=True) if batches else from_records(np.empty(0, RECORD_DTYPE), [])
+
+
+# ---- Columnar JSON ----
+
+def encode_json_columns(batch):
+    """``{"ts_ns": [...], "equipment_id": [...], metric: [...]}`` plus a newline, per batch."""
+    records, names = to_records(batch)
+    columns = {"ts_ns": records["ts_ns"], "equipment_id": np.asarray(names)[records["equipment"]].tolist()}
+    if orjson is not None:
+        # orjson serializes contiguous arrays natively
+        columns["ts_ns"] = np.ascontiguousarray(columns["ts_ns"])
+        columns.update({column: np.ascontiguousarray(batch[column].to_numpy(dtype=np.float64))
+                        for column in TWIN_COLUMNS})
+        return orjson.dumps(columns, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    columns["ts_ns"] = columns["ts_ns"].tolist()
+    columns.update({column: batch[column].tolist() for column in TWIN_COLUMNS})
+    return json.dumps(columns, separators=(",", ":")).encode() + b"\n"
+
+
+def decode_json_columns(line):
+    columns = orjson.loads(line) if orjson is not None else json.loads(line)
+    df = pd.DataFrame({column: np.asarray(columns[column], dtype=np.float64) for column in TWIN_COLUMNS})
+    df.insert(0, "timestamp", pd.to_datetime(np.asarray(columns["ts_ns"], dtype=np.int64), utc=True))
+    df.insert(1, "equipment_id", pd.Categorical(columns["equipment_id"]))
+    return df
+
+
+# ---- NDJSON ----
+
+def encode_ndjson(batch):
+    """One JSON object per reading, newline-terminated (pandas' C encoder, no per-row Python)."""
+    if not len(batch):
+        return b""
+    data = batch.to_json(orient="records", lines=True, date_format="iso", date_unit="ms").encode()
+    return data if data.endswith(b"\n") else data + b"\n"
+
+
+def decode_ndjson(data):
+    df = pd.read_json(io.BytesIO(data if isinstance(data, bytes) else data.encode()), lines=True,
+                      dtype={"equipment_id": "category"})
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    return df
+
+
+def make_encoder(fmt):
+    """Encoder callable for one sink; ``binary`` encoders are stateful, so use one per stream."""
+    if fmt == "ndjson":
+        return encode_ndjson
+    if fmt == "json-columns":
+        return encode_json_columns
+    if fmt == "binary":
+        return BinaryEncoder()
+    raise ValueError(f"format must be one of {FORMATS}")
@@ -0,0 +1,146 @@
+"""
+Parallel bulk pipeline: generation sharded by kiln and by time range across
+a process pool, parts uploaded concurrently as each shard finishes, then one
+BigQuery load for the run.
+
+Every time shard of a kiln runs its own twin from a zero state, holding back
+its first ``STITCH_ROWS`` steps. Once the shards are in, the parent walks each
+kiln's shards in order and stitches the held-back steps onto the previous
+shard's drift and fault state (``FleetTwin.stitch``), so a kiln's series has
+no seams at shard boundaries.
+"""
+import datetime as dt
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+from services.cloud.schema import SENSOR_COLUMNS, STAGING_SUFFIX, equipment_ids
+from simulation.batch_generator import STAGING_FORMAT, PartWriter, upload_to_gcs
+from simulation.twin import CHUNK_ROWS, STITCH_ROWS, DigitalTwin
+
+# Smaller shards would spend most of their rows in the held-back head
+MIN_SHARD_ROWS = 4 * STITCH_ROWS
+
+
+def plan_shards(rows, kilns=1, shards=None, workers=1, min_shard_rows=MIN_SHARD_ROWS):
+    """Split ``rows`` per kiln into ``(kiln, shard, offset, count)`` time shards.
+
+    Defaults to enough shards per kiln to keep every worker busy, but never
+    smaller than ``min_shard_rows``, so tiny pushes don't pay for process
+    startup and stitching.
+    """
+    per_kiln = shards or -(-workers // kilns)
+    per_kiln = max(1, min(per_kiln, rows // min_shard_rows or 1))
+    bounds = np.linspace(0, rows, per_kiln + 1, dtype=np.int64)
+    return [(k, i, int(lo), int(hi - lo)) for k in range(kilns)
+            for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:]))]
+
+
+def generate_shard(equipment_id, count, seed, start, interval_s, out_dir, fmt, chunk_rows=CHUNK_ROWS,
+                   rows_per_file=1_000_000, shard=0):
+    """Generate ``count`` rows of one kiln's time shard into part files; runs inside a worker process.
+
+    Returns ``(parts, state)``. The first shard starts where a kiln starts and
+    writes every row; later ones start from a zero state and hold back their
+    first ``STITCH_ROWS`` steps in ``state`` for ``FleetTwin.stitch``.
+    """
+    twin = DigitalTwin(seed=seed, start=start, interval_s=interval_s, chunk_rows=chunk_rows,
+                       equipment_id=equipment_id)
+    latent = twin.latent(min(count, STITCH_ROWS) if shard else 0)
+    held = len(latent[-1])
+    writer = PartWriter(out_dir, prefix=f"{equipment_id}-{shard:03d}" if shard else equipment_id, fmt=fmt,
+                        rows_per_file=rows_per_file)
+    with writer:
+        for i in range(held, count, chunk_rows):
+            writer.write(twin.generate(min(chunk_rows, count - i))[SENSOR_COLUMNS])
+    return writer.parts, {"latent": latent, "count": count, "drift": twin._drift, "fault_carry": twin._fault_carry}
+
+
+def bulk_push(rows, bucket, dest_prefix, project=None, dataset=None, table=None, kilns=1, workers=None,
+              upload_workers=8, shards=None, seed=None, fmt=STAGING_FORMAT, interval_s=60, load=True,
+              work_dir=None, rows_per_file=1_000_000):
+    """Generate ``rows`` rows per kiln in parallel, upload every part and load them once.
+
+    Kilns get the same independent RNG streams as ``generate_chunks`` (later
+    time shards spawn their own from the kiln's), so a seeded push with one
+    shard per kiln matches the streaming generator. Returns timings and
+    counts. Uses the shared cloud clients, so it runs offline against the
+    local backend as well.
+    """
+    workers = workers or os.cpu_count() or 1
+    plan = plan_shards(rows, kilns, shards, workers)
+    kiln_seeds = np.random.SeedSequence(seed).spawn(kilns)
+    per_kiln = len(plan) // kilns
+    seeds = [[kiln_seed] + kiln_seed.spawn(per_kiln - 1) for kiln_seed in kiln_seeds]
+    ids = equipment_ids(kilns)
+    start = dt.datetime.utcnow()
+    run_prefix = f"{dest_prefix}/run-{uuid.uuid4().hex[:8]}"
+    own_work_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="cemmind-bulk-")
+    stats = {"rows": rows * kilns, "shards": len(plan), "workers": workers, "gcs_prefix": run_prefix}
+
+    t0 = time.perf_counter()
+    uploads = []
+    states = {}
+    try:
+        with ThreadPoolExecutor(upload_workers) as uploader:
+            def upload(path):
+                upload_to_gcs(path, bucket, run_prefix)
+                os.remove(path)
+
+            def collect(job, result):
+                parts, states[job[0], job[-1]] = result
+                uploads.extend(uploader.submit(upload, path) for path in parts)
+
+            jobs = [(ids[kiln], count, seeds[kiln][shard], start + dt.timedelta(seconds=offset * interval_s),
+                     interval_s, work_dir, fmt, CHUNK_ROWS, rows_per_file, shard)
+                    for kiln, shard, offset, count in plan]
+            if len(jobs) == 1 or workers == 1:
+                # Nothing to parallelize; skip the process pool startup
+                for job in jobs:
+                    collect(job, generate_shard(*job))
+            else:
+                ctx = multiprocessing.get_context("spawn")
+                with ProcessPoolExecutor(min(workers, len(jobs)), mp_context=ctx) as pool:
+                    # Upload each shard's parts as soon as it is generated
+                    futures = {pool.submit(generate_shard, *job): job for job in jobs}
+                    for future in as_completed(futures):
+                        collect(futures[future], future.result())
+
+            # Stitch every later shard's held-back steps onto the state its predecessor ended in
+            for equipment_id in ids:
+                twin = DigitalTwin(interval_s=interval_s, equipment_id=equipment_id)
+                for shard in range(per_kiln):
+                    state = states.pop((equipment_id, shard))
+                    head = twin.stitch(state["latent"], state["count"], state["drift"], state["fault_carry"])
+                    if len(head):
+                        with PartWriter(work_dir, prefix=f"{equipment_id}-{shard:03d}-head", fmt=fmt,
+                                        rows_per_file=rows_per_file) as writer:
+                            writer.write(head[SENSOR_COLUMNS])
+                        uploads.extend(uploader.submit(upload, path) for path in writer.parts)
+            stats["generate_s"] = time.perf_counter() - t0
+            for future in uploads:
+                future.result()
+    finally:
+        # Parts left behind by a failed generation or upload go too
+        if own_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    stats["generate_upload_s"] = time.perf_counter() - t0
+
+    gcs_uri = f"gs://{bucket}/{run_prefix}/*{STAGING_SUFFIX[fmt]}"
+    stats["gcs_uri"] = gcs_uri
+    if load:
+        from services.cloud.bigquery_client import load_from_gcs
+        t1 = time.perf_counter()
+        load_from_gcs(project, dataset, table, gcs_uri)
+        stats["load_s"] = time.perf_counter() - t1
+    stats["total_s"] = time.perf_counter() - t0
+    print(f"🚀 Bulk push: {stats['rows']:,} rows for {kilns} kilns in {len(plan)} shards on {workers} workers "
+          f"in {stats['total_s']:.1f}s")
+    return stats
@@ -1,26 +1,35 @@
-import time
-import random
-import json
+import asyncio
 from datetime import datetime
+from agents.detectors import StreamingDetectors
+from simulation.codec import make_encoder
+from simulation.stream_producer import StdoutSink, StreamProducer
+from simulation.twin import DigitalTwin, TWIN_COLUMNS
 
-def generate_sensor_reading():
-    return {
-        "timestamp": datetime.utcnow().isoformat()+'Z',
-        "kiln_temp_C": round(random.gauss(1450, 15), 3),
-        "mill_power_kW": round(random.gauss(4200, 150), 3),
-        "raw_feed_rate_tph": round(random.gauss(250, 10), 3),
-        "AF_rate_percent": round(max(0, min(40, random.gauss(15, 5))), 3),
-        "clinker_free_lime_percent": round(random.gauss(1.5, 0.3), 3),
-        "blain_surface_cm2g": round(random.gauss(3400, 100), 3),
-        "CO2_emission_kgpt": round(random.gauss(850, 30), 3)
-    }
+# One twin (and detector bank) per process so consecutive readings continue the same series
+_twin = DigitalTwin(interval_s=1)
+_detectors = StreamingDetectors(TWIN_COLUMNS)
 
-def run_realtime_stream(iterations=60, delay=1):
-    """Run a simple console streamer that prints JSON lines - can be piped into Pub/Sub or a consumer."""
-    for i in range(iterations):
-        reading = generate_sensor_reading()
-        print(json.dumps(reading))
-        time.sleep(delay)
+def generate_sensor_reading(twin=None, detectors=None):
+    row = (twin or _twin).next_rows(1).iloc[0]
+    reading = {"timestamp": datetime.utcnow().isoformat()+'Z'}
+    reading.update({col: round(float(row[col]), 3) for col in TWIN_COLUMNS})
+    detectors = detectors or (_detectors if twin is None else None)
+    if detectors is not None:
+        detectors.update(row[TWIN_COLUMNS].to_numpy(dtype=float))
+        flags = detectors.flags()
+        if flags:
+            reading["anomalies"] = flags
+    return reading
+
+def run_realtime_stream(iterations=60, delay=1, devices=1, fmt="ndjson"):
+    """Console streamer printing NDJSON lines - can be piped into Pub/Sub or a consumer.
+
+    Runs on the async ``StreamProducer``; see ``simulation.stream_producer``
+    for more devices, higher rates and other sinks, and ``simulation.codec``
+    for the ``json-columns`` and ``binary`` batch formats.
+    """
+    producer = StreamProducer([StdoutSink(make_encoder(fmt))], devices=devices, rate_hz=1 / delay, detect=True)
+    return asyncio.run(producer.run(ticks=iterations))
 
 if __name__ == '__main__':
     run_realtime_stream()
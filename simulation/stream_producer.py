@@ -0,0 +1,364 @@
+"""
+Async realtime stream producer: a fleet of simulated devices emitting
+readings at a fixed rate into pluggable sinks through bounded queues.
+
+Each tick produces one batch (one reading per device) as a DataFrame.
+Every sink has its own bounded ``asyncio.Queue`` and writer task, so a slow
+sink either throttles the producer (``policy="block"``) or loses batches
+(``policy="drop"``) without stalling the others. ``stats()`` reports the
+achieved rate, queue depths, lag and dropped messages.
+
+    python -m simulation.stream_producer --devices 2000 --rate 1 --sink file:stream.ndjson --duration 30
+    python -m simulation.stream_producer --devices 5000 --rate 10 --sink null --policy drop
+    python -m simulation.stream_producer --devices 5000 --rate 10 --sink tcp:127.0.0.1:9000 --format binary
+"""
+import argparse
+import asyncio
+import collections
+import sys
+import threading
+import time
+
+import pandas as pd
+
+from agents.detectors import StreamingDetectors
+from simulation.codec import FORMATS, encode_ndjson, make_encoder
+from simulation.twin import FleetTwin, TWIN_COLUMNS
+
+POLICIES = ("block", "drop")
+
+
+# ---- Sinks ----
+
+class Sink:
+    """Base sink: ``write`` receives one batch DataFrame at a time."""
+
+    name = "sink"
+    dropped = 0     # messages the sink itself discarded after accepting them
+
+    async def open(self):
+        pass
+
+    async def write(self, batch):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class NullSink(Sink):
+    """Discards batches; measures the producer on its own."""
+
+    name = "null"
+
+    async def write(self, batch):
+        pass
+
+
+class StdoutSink(Sink):
+    name = "stdout"
+
+    def __init__(self, encoder=encode_ndjson):
+        self.encoder = encoder
+
+    async def write(self, batch):
+        sys.stdout.buffer.write(self.encoder(batch))
+        sys.stdout.buffer.flush()
+
+
+class FileSink(Sink):
+    name = "file"
+
+    def __init__(self, path, encoder=encode_ndjson):
+        self.path = path
+        self.encoder = encoder
+        self._f = None
+
+    async def open(self):
+        self._f = open(self.path, "ab")
+
+    async def write(self, batch):
+        data = self.encoder(batch)
+        # Disk writes off the event loop so other sinks keep flowing
+        await asyncio.to_thread(self._f.write, data)
+
+    async def close(self):
+        if self._f:
+            self._f.close()
+
+
+class SocketSink(Sink):
+    """TCP (``host:port``) or Unix socket (path) client; ``drain`` propagates the reader's backpressure."""
+
+    name = "socket"
+
+    def __init__(self, address, encoder=encode_ndjson):
+        self.address = address
+        self.encoder = encoder
+        self._writer = None
+
+    async def open(self):
+        host, sep, port = self.address.rpartition(":")
+        if sep and port.isdigit():
+            _, self._writer = await asyncio.open_connection(host or "127.0.0.1", int(port))
+        else:
+            _, self._writer = await asyncio.open_unix_connection(self.address)
+
+    async def write(self, batch):
+        self._writer.write(self.encoder(batch))
+        await self._writer.drain()
+
+    async def close(self):
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class ConsumerSink(Sink):
+    """In-process consumer: batches go to ``callback`` and/or a bounded deque other threads ``drain``.
+
+    When nobody drains for ``maxlen`` batches the oldest is evicted and its
+    messages are counted in ``dropped``.
+    """
+
+    name = "consumer"
+
+    def __init__(self, callback=None, maxlen=1024):
+        self.callback = callback
+        self._batches = collections.deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    async def write(self, batch):
+        if self.callback is not None:
+            self.callback(batch)
+        with self._lock:
+            if len(self._batches) == self._batches.maxlen:
+                self.dropped += len(self._batches[0])
+            self._batches.append(batch)
+
+    def drain(self):
+        """All batches received since the last call, as one DataFrame (possibly empty)."""
+        with self._lock:
+            batches = list(self._batches)
+            self._batches.clear()
+        return pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+
+
+def make_sink(spec, fmt="ndjson"):
+    """Sink from a CLI spec: ``stdout``, ``null``, ``file:PATH``, ``tcp:HOST:PORT`` or ``unix:PATH``.
+
+    ``fmt`` is the wire format (see ``simulation.codec``).
+    """
+    kind, _, arg = spec.partition(":")
+    if kind == "stdout":
+        return StdoutSink(make_encoder(fmt))
+    if kind == "null":
+        return NullSink()
+    if kind == "file":
+        return FileSink(arg, make_encoder(fmt))
+    if kind in ("tcp", "unix"):
+        return SocketSink(arg, make_encoder(fmt))
+    raise ValueError(f"Unknown sink {spec!r}")
+
+
+# ---- Producer ----
+
+class _SinkChannel:
+    def __init__(self, sink, queue_size):
+        self.sink = sink
+        self.queue = asyncio.Queue(queue_size)
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.task = None
+
+    async def pump(self):
+        while True:
+            batch = await self.queue.get()
+            try:
+                if batch is None:
+                    return
+                await self.sink.write(batch)
+                self.delivered += len(batch)
+            except Exception as exc:
+                self.errors += 1
+                self.dropped += len(batch)
+                print(f"⚠️ {self.sink.name} sink write failed: {exc}", file=sys.stderr)
+            finally:
+                self.queue.task_done()
+
+
+class StreamProducer:
+    """Simulate ``devices`` devices at ``rate_hz`` readings/sec each into ``sinks``."""
+
+    def __init__(self, sinks, devices=1, rate_hz=1.0, queue_size=64, policy="block", block=256, seed=None,
+                 detect=False):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}")
+        self.sinks = list(sinks)
+        self.devices = devices
+        self.rate_hz = rate_hz
+        self.queue_size = queue_size
+        self.policy = policy
+        self.block = block
+        self._fleet = FleetTwin(devices, seed=seed, interval_s=1 / rate_hz)
+        self.ids = pd.Categorical(self._fleet.equipment_ids)
+        self._block = None
+        self._next_block = None
+        self._pos = 0
+        # One detector slot per device x metric
+        self.detectors = StreamingDetectors(range(devices * len(TWIN_COLUMNS))) if detect else None
+        self.channels = []
+        self.produced = 0
+        self.ticks = 0
+        self.lag_s = 0.0
+        self._started = None
+        self._stopped = None
+
+    # ---- Generation ----
+
+    def _generate_block(self):
+        """(block, devices, metrics) values: the whole fleet advanced ``block`` steps."""
+        return self._fleet.step(self.block)[1]
+
+    async def _next_values(self):
+        if self._block is None or self._pos >= len(self._block):
+            self._block = await (self._next_block or asyncio.to_thread(self._generate_block))
+            # Prefetch the next block in a worker thread while this one is consumed
+            self._next_block = asyncio.ensure_future(asyncio.to_thread(self._generate_block))
+            self._pos = 0
+        values = self._block[self._pos]
+        self._pos += 1
+        return values
+
+    def _batch(self, values):
+        batch = pd.DataFrame(values, columns=TWIN_COLUMNS)
+        batch.insert(0, "timestamp", pd.Timestamp.now(tz="UTC"))
+        batch.insert(1, "equipment_id", self.ids)
+        if self.detectors is not None:
+            levels = self.detectors.update(values.ravel()).reshape(self.devices, -1)
+            batch["anomaly_level"] = levels.max(axis=1)
+        return batch
+
+    # ---- Run ----
+
+    async def _offer(self, channel, batch):
+        if self.policy == "block":
+            await channel.queue.put(batch)
+        else:
+            try:
+                channel.queue.put_nowait(batch)
+            except asyncio.QueueFull:
+                channel.dropped += len(batch)
+
+    async def run(self, duration=None, ticks=None, report_every=None):
+        """Produce until ``duration`` seconds or ``ticks`` ticks have passed (forever if neither)."""
+        loop = asyncio.get_running_loop()
+        self.channels = [_SinkChannel(sink, self.queue_size) for sink in self.sinks]
+        for channel in self.channels:
+            await channel.sink.open()
+            channel.task = asyncio.create_task(channel.pump())
+        reporter = asyncio.create_task(self._report(report_every)) if report_every else None
+        await self._next_values()       # first block is generated before the clock starts
+        self._pos = 0
+
+        self._started = time.perf_counter()
+        self._stopped = None
+        start = loop.time()
+        period = 1.0 / self.rate_hz
+        try:
+            while (ticks is None or self.ticks < ticks) and (duration is None or loop.time() - start < duration):
+                batch = self._batch(await self._next_values())
+                for channel in self.channels:
+                    await self._offer(channel, batch)
+                self.produced += len(batch)
+                self.ticks += 1
+                due = start + self.ticks * period
+                self.lag_s = max(0.0, loop.time() - due)
+                await asyncio.sleep(max(0.0, due - loop.time()))
+        finally:
+            self._stopped = time.perf_counter()
+            # Let every sink flush what is queued, then close it
+            for channel in self.channels:
+                await channel.queue.put(None)
+            await asyncio.gather(*(channel.task for channel in self.channels))
+            for channel in self.channels:
+                await channel.sink.close()
+            if reporter:
+                reporter.cancel()
+            if self._next_block is not None:
+                self._next_block.cancel()
+        return self.stats()
+
+    def run_in_thread(self, **kwargs):
+        """Run on a daemon thread with its own event loop (e.g. behind the dashboard); returns the thread."""
+        thread = threading.Thread(target=asyncio.run, args=(self.run(**kwargs),), daemon=True,
+                                  name="stream-producer")
+        thread.start()
+        return thread
+
+    def stats(self):
+        elapsed = (self._stopped or time.perf_counter()) - self._started if self._started else 0.0
+        return {
+            "devices": self.devices,
+            "target_rate": self.devices * self.rate_hz,
+            "achieved_rate": self.produced / elapsed if elapsed else 0.0,
+            "produced": self.produced,
+            "ticks": self.ticks,
+            "lag_s": self.lag_s,
+            "sinks": {
+                channel.sink.name: {
+                    "delivered": channel.delivered,
+                    "dropped": channel.dropped + channel.sink.dropped,
+                    "errors": channel.errors,
+                    "queue_batches": channel.queue.qsize(),
+                    "queue_messages": channel.queue.qsize() * self.devices,
+                }
+                for channel in self.channels
+            },
+        }
+
+    async def _report(self, every):
+        while True:
+            await asyncio.sleep(every)
+            s = self.stats()
+            sinks = " · ".join(f"{name}: q={c['queue_batches']} dropped={c['dropped']}"
+                               for name, c in s["sinks"].items())
+            # stderr, so NDJSON on stdout stays clean
+            print(f"📡 {s['achieved_rate']:,.0f}/{s['target_rate']:,.0f} msg/s · lag {s['lag_s']:.2f}s · {sinks}",
+                  file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async realtime sensor stream producer.")
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=1.0, help="Readings per second per device")
+    parser.add_argument("--sink", action="append", default=None,
+                        help="stdout, null, file:PATH, tcp:HOST:PORT or unix:PATH (repeatable)")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson",
+                        help="Wire format: ndjson, json-columns (orjson if installed) or binary records")
+    parser.add_argument("--queue", type=int, default=64, help="Bounded queue size per sink, in batches")
+    parser.add_argument("--policy", choices=POLICIES, default="block")
+    parser.add_argument("--duration", type=float, help="Seconds to run (default: forever)")
+    parser.add_argument("--detect", action="store_true", help="Add an anomaly_level column from the detectors")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--report-every", type=float, default=5.0)
+    args = parser.parse_args()
+
+    producer = StreamProducer([make_sink(spec, args.format) for spec in args.sink or ["stdout"]], devices=args.devices,
+                              rate_hz=args.rate, queue_size=args.queue, policy=args.policy, seed=args.seed,
+                              detect=args.detect)
+    try:
+        stats = asyncio.run(producer.run(duration=args.duration, report_every=args.report_every))
+    except KeyboardInterrupt:
+        stats = producer.stats()
+    print(f"📡 Done: {stats['produced']:,} messages at {stats['achieved_rate']:,.0f} msg/s "
+          f"(target {stats['target_rate']:,.0f})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
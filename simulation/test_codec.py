@@ -0,0 +1,62 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from simulation.codec import (BinaryDecoder, BinaryEncoder, decode_binary, decode_json_columns, decode_ndjson,
+                              encode_binary, encode_json_columns, encode_ndjson)
+from simulation.twin import TWIN_COLUMNS, FleetTwin
+
+
+def batch(assets=3, steps=4, seed=1):
+    return FleetTwin(assets, seed=seed, start=dt.datetime(2024, 1, 1, 0, 0, 0, 123000)).generate(steps)
+
+
+def assert_round_trip(original, decoded, rtol):
+    assert list(decoded.columns) == ["timestamp", "equipment_id"] + TWIN_COLUMNS
+    np.testing.assert_array_equal(pd.DatetimeIndex(decoded["timestamp"]).tz_convert(None).as_unit("ns").asi8,
+                                  pd.DatetimeIndex(original["timestamp"]).as_unit("ns").asi8)
+    assert list(decoded["equipment_id"]) == list(original["equipment_id"])
+    np.testing.assert_allclose(decoded[TWIN_COLUMNS].to_numpy(), original[TWIN_COLUMNS].to_numpy(), rtol=rtol)
+
+
+def test_binary_round_trip():
+    original = batch()
+    data = encode_binary(original)
+    assert_round_trip(original, decode_binary(data), rtol=1e-6)   # float32 metrics
+
+
+def test_binary_stream_survives_arbitrary_chunking_and_new_equipment():
+    encoder = BinaryEncoder()
+    batches = [batch(3, 2, seed=1), batch(3, 2, seed=2), batch(5, 1, seed=3)]
+    stream = b"".join(encoder(b) for b in batches)
+    decoder = BinaryDecoder()
+    decoded = []
+    for i in range(0, len(stream), 7):
+        decoded += decoder.feed(stream[i:i + 7])
+    assert len(decoded) == 3
+    for original, result in zip(batches, decoded):
+        assert_round_trip(original, result, rtol=1e-6)
+
+
+def test_binary_rejects_foreign_bytes():
+    with pytest.raises(ValueError):
+        decode_binary(b"not a frame at all")
+
+
+def test_json_columns_round_trip_is_exact():
+    original = batch()
+    assert_round_trip(original, decode_json_columns(encode_json_columns(original)), rtol=0)
+
+
+def test_ndjson_round_trip():
+    original = batch()
+    decoded = decode_ndjson(encode_ndjson(original))
+    assert_round_trip(original, decoded, rtol=1e-9)    # pandas writes 10 significant digits
+
+
+def test_empty_batches():
+    empty = batch().iloc[:0]
+    assert len(decode_binary(encode_binary(empty))) == 0
+    assert encode_ndjson(empty) == b""
@@ -0,0 +1,81 @@
+import datetime as dt
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.cloud.schema import SENSOR_COLUMNS
+from simulation import parallel
+from simulation.batch_generator import PartWriter, generate_chunks
+from simulation.twin import STITCH_ROWS, DigitalTwin
+
+
+def test_kiln_shard_matches_streaming_generator(tmp_path):
+    start = dt.datetime(2024, 1, 1)
+    seed = np.random.SeedSequence(3).spawn(2)[1]
+    parts, _ = parallel.generate_shard("kiln-02", 500, seed, start, 60, str(tmp_path), "csv", chunk_rows=128,
+                                       rows_per_file=200)
+    assert len(parts) > 1
+    shard = pd.concat([pd.read_csv(p) for p in parts], ignore_index=True)
+    expected = pd.concat(list(generate_chunks(500, 128, kilns=2, seed=3, start=start)))[500:]
+    np.testing.assert_allclose(shard["kiln_temp_C"], expected["kiln_temp_C"])
+    assert (shard["equipment_id"] == "kiln-02").all()
+
+
+def test_plan_splits_kilns_into_time_shards_for_idle_workers():
+    plan = parallel.plan_shards(1000, kilns=2, workers=5, min_shard_rows=100)
+    assert [(k, i) for k, i, _, _ in plan] == [(0, 0), (0, 1), (0, 2), (1, 0), (1, 1), (1, 2)]
+    assert sum(count for k, _, _, count in plan if k == 1) == 1000
+    assert parallel.plan_shards(1000, kilns=2, workers=5, min_shard_rows=600) == [(0, 0, 0, 1000), (1, 0, 0, 1000)]
+
+
+def test_stitched_shard_continues_the_previous_one(tmp_path):
+    start = dt.datetime(2024, 1, 1)
+    count = STITCH_ROWS + 3000
+    previous = DigitalTwin(seed=1, start=start, fault_rate_per_day=200)
+    previous.generate(5000)
+    drift = {name: x.copy() for name, x in previous._drift.items()}
+    fault_carry = {column: carry.copy() for column, carry in previous._fault_carry.items()}
+    assert any(carry.any() for carry in fault_carry.values())
+
+    parts, state = parallel.generate_shard("kiln-01", count, np.random.SeedSequence(2), start, 60, str(tmp_path),
+                                           "csv", chunk_rows=4096, rows_per_file=10 ** 9, shard=1)
+    head = previous.stitch(state["latent"], count, state["drift"], state["fault_carry"])
+    stitched = pd.concat([head[SENSOR_COLUMNS]] + [pd.read_csv(p) for p in parts], ignore_index=True)
+
+    # The same draws from one continuous twin that starts in the previous shard's state
+    twin = DigitalTwin(seed=np.random.SeedSequence(2), start=start, chunk_rows=4096)
+    twin._drift, twin._fault_carry = drift, fault_carry
+    expected = pd.concat([twin._frame(twin._chunk(STITCH_ROWS))]
+                         + [twin.generate(min(4096, count - i)) for i in range(STITCH_ROWS, count, 4096)],
+                         ignore_index=True)
+    assert len(stitched) == count
+    for column in SENSOR_COLUMNS[2:]:
+        np.testing.assert_allclose(stitched[column], expected[column], rtol=1e-12)
+    for name in drift:
+        np.testing.assert_allclose(previous._drift[name], twin._drift[name], rtol=1e-12)
+
+
+def test_bulk_push_removes_work_dir_when_upload_fails(tmp_path, monkeypatch):
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    monkeypatch.setattr(parallel.tempfile, "mkdtemp", lambda prefix: str(work_dir))
+
+    def upload_to_gcs(path, bucket, prefix):
+        raise OSError("bucket unavailable")
+
+    monkeypatch.setattr(parallel, "upload_to_gcs", upload_to_gcs)
+    with pytest.raises(OSError):
+        parallel.bulk_push(1000, "bucket", "prefix", kilns=2, workers=1, fmt="csv", load=False)
+    assert not os.path.exists(work_dir)
+
+
+def test_part_writer_overwrites_parts_from_an_earlier_run(tmp_path):
+    chunk = next(generate_chunks(100, 100, seed=1))
+    for _ in range(2):
+        with PartWriter(str(tmp_path), fmt="csv", rows_per_file=60) as writer:
+            writer.write(chunk.iloc[:50])
+            writer.write(chunk.iloc[50:])
+    assert [os.path.basename(p) for p in writer.parts] == ["part-00000.csv"]
+    assert len(pd.read_csv(writer.parts[0])) == 100
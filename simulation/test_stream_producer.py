@@ -0,0 +1,23 @@
+import asyncio
+
+from simulation.stream_producer import ConsumerSink, StreamProducer
+
+
+def test_consumer_sink_counts_evicted_batches_as_dropped():
+    sink = ConsumerSink(maxlen=4)
+    producer = StreamProducer([sink], devices=3, rate_hz=1000, seed=1)
+    stats = asyncio.run(producer.run(ticks=10))
+    assert sink.dropped == 6 * 3
+    assert stats["sinks"]["consumer"]["delivered"] == 10 * 3
+    assert stats["sinks"]["consumer"]["dropped"] == 6 * 3
+    assert len(sink.drain()) == 4 * 3
+
+
+def test_drained_consumer_sink_drops_nothing():
+    sink = ConsumerSink(maxlen=4)
+    producer = StreamProducer([sink], devices=2, rate_hz=1000, seed=1)
+    received = []
+    sink.callback = lambda batch: received.append(sink.drain())
+    stats = asyncio.run(producer.run(ticks=10))
+    assert stats["sinks"]["consumer"]["dropped"] == 0
+    assert sum(map(len, received)) + len(sink.drain()) == 10 * 2
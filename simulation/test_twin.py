@@ -0,0 +1,27 @@
+import datetime as dt
+
+import pandas as pd
+
+from services.cloud.schema import DEFAULT_EQUIPMENT_ID
+from simulation.batch_generator import generate_chunks
+from simulation.twin import FleetTwin
+
+
+def test_fleet_next_rows_are_stamped_now():
+    twin = FleetTwin(3, seed=1)
+    before = pd.Timestamp(dt.datetime.utcnow())
+    ticks = [twin.next_rows(1) for _ in range(5)]
+    after = pd.Timestamp(dt.datetime.utcnow())
+    for df in ticks:
+        assert len(df) == 3
+        assert list(df["equipment_id"]) == twin.equipment_ids
+        assert df["timestamp"].between(before, after).all()
+
+
+def test_generators_share_equipment_ids():
+    twin = FleetTwin(100, seed=1)
+    chunks = generate_chunks(1, kilns=100, seed=1)
+    assert [chunk["equipment_id"].iloc[0] for chunk in chunks] == twin.equipment_ids
+    assert twin.equipment_ids[0] == DEFAULT_EQUIPMENT_ID
+    assert twin.equipment_ids[99] == "kiln-100"
+    assert FleetTwin(3).equipment_ids == ["kiln-01", "kiln-02", "kiln-03"]
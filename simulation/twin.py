@@ -0,0 +1,258 @@
+"""
+Vectorized cement-plant digital twin.
+
+Signals are built from a few latent AR(1) drifts plus white noise, with
+cross-coupling between process variables (raw feed loads the mill and
+cools the kiln; kiln temperature drives free lime and CO₂; AF substitution
+lowers CO₂) and occasional injected fault episodes. Everything is generated
+in NumPy chunks from one seeded ``Generator``, so the same seed (and chunk
+size) always gives the same plant.
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from services.cloud.schema import DEFAULT_EQUIPMENT_ID, equipment_ids as fleet_ids
+
+TWIN_COLUMNS = [
+    "kiln_temp_C",
+    "mill_power_kW",
+    "raw_feed_rate_tph",
+    "AF_rate_percent",
+    "clinker_free_lime_percent",
+    "blain_surface_cm2g",
+    "CO2_emission_kgpt",
+]
+
+# Latent drifts: (AR(1) coefficient per step, stationary std)
+DRIFTS = {
+    "feed": (0.995, 8.0),
+    "kiln": (0.990, 11.0),
+    "mill": (0.990, 110.0),
+    "af": (0.998, 4.5),
+    "lime": (0.980, 0.12),
+}
+
+# Fault episodes: column, peak offset, duration range in steps
+FAULTS = {
+    "kiln_overheat": ("kiln_temp_C", 70.0, (30, 180)),
+    "mill_overload": ("mill_power_kW", 650.0, (20, 120)),
+    "af_feeder_trip": ("AF_rate_percent", -12.0, (15, 90)),
+}
+
+CHUNK_ROWS = 262_144
+
+# Steps after which a carried-in drift state has decayed below float precision
+# (phi**STITCH_ROWS < machine epsilon for the slowest drift). Fault episodes
+# are far shorter, so a time shard only depends on its predecessor this far in.
+STITCH_ROWS = int(np.ceil(np.log(np.finfo(float).eps) / np.log(max(phi for phi, _ in DRIFTS.values()))))
+
+
+def _ar1(eps, phi, x_prev):
+    """x[t] = phi * x[t-1] + eps[t] per asset column of ``eps`` ``(n, assets)``, from ``x_prev`` ``(assets,)``.
+
+    All assets go through one pandas EWM pass (no Python loop): rows laid end
+    to end, then each row's carry-over from the previous row (a decaying
+    (1 - alpha)^k term) is subtracted.
+    """
+    alpha = 1.0 - phi
+    n, assets = eps.shape
+    u = np.empty((assets, n + 1))
+    u[:, 0] = x_prev
+    np.divide(eps.T, alpha, out=u[:, 1:])
+    y = pd.Series(u.ravel()).ewm(alpha=alpha, adjust=False).mean().to_numpy().reshape(assets, n + 1)
+    if assets > 1:
+        err = y[:, 0] - x_prev
+        y -= err[:, None] * phi ** np.arange(n + 1)
+    return y[:, 1:].T
+
+
+def _couple(drift, noise, faults):
+    """Process signals from latent drifts, white noise and fault offsets (any matching shapes)."""
+    feed = 250.0 + drift["feed"] + 2.0 * noise[0]
+    kiln = 1450.0 + drift["kiln"] - 0.25 * (feed - 250.0) + 4.0 * noise[1] + faults["kiln_temp_C"]
+    mill = 4200.0 + 6.0 * (feed - 250.0) + drift["mill"] + 40.0 * noise[2] + faults["mill_power_kW"]
+    af = np.clip(15.0 + drift["af"] + 1.0 * noise[3] + faults["AF_rate_percent"], 0.0, 40.0)
+    lime = np.clip(1.5 - 0.012 * (kiln - 1450.0) + drift["lime"] + 0.08 * noise[4], 0.0, None)
+    blaine = 3400.0 - 0.3 * (mill - 4200.0) + 60.0 * noise[5]
+    co2 = 850.0 + 1.1 * (kiln - 1450.0) - 2.5 * (af - 15.0) + 0.2 * (feed - 250.0) + 8.0 * noise[6]
+    return {
+        "kiln_temp_C": kiln,
+        "mill_power_kW": mill,
+        "raw_feed_rate_tph": feed,
+        "AF_rate_percent": af,
+        "clinker_free_lime_percent": lime,
+        "blain_surface_cm2g": blaine,
+        "CO2_emission_kgpt": co2,
+    }
+
+
+class FleetTwin:
+    """Many independent plants advanced together, vectorized across assets.
+
+    Every drift, noise and fault array has an asset axis, so a step for
+    thousands of assets is a handful of NumPy calls instead of one twin per
+    asset. Seeded and stateful: consecutive calls continue the same series.
+    """
+
+    def __init__(self, assets, seed=None, start=None, interval_s=60, fault_rate_per_day=2.0, equipment_ids=None,
+                 chunk_rows=CHUNK_ROWS):
+        self.assets = int(assets)
+        self.rng = np.random.default_rng(seed)
+        self.equipment_ids = list(equipment_ids or fleet_ids(self.assets))
+        start = start or dt.datetime.utcnow()
+        self._t_ns = np.datetime64(start, "ns").astype(np.int64)
+        self._step_ns = int(interval_s * 1e9)
+        self.fault_prob = fault_rate_per_day * interval_s / 86_400
+        self.chunk_rows = chunk_rows
+        self._drift = {name: np.zeros(self.assets) for name in DRIFTS}
+        self._fault_carry = {}      # column -> (steps, assets) offsets spilling into the next chunk
+        self._buffer = None
+        self._buffer_pos = 0
+        self.faults_injected = 0
+
+    # ---- Bulk generation ----
+
+    def step(self, n):
+        """Next ``n`` steps: ``(timestamps (n,), values (n, assets, len(TWIN_COLUMNS)))``."""
+        arrays = self._chunk(n)
+        return arrays["timestamp"], np.stack([arrays[c] for c in TWIN_COLUMNS], axis=-1)
+
+    def generate(self, n):
+        """Next ``n`` steps as a long DataFrame (timestamp, equipment_id + TWIN_COLUMNS), time-major."""
+        steps = max(1, self.chunk_rows // self.assets)
+        parts = [self._chunk(min(steps, n - i)) for i in range(0, n, steps)] or [self._chunk(0)]
+        if len(parts) == 1:
+            return self._frame(parts[0])
+        return self._frame({k: np.concatenate([p[k] for p in parts]) for k in parts[0]})
+
+    def _frame(self, arrays):
+        n = len(arrays["timestamp"])
+        # (steps, assets) C-order ravel is already time-major, one contiguous array per column
+        df = pd.DataFrame({k: arrays[k].ravel() for k in TWIN_COLUMNS}, copy=False)
+        df.insert(0, "timestamp", np.repeat(arrays["timestamp"], self.assets).view("datetime64[ns]"))
+        codes = np.zeros(len(df), dtype=np.int8) if self.assets == 1 else np.tile(np.arange(self.assets), n)
+        df.insert(1, "equipment_id", pd.Categorical.from_codes(codes, categories=self.equipment_ids))
+        return df
+
+    def _chunk(self, n):
+        drift, noise, faults, timestamps = self.latent(n)
+        arrays = _couple(drift, noise, faults)
+        arrays["timestamp"] = timestamps
+        return arrays
+
+    def latent(self, n):
+        """Next ``n`` steps as ``(drift, noise, faults, timestamps)``, before coupling into readings."""
+        rng = self.rng
+        drift = {}
+        for name, (phi, std) in DRIFTS.items():
+            eps = rng.standard_normal((n, self.assets)) * (std * np.sqrt(1 - phi ** 2))
+            drift[name] = _ar1(eps, phi, self._drift[name])
+            if n:
+                self._drift[name] = drift[name][-1].copy()
+        noise = rng.standard_normal((7, n, self.assets))
+        faults = self._faults(n)
+
+        timestamps = self._t_ns + np.arange(n, dtype=np.int64) * self._step_ns
+        self._t_ns += n * self._step_ns
+        return drift, noise, faults, timestamps
+
+    def _faults(self, n):
+        offsets = {column: np.zeros((n, self.assets)) for column, _, _ in FAULTS.values()}
+        for column, carry in self._fault_carry.items():
+            k = min(n, len(carry))
+            offsets[column][:k] += carry[:k]
+            self._fault_carry[column] = carry[k:]
+
+        count = self.rng.poisson(self.fault_prob * n * self.assets) if n else 0
+        kinds = list(FAULTS)
+        for _ in range(count):
+            column, peak, (lo, hi) = FAULTS[kinds[self.rng.integers(len(kinds))]]
+            asset = int(self.rng.integers(self.assets))
+            start = int(self.rng.integers(n))
+            duration = int(self.rng.integers(lo, hi))
+            profile = peak * np.sin(np.pi * np.arange(1, duration + 1) / (duration + 1))
+            k = min(duration, n - start)
+            offsets[column][start:start + k, asset] += profile[:k]
+            if k < duration:
+                spill = np.zeros((duration - k, self.assets))
+                spill[:, asset] = profile[k:]
+                self._carry_fault(column, spill)
+            self.faults_injected += 1
+        return offsets
+
+    def _carry_fault(self, column, spill):
+        """Add ``spill`` ``(steps, assets)`` to the offsets waiting for the next chunk."""
+        carry = self._fault_carry.get(column, np.zeros((0, self.assets)))
+        if len(carry) < len(spill):
+            carry = np.pad(carry, ((0, len(spill) - len(carry)), (0, 0)))
+        carry[:len(spill)] += spill
+        self._fault_carry[column] = carry
+
+    # ---- Time shards ----
+
+    def stitch(self, latent, n, drift_end, fault_carry_end):
+        """Continue this twin with a time shard that was generated from a zero state.
+
+        A shard of ``n`` steps is generated on its own twin starting with no
+        drift and no fault spill, holding back its first steps as ``latent``
+        (see ``latent``) and ending in ``drift_end``/``fault_carry_end``.
+        AR(1) drifts are linear, so this twin's drift state only adds
+        ``phi**(t+1) * x_prev`` at step ``t`` of the shard (the same correction
+        ``_ar1`` applies), which is lost in float rounding past ``STITCH_ROWS``
+        steps; this twin's fault spill lands in the first steps too. Returns
+        the held-back steps as readings and leaves this twin at the shard's
+        true end state, ready for the next shard.
+        """
+        drift, noise, faults, timestamps = latent
+        held = len(timestamps)
+        steps = np.arange(1, held + 1)[:, None]
+        for name, (phi, _) in DRIFTS.items():
+            drift[name] = drift[name] + self._drift[name] * phi ** steps
+            self._drift[name] = drift_end[name] + self._drift[name] * phi ** n
+        carry, self._fault_carry = self._fault_carry, {}
+        for column, spill in carry.items():
+            k = min(held, len(spill))
+            faults[column][:k] += spill[:k]
+            # Only a shard shorter than the spill passes some of it on
+            self._carry_fault(column, spill[held:])
+        for column, spill in fault_carry_end.items():
+            self._carry_fault(column, spill)
+        arrays = _couple(drift, noise, faults)
+        arrays["timestamp"] = timestamps
+        return self._frame(arrays)
+
+    # ---- Live readings ----
+
+    def next_rows(self, n=1, block=1024):
+        """Next ``n`` steps for every asset from a pre-generated block, stamped with the current UTC time.
+
+        Used by the live simulation, dashboard feed and realtime stream, which
+        want one step at a time without paying for NumPy calls per step.
+        """
+        n *= self.assets
+        block = max(1, block // self.assets)
+        rows = []
+        while n > 0:
+            if self._buffer is None or self._buffer_pos >= len(self._buffer):
+                self._buffer = self.generate(block)
+                self._buffer_pos = 0
+            take = min(n, len(self._buffer) - self._buffer_pos)
+            rows.append(self._buffer.iloc[self._buffer_pos:self._buffer_pos + take])
+            self._buffer_pos += take
+            n -= take
+        df = rows[0] if len(rows) == 1 else pd.concat(rows)
+        df = df.reset_index(drop=True)
+        df["timestamp"] = pd.Timestamp(dt.datetime.utcnow())
+        return df
+
+
+class DigitalTwin(FleetTwin):
+    """One plant: a ``FleetTwin`` of a single asset, ``equipment_id``."""
+
+    def __init__(self, seed=None, start=None, interval_s=60, fault_rate_per_day=2.0, chunk_rows=CHUNK_ROWS,
+                 equipment_id=DEFAULT_EQUIPMENT_ID):
+        super().__init__(1, seed=seed, start=start, interval_s=interval_s, fault_rate_per_day=fault_rate_per_day,
+                         equipment_ids=[equipment_id], chunk_rows=chunk_rows)
+        self.equipment_id = equipment_id